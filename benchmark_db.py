@@ -0,0 +1,144 @@
+"""
+データベース層ベンチマーク
+1件あたりの保存コストを、旧実装（接続ごとにスキーマ検査）と現実装で比較する
+
+使い方:
+    python benchmark_db.py [件数]
+"""
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from src.database.db_manager import DatabaseManager, normalize_search_text
+from src.database.job_repository import JobRepository
+from src.database.migrations import _migration_001_initial, apply_migrations
+
+
+class LegacyDatabaseManager(DatabaseManager):
+    """旧実装の再現: 呼び出しのたびに新規接続を開き、DDLと媒体登録を実行する"""
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        conn.create_function("nfkc", 1, normalize_search_text, deterministic=True)
+        cursor = conn.cursor()
+        _migration_001_initial(cursor)
+        self._insert_default_sources(cursor)
+        conn.commit()
+        # 旧実装との比較対象は接続・DDLのコストのため、後続の列追加等は現スキーマに揃える
+        apply_migrations(conn)
+        return conn
+
+    def get_source_id(self, source_name: str):
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT id FROM sources WHERE name = ?", (source_name,)).fetchone()
+            return row['id'] if row else None
+
+
+def make_jobs(count: int, prefix: str = "job") -> List[Dict[str, Any]]:
+    """ダミー求人データを生成"""
+    return [
+        {
+            "job_id": f"{prefix}{i:06d}",
+            "title": f"ホールスタッフ {i}",
+            "company": f"株式会社テスト{i % 500}",
+            "location": f"東京都新宿区西新宿{i % 10}-{i % 7}",
+            "salary": "時給1,200円〜1,500円",
+            "employment_type": "アルバイト・パート",
+            "phone_number": f"03-{1000 + i % 9000:04d}-{i % 10000:04d}",
+            "page_url": f"https://townwork.net/jobid_{prefix}{i:08x}/",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label: str, save: Callable[[Dict[str, Any]], Any], jobs: List[Dict[str, Any]]) -> float:
+    """1件ずつ保存し、1件あたりの平均時間（ミリ秒）を返す"""
+    start = time.perf_counter()
+    for job in jobs:
+        save(job)
+    elapsed = time.perf_counter() - start
+    per_job_ms = elapsed / len(jobs) * 1000
+    print(f"{label:<32} total {elapsed:7.3f}s  per job {per_job_ms:7.3f}ms")
+    return per_job_ms
+
+
+def bench_save_job(count: int):
+    """save_job 1件あたりのコスト（旧実装 vs 現実装）"""
+    print(f"\n=== save_job x {count} ===")
+    jobs = make_jobs(count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_repo = JobRepository(LegacyDatabaseManager(str(Path(tmp) / "legacy.db")))
+        before = measure("before (connect + DDL per call)", lambda j: legacy_repo.save_job(j, "townwork"), jobs)
+
+        db = DatabaseManager(str(Path(tmp) / "current.db"))
+        repo = JobRepository(db)
+        after = measure("after (pooled connection)", lambda j: repo.save_job(j, "townwork"), jobs)
+        db.close()
+
+    print(f"speedup: x{before / after:.1f}")
+
+
+def bench_bulk_save(count: int):
+    """1件ずつのsave_job と upsert_jobs の比較（新規挿入 → 同一内容で再保存 → 内容を変えて再保存）"""
+    print(f"\n=== bulk save x {count} ===")
+    jobs = make_jobs(count)
+    changed_jobs = [dict(job, salary="時給1,300円〜1,600円") for job in jobs]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, use_bulk in (("save_job loop", False), ("upsert_jobs", True)):
+            db = DatabaseManager(str(Path(tmp) / f"{'bulk' if use_bulk else 'loop'}.db"))
+            repo = JobRepository(db)
+            for phase, batch in (("insert", jobs), ("same", jobs), ("changed", changed_jobs)):
+                start = time.perf_counter()
+                if use_bulk:
+                    repo.upsert_jobs(batch, "townwork")
+                else:
+                    for job in batch:
+                        repo.save_job(job, "townwork")
+                elapsed = time.perf_counter() - start
+                print(f"{label:<16} {phase:<7} total {elapsed:7.3f}s  per job {elapsed / count * 1000:7.3f}ms")
+            db.close()
+
+
+def bench_existing_lookup(count: int):
+    """既存判定: 1件ずつのOR条件クエリ と find_existing_jobs の比較（半数が既存）"""
+    print(f"\n=== existing lookup x {count} ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "lookup.db"))
+        repo = JobRepository(db)
+        repo.upsert_jobs(make_jobs(count * 2), "townwork")
+        probe = make_jobs(count // 2) + make_jobs(count - count // 2, prefix="unknown")
+        keys = [repo.get_job_key(job) for job in probe]
+        source_id = db.get_source_id("townwork")
+
+        start = time.perf_counter()
+        conn = db.get_connection()
+        for job_id, url in keys:
+            conn.execute(
+                "SELECT 1 FROM jobs WHERE source_id = ? AND (job_id = ? OR page_url = ?) LIMIT 1",
+                (source_id, job_id, url)
+            ).fetchone()
+        per_row = time.perf_counter() - start
+        print(f"{'per-job OR query':<20} total {per_row * 1000:8.2f}ms")
+
+        start = time.perf_counter()
+        flags = repo.find_existing_jobs("townwork", keys)
+        batch = time.perf_counter() - start
+        print(f"{'find_existing_jobs':<20} total {batch * 1000:8.2f}ms  (known: {sum(flags)})")
+        db.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    bench_save_job(count)
+    bench_bulk_save(count)
+    bench_existing_lookup(count * 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+求人カード抽出ベンチマーク
+一覧ページ1枚あたりの抽出時間を、要素ごとの取得（従来方式）・page.evaluate 1回の一括抽出・
+Next.js ペイロード（__NEXT_DATA__）からの抽出で比較する
+
+使い方:
+    python benchmark_extraction.py [--cards 30] [--iterations 20] [--no-payload]
+    python benchmark_extraction.py --url "https://townwork.net/prefectures/tokyo/job_search/?keyword=IT"
+
+--url を省略した場合はタウンワークと同じ構造の合成ページ（ネットワーク通信なし）で計測する。
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from playwright.async_api import async_playwright, Page
+
+from scrapers.townwork import TownworkScraper
+from utils.stealth import StealthConfig
+
+CARD_HTML = """
+<a class="jobCard__abc12" href="/jobid_{job_id:08x}/?from=list">
+  <div class="title__x1y2">ホールスタッフ {i}</div>
+  <div class="employerName__q9">株式会社テスト{i}</div>
+  <div class="salaryText__k3">時給1,200円〜1,500円</div>
+  <div class="accessText__p0">交通・アクセス 新宿駅徒歩{i}分</div>
+  <div class="jobType__m7">アルバイト・パート</div>
+</a>
+"""
+
+
+def make_next_data(cards: int) -> str:
+    """カードと同じ求人を持つ __NEXT_DATA__（カードに出ない項目も含む）"""
+    jobs = [
+        {
+            "jobId": f"{0x1000 + i:08x}",
+            "jobTitle": f"ホールスタッフ {i}",
+            "employer": {"name": f"株式会社テスト{i}", "nameKana": f"カブシキガイシャテスト{i}"},
+            "salaryText": "時給1,200円〜1,500円",
+            "accessText": f"新宿駅徒歩{i}分",
+            "jobType": [{"label": "アルバイト・パート"}],
+            "workingHours": "10:00〜22:00の間で4h以上",
+            "jobDescription": "ホールでの接客・配膳をお願いします。",
+        }
+        for i in range(cards)
+    ]
+    data = {"props": {"pageProps": {"searchResult": {"total": cards, "jobs": jobs}}}, "page": "/prefectures/[area]/job_search"}
+    return json.dumps(data, ensure_ascii=False)
+
+
+def make_listing_html(cards: int, payload: bool = True) -> str:
+    """タウンワークの一覧ページと同じクラス名構造の合成HTML"""
+    body = "".join(CARD_HTML.format(i=i, job_id=0x1000 + i) for i in range(cards))
+    script = (
+        f'<script id="__NEXT_DATA__" type="application/json">{make_next_data(cards)}</script>'
+        if payload else ""
+    )
+    return f"<html><body><main>{body}</main>{script}</body></html>"
+
+
+CARD_KEYS = ("title", "company", "location", "salary", "employment_type", "url", "job_id")
+
+
+def card_fields(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """方式間で比較するカード表示項目だけを取り出す（URLのクエリは一覧由来の差分なので除く）"""
+    return [
+        {key: (job.get(key) or "").split("?")[0] if key == "url" else job.get(key) for key in CARD_KEYS}
+        for job in jobs
+    ]
+
+
+async def measure(label: str, extract: Callable[[], Awaitable[List[Dict[str, Any]]]], iterations: int) -> float:
+    """抽出を iterations 回実行し、1ページあたりの平均時間（ミリ秒）を返す"""
+    # ウォームアップ
+    jobs = await extract()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await extract()
+    per_page_ms = (time.perf_counter() - start) / iterations * 1000
+    print(f"{label:<28} per page {per_page_ms:8.2f}ms  ({len(jobs)} jobs)")
+    return per_page_ms
+
+
+async def run(args):
+    scraper = TownworkScraper()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**StealthConfig.get_launch_args())
+        try:
+            page: Page = await browser.new_page()
+            if args.url:
+                await page.goto(args.url, wait_until="networkidle", timeout=60000)
+            else:
+                await page.set_content(make_listing_html(args.cards, payload=not args.no_payload))
+
+            async def per_element():
+                scraper.payload_extraction = False
+                scraper.batch_extraction = False
+                return await scraper.extract_job_cards(page)
+
+            async def batched():
+                scraper.payload_extraction = False
+                scraper.batch_extraction = True
+                return await scraper.extract_job_cards(page)
+
+            async def payload():
+                scraper.payload_extraction = True
+                return await scraper.extract_payload_records(page)
+
+            print(f"\n=== job card extraction ({args.url or f'synthetic, {args.cards} cards'}) ===")
+            before = await measure("per-element (query_selector)", per_element, args.iterations)
+            after = await measure("batched (page.evaluate)", batched, args.iterations)
+            print(f"speedup: x{before / after:.1f}")
+
+            # ペイロードがあるページでは変換込みで計測
+            if await payload():
+                async def payload_jobs():
+                    scraper.payload_extraction = True
+                    return await scraper.extract_job_cards(page)
+
+                from_payload = await measure("payload (__NEXT_DATA__)", payload_jobs, args.iterations)
+                print(f"speedup vs per-element: x{before / from_payload:.1f}")
+            else:
+                print("payload: not found on this page (DOM fallback)")
+
+            # 各方式の結果が一致することを確認
+            legacy = await per_element()
+            current = await batched()
+            print("results match (batched): " + ("yes" if legacy == current else "NO"))
+            scraper.payload_extraction = True
+            via_payload = await scraper.extract_job_cards(page)
+            print("results match (payload): " + ("yes" if card_fields(legacy) == card_fields(via_payload) else "NO"))
+            extra = sorted({key for job in via_payload for key in job} - set(CARD_KEYS) - {"site"})
+            print(f"payload-only fields: {', '.join(extra) or '-'}")
+        finally:
+            await browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job card extraction benchmark")
+    parser.add_argument("--cards", type=int, default=30, help="合成ページのカード数")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--url", help="計測に使う実際の一覧ページURL")
+    parser.add_argument("--no-payload", action="store_true", help="合成ページに __NEXT_DATA__ を埋め込まない")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
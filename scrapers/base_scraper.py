@@ -4,10 +4,14 @@
 """
 import asyncio
 import json
+import math
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Any
 from pathlib import Path
-from playwright.async_api import async_playwright, Page, Browser, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, Page, Browser, Response, TimeoutError as PlaywrightTimeoutError
 import logging
 import sys
 import os
@@ -15,15 +19,100 @@ import os
 # utilsモジュールのパスを追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from utils.retry import async_retry, RetryConfig, ErrorCounter
-from utils.user_agents import ua_rotator
-from utils.proxy import proxy_rotator
 from utils.performance import PerformanceMonitor
-from utils.stealth import StealthConfig, create_stealth_context
-from utils.page_utils import PageUtils
+from utils.stealth import StealthConfig
+from utils.page_utils import PageUtils, ReadyCondition
+from utils.context_pool import ContextPool
+from utils.request_blocking import BlockingPolicy
+from utils.host_limiter import HostLimiter, report_result
+from utils.http_cache import ResponseCache
+from .card_extractor import CardExtractor
+from .payload_extractor import NextPayloadExtractor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 増分クロールで既知と判定した求人の目印（ページ送りの判定にだけ使い、結果からは除く）
+KNOWN_JOB_MARKER = "_known"
+
+# (求人ID, 詳細URL) のリスト → 既知かどうかのリスト
+KnownJobChecker = Callable[[List[Tuple[Optional[str], str]]], List[bool]]
+
+
+def is_known_stub(job: Dict[str, Any]) -> bool:
+    """増分クロールで抽出を省略した既知の求人か"""
+    return bool(job.get(KNOWN_JOB_MARKER))
+
+
+class KnownPageTracker:
+    """
+    増分クロールのページ送りの打ち切り判定
+
+    新着順の一覧で、既知の求人だけのページが先頭から数えて stop_after ページ連続したら、
+    それより後のページは取得しない。ページは並列に取得されて順不同で届くため、
+    先頭から連続して結果が揃っている範囲だけで判定する。
+    """
+
+    def __init__(self, stop_after: int = 1, first_page: int = 1):
+        self.stop_after = max(1, stop_after)
+        self.first_page = first_page
+        # ページ番号 → 既知の求人だけか（求人がないページは None）
+        self._pages: Dict[int, Optional[bool]] = {}
+
+    def record(self, page_num: int, page_jobs: Optional[List[Dict[str, Any]]]) -> Optional[int]:
+        """
+        ページの結果を記録し、取得を打ち切るページ番号（これ以降は取得しない）を返す（続ける場合はNone）
+        """
+        self._pages[page_num] = all(map(is_known_stub, page_jobs)) if page_jobs else None
+
+        run = 0
+        page = self.first_page
+        while page in self._pages:
+            all_known = self._pages[page]
+            if all_known is None:
+                return page
+            run = run + 1 if all_known else 0
+            if run >= self.stop_after:
+                return page + 1
+            page += 1
+        return None
+
+
+@dataclass
+class PageBatch:
+    """iter_pages で流す一覧1ページ分の求人"""
+    keyword: str
+    area: str
+    page_num: int
+    jobs: List[Dict[str, Any]]
+
+
+class PageListener:
+    """
+    一覧ページ単位の進捗の通知先（scrape_with_browser から呼ばれる。既定の実装は何もしない）
+
+    中断したクロールを続きから再開するために使う。取得するページを pending_pages で絞り込み、
+    ページごとの開始・完了・失敗と、それより後のページが不要になったことを通知する。
+    DBへの書き込み等でイベントループを止めないよう、各メソッドは別スレッドで呼ばれる
+    （1つのページについての通知は順番に呼ばれる）。
+    """
+
+    def pending_pages(self, keyword: str, area: str, max_pages: int) -> Optional[List[int]]:
+        """取得するページ番号（昇順）。None なら 1〜max_pages の全て"""
+        return None
+
+    def page_started(self, keyword: str, area: str, page_num: int):
+        """ページの取得開始"""
+
+    def page_finished(self, keyword: str, area: str, page_num: int, jobs: List[Dict[str, Any]]):
+        """ページの取得完了（jobs は増分クロールで既知と判定した求人を除いたもの）"""
+
+    def page_failed(self, keyword: str, area: str, page_num: int, error: str):
+        """ページの取得失敗（読み込み失敗・ブロック等）"""
+
+    def pages_exhausted(self, keyword: str, area: str, page_num: int):
+        """page_num 以降のページは取得不要（最終ページより後、または増分クロールの打ち切り）"""
+
 
 class BaseScraper(ABC):
     """スクレイピング基底クラス"""
@@ -39,6 +128,32 @@ class BaseScraper(ABC):
         self.performance_monitor = PerformanceMonitor(name=site_name)
         self.current_filters: Dict[str, Any] = {}
 
+        # 一覧ページの求人カードを page.evaluate 1回でまとめて抽出する（Falseなら要素ごとに取得）
+        self.batch_extraction = True
+        self.card_extractor = self._build_card_extractor()
+        # Next.js のペイロード（__NEXT_DATA__ 等）があればDOMより先にそちらから抽出する
+        self.payload_extraction = True
+        self.payload_extractor = NextPayloadExtractor.from_config(self.site_config.get("next_payload"))
+        # 一覧ページの準備完了条件（固定の待機の代わりに、条件を満たした時点で抽出を始める）
+        self.ready_condition = ReadyCondition.from_site_config(self.site_config)
+        # 画像・フォント・トラッカー等のブロック方針（コンテキスト作成時に1回だけ適用）
+        self.blocking_policy = BlockingPolicy.from_config(self.site_config.get("blocking"))
+
+        # 2ページ目以降を同時に取得するタブ数（1なら従来どおり1ページずつ取得）
+        self.pagination_tabs = 3
+        # ホストごとのレート制御（スクレイパー・コンテキスト間で共有）。全てのページ遷移はこの枠内で行う
+        self.host_limiter = HostLimiter.shared()
+        self.host_limiter.configure_site(self.site_config)
+        # 一覧・詳細ページのレスポンスキャッシュ（enable_response_cache で有効化）
+        self.response_cache: Optional[ResponseCache] = None
+        # 増分クロール（enable_incremental で有効化）: 既知の求人は抽出せず、既知だけのページが続いたら打ち切る
+        self.known_job_checker: Optional[KnownJobChecker] = None
+        self.known_pages_to_stop = 1
+        # ページ単位の進捗の通知先（中断したクロールの再開用）
+        self.page_listener: Optional[PageListener] = None
+        # 取得したページの送り先（iter_pages の間だけ設定）。設定中は結果を溜めずにページごとに渡す
+        self.page_sink: Optional[Callable[[PageBatch], Awaitable[None]]] = None
+
         # リトライ設定
         self.retry_config = RetryConfig(
             max_attempts=3,
@@ -70,6 +185,153 @@ class BaseScraper(ABC):
             # 通常のページ番号方式
             return url_pattern.format(keyword=keyword, area=area, page=page)
 
+    def _build_card_extractor(self) -> Optional[CardExtractor]:
+        """一括抽出器を作成（サイトごとにオーバーライド可能）"""
+        return CardExtractor.from_selectors(self.selectors)
+
+    def build_job_from_card(self, record: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """一括抽出したカードの項目を extract_job_card と同じ形式に変換（サイトごとにオーバーライド可能）"""
+        job_data = {
+            "site": self.site_config.get("name", self.site_name),
+            "title": record.get("title") or "",
+            "company": record.get("company") or "",
+            "location": record.get("location") or "",
+            "salary": record.get("salary") or "",
+            "employment_type": record.get("employment_type") or "",
+            "url": "",
+        }
+
+        href = record.get("url")
+        if href:
+            # 相対URLを絶対URLに変換
+            if href.startswith("/"):
+                job_data["url"] = self.site_config.get("base_url", "") + href
+            else:
+                job_data["url"] = href
+
+        # ペイロードから抽出した場合は求人IDとカード外の項目も持つ
+        if record.get("job_id"):
+            job_data["job_id"] = record["job_id"]
+        job_data.update(record.get("details") or {})
+
+        return job_data
+
+    async def extract_payload_records(self, page: Page) -> List[Dict[str, Any]]:
+        """ペイロードから求人レコードを取得（無効・ペイロードなし・解析失敗時は空＝DOM抽出に任せる）"""
+        if not (self.payload_extraction and self.payload_extractor):
+            return []
+        try:
+            return await self.payload_extractor.extract(page)
+        except Exception as e:
+            logger.warning(f"Payload extraction failed, falling back to DOM: {e}")
+            return []
+
+    def enable_incremental(self, is_known: KnownJobChecker, known_pages_to_stop: int = 1):
+        """
+        増分クロールを有効化
+
+        Args:
+            is_known: (求人ID, 詳細URL) のリスト → DBに既存かどうかのリスト（1ページにつき1回呼ぶ）
+            known_pages_to_stop: 既知の求人だけのページがこの数だけ続いたらページ送りを打ち切る
+        """
+        self.known_job_checker = is_known
+        self.known_pages_to_stop = max(1, known_pages_to_stop)
+
+    def job_id_from_url(self, url: str) -> Optional[str]:
+        """詳細URLから求人IDを取得（サイトごとにオーバーライド可能、取れなければNone）"""
+        return None
+
+    def job_key(self, record: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        """カード・ペイロードのレコードの (求人ID, 詳細URL) を求める（既知の求人の判定に使う）"""
+        href = record.get("url") or ""
+        url = self.site_config.get("base_url", "") + href if href.startswith("/") else href
+        return self.job_id_from_url(url) or record.get("job_id"), url
+
+    def known_flags(self, records: List[Dict[str, Any]]) -> List[bool]:
+        """レコードごとにDBに既存の求人かどうか（増分クロールが無効なら全て False）"""
+        if not self.known_job_checker or not records:
+            return [False] * len(records)
+        try:
+            return self.known_job_checker([self.job_key(record) for record in records])
+        except Exception as e:
+            logger.warning(f"Failed to check known jobs, extracting all cards: {e}")
+            return [False] * len(records)
+
+    def known_stub(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """抽出を省略した既知の求人の目印（ページ送りの判定用。最終結果からは除く）"""
+        job_id, url = self.job_key(record)
+        return {"url": url, "job_id": job_id, KNOWN_JOB_MARKER: True}
+
+    async def known_cards_only(self, page: Page) -> Optional[List[Dict[str, Any]]]:
+        """
+        DOMのカードのURLだけを1回で読み、全て既知なら目印のリストを返す（新しい求人があればNone）
+
+        全項目の抽出より軽いため、DOMから抽出する前に確認する。
+        """
+        if not (self.known_job_checker and self.card_extractor and "url" in self.card_extractor.fields):
+            return None
+        records = [{"url": url} for url in await self.card_extractor.extract_field(page, "url") if url]
+        if not records or not all(self.known_flags(records)):
+            return None
+        logger.info(f"All {len(records)} job cards are already known; skipping extraction")
+        return [self.known_stub(record) for record in records]
+
+    def _jobs_from_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        一括抽出・ペイロードのレコードを求人データに変換（タイトルのないものは除く）
+
+        増分クロール時、DBに既存の求人は変換せず目印（known_stub）にする。
+        """
+        jobs = []
+        for record, known in zip(records, self.known_flags(records)):
+            if known:
+                jobs.append(self.known_stub(record))
+                continue
+            job = self.build_job_from_card(record)
+            if job.get("title"):
+                jobs.append(job)
+        return jobs
+
+    async def extract_job_cards(self, page: Page, use_payload: bool = True) -> List[Dict[str, Any]]:
+        """
+        ページ上の全求人カードを抽出（タイトルのないカードは除く）
+
+        Args:
+            use_payload: ペイロードを先に試すか（呼び出し元で確認済みなら False）
+        """
+        if use_payload:
+            records = await self.extract_payload_records(page)
+            if records:
+                logger.info(f"Found {len(records)} jobs in page payload")
+                return self._jobs_from_records(records)
+
+        # 増分クロールで全カードが既知なら項目は抽出しない
+        known = await self.known_cards_only(page)
+        if known:
+            return known
+
+        if self.batch_extraction and self.card_extractor:
+            records = await self.card_extractor.extract(page)
+            logger.info(f"Found {len(records)} job cards")
+            return self._jobs_from_records(records)
+
+        # 要素ごとに取得する従来の方式
+        job_cards = await page.query_selector_all(self.selectors["job_cards"])
+        logger.info(f"Found {len(job_cards)} job cards")
+
+        jobs = []
+        for idx, card in enumerate(job_cards):
+            try:
+                job_data = await self.extract_job_card(card, page)
+                if job_data.get("title"):  # タイトルがあるもののみ追加
+                    jobs.append(job_data)
+                else:
+                    logger.debug(f"Card {idx} has no title, skipping")
+            except Exception as e:
+                logger.warning(f"Error extracting job card {idx}: {e}")
+                continue
+        return jobs
+
     async def extract_job_card(self, card_element, page: Page) -> Dict[str, Any]:
         """求人カードから情報を抽出（サイトごとにオーバーライド可能）"""
         job_data = {
@@ -130,20 +392,114 @@ class BaseScraper(ABC):
 
         return job_data
 
-    async def scrape_page(self, page: Page, url: str) -> List[Dict[str, Any]]:
-        """1ページ分のデータを取得（実践的な実装）"""
+    def enable_response_cache(
+        self,
+        cache_dir: str = "data/http_cache",
+        ttls: Optional[Dict[str, float]] = None
+    ) -> ResponseCache:
+        """
+        一覧・詳細ページのレスポンスキャッシュを有効化
+
+        有効期限は ttls、selectors.json の http_cache.ttl、既定値の順に優先する。
+        """
+        site_ttls = self.site_config.get("http_cache", {}).get("ttl", {})
+        self.response_cache = ResponseCache(
+            cache_dir,
+            ttls={**site_ttls, **(ttls or {})},
+            monitor=self.performance_monitor
+        )
+        return self.response_cache
+
+    def cache_route(self, page: Page, url: str, resource_type: str) -> AsyncContextManager[None]:
+        """この中の page.goto(url) をレスポンスキャッシュ経由にする（キャッシュ無効時は何もしない）"""
+        if self.response_cache is None:
+            return nullcontext()
+        return self.response_cache.serve(page, url, resource_type)
+
+    def cached_payload_records(self, url: str) -> List[Dict[str, Any]]:
+        """
+        有効期限内のキャッシュ済み一覧ページのペイロードから求人レコードを取得（描画もしない）
+
+        キャッシュ無効・期限切れ・ペイロードに求人がない場合は空（ブラウザで取得する）。
+        """
+        if self.response_cache is None or not (self.payload_extraction and self.payload_extractor):
+            return []
+        entry = self.response_cache.lookup(url, "listing")
+        if entry is None:
+            return []
+        try:
+            records = self.payload_extractor.extract_from_html(entry.text())
+        except Exception as e:
+            logger.debug(f"Failed to read cached payload for {url}: {e}")
+            return []
+        if records:
+            self.response_cache.record_hit(entry)
+            logger.info(f"Extracted {len(records)} jobs from cached page: {url}")
+        return records
+
+    async def navigate(
+        self,
+        page: Page,
+        url: str,
+        timeout: int = 30000,
+        wait_until: str = "domcontentloaded",
+        resource_type: str = "detail"
+    ) -> Optional[Response]:
+        """
+        ホストのレート制御の枠内でページを開き、応答をレートに反映する（例外はそのまま送出）
+
+        詳細ページ等、scrape_page を通らないページ遷移に使う。レスポンスキャッシュが有効ならキャッシュを経由する。
+        """
+        async with self.host_limiter.slot(url), self.cache_route(page, url, resource_type):
+            start = time.perf_counter()
+            response = await page.goto(url, wait_until=wait_until, timeout=timeout)
+            report_result(status=response.status if response else None, latency=time.perf_counter() - start)
+            return response
+
+    async def scrape_page(self, page: Page, url: str, allow_cached: bool = True) -> Optional[List[Dict[str, Any]]]:
+        """
+        1ページ分のデータを取得（ホストのレート制御の枠内で実行し、応答・ブロック検出をレートに反映）
+
+        allow_cached が True でキャッシュ済みのページから求人を読めればブラウザを使わない
+        （そのページのDOMを後で読む場合は False にする）。
+
+        Returns:
+            求人リスト（求人がなければ空）、取得に失敗した場合はNone
+        """
+        if allow_cached:
+            jobs = self._jobs_from_records(self.cached_payload_records(url))
+            if jobs:
+                self.error_counter.record_attempt()
+                self.error_counter.record_success()
+                return jobs
+
+        async with self.host_limiter.slot(url):
+            return await self._scrape_page(page, url)
+
+    async def _scrape_page(self, page: Page, url: str) -> Optional[List[Dict[str, Any]]]:
+        """1ページ分のデータを取得（実践的な実装。失敗した場合はNone）"""
         self.error_counter.record_attempt()
         jobs = []
 
         try:
             logger.info(f"Scraping: {url}")
 
-            # 安全なページ遷移
-            success = await PageUtils.safe_goto(page, url, timeout=30000)
+            # 安全なページ遷移（読み込み後の待機は準備完了条件で行う）
+            async with self.cache_route(page, url, "listing"):
+                success = await PageUtils.safe_goto(page, url, timeout=30000, wait_for_load=False)
             if not success:
                 logger.error(f"Failed to load page: {url}")
                 self.error_counter.record_failure(Exception("Page load failed"))
-                return jobs
+                return None
+
+            # 求人カードセレクタ取得
+            if not self.ready_condition.selector:
+                logger.warning(f"No job_cards selector defined for {self.site_name}")
+                self.error_counter.record_failure(ValueError("No job_cards selector"))
+                return None
+
+            # ペイロードまたはカードの描画が揃うまで待機
+            ready = await PageUtils.wait_until_ready(page, self.ready_condition, self.performance_monitor)
 
             # ブロックチェック
             block_info = await PageUtils.check_for_block(page)
@@ -154,59 +510,43 @@ class BaseScraper(ABC):
                 # デバッグ用スクリーンショット
                 screenshot_path = f"data/screenshots/blocked_{self.site_name}_{asyncio.get_event_loop().time()}.png"
                 await PageUtils.take_screenshot(page, screenshot_path)
+                return None
+
+            # ペイロードに求人があればカードの描画を待たずにそこから抽出
+            records = await self.extract_payload_records(page)
+            if records:
+                jobs = self._jobs_from_records(records)
+                self.error_counter.record_success()
+                logger.info(f"Successfully extracted {len(jobs)} jobs from page payload: {url}")
                 return jobs
 
-            # 求人カードセレクタ取得
-            job_cards_selector = self.selectors.get("job_cards")
-            if not job_cards_selector:
-                logger.warning(f"No job_cards selector defined for {self.site_name}")
-                self.error_counter.record_failure(ValueError("No job_cards selector"))
-                return jobs
-
-            # セレクタが存在するか確認（JSレンダリング待機のため長めに設定）
-            # 最初の試行
-            selector_found = await PageUtils.verify_selector(page, job_cards_selector, timeout=15000)
-
-            # 見つからない場合、追加待機してリトライ
-            if not selector_found:
-                logger.info("First selector check failed, waiting and retrying...")
-                await asyncio.sleep(3)
-                selector_found = await PageUtils.verify_selector(page, job_cards_selector, timeout=10000)
+            # ペイロードはあったが求人が見つからない場合はカードの描画を待つ
+            if ready == "payload":
+                ready = await PageUtils.wait_until_ready(
+                    page, self.ready_condition.without_payload(), self.performance_monitor
+                )
 
-            if not selector_found:
-                logger.warning(f"Job cards selector not found: {job_cards_selector}")
+            if not ready:
+                logger.warning(f"Job cards selector not found: {self.ready_condition.selector}")
                 # デバッグ用スクリーンショット
                 screenshot_path = f"data/screenshots/no_selector_{self.site_name}_{asyncio.get_event_loop().time()}.png"
                 await PageUtils.take_screenshot(page, screenshot_path)
                 self.error_counter.record_failure(ValueError("Selector not found"))
-                return jobs
-
-            # 求人カードを全て取得
-            job_cards = await page.query_selector_all(job_cards_selector)
-            logger.info(f"Found {len(job_cards)} job cards")
+                return None
 
-            if len(job_cards) == 0:
+            # 求人カードを全て抽出
+            jobs = await self.extract_job_cards(page, use_payload=False)
+            if not jobs:
                 logger.warning("No job cards found despite selector match")
                 return jobs
 
-            # 各求人カードから情報を抽出
-            for idx, card in enumerate(job_cards):
-                try:
-                    job_data = await self.extract_job_card(card, page)
-                    if job_data.get("title"):  # タイトルがあるもののみ追加
-                        jobs.append(job_data)
-                    else:
-                        logger.debug(f"Card {idx} has no title, skipping")
-                except Exception as e:
-                    logger.warning(f"Error extracting job card {idx}: {e}")
-                    continue
-
             self.error_counter.record_success()
             logger.info(f"Successfully extracted {len(jobs)} jobs from {url}")
 
         except Exception as e:
             logger.error(f"Error scraping page {url}: {e}", exc_info=True)
             self.error_counter.record_failure(e)
+            return None
 
         return jobs
 
@@ -215,63 +555,219 @@ class BaseScraper(ABC):
         browser: Browser,
         keyword: str,
         area: str,
-        max_pages: int = 5
+        max_pages: int = 5,
+        context_pool: Optional[ContextPool] = None
     ) -> List[Dict[str, Any]]:
-        """ブラウザを使って複数ページをスクレイピング（Stealth対応）"""
-        all_jobs = []
-
-        # User-Agentをローテーション
-        user_agent = ua_rotator.get_random()
-        logger.info(f"Using User-Agent: {user_agent[:50]}...")
+        """
+        ブラウザを使って複数ページをスクレイピング（Stealth対応）
 
-        # プロキシ設定
-        proxy_config = None
-        if proxy_rotator.is_enabled():
-            proxy = proxy_rotator.get_random()
-            if proxy:
-                proxy_config = proxy.to_playwright_format()
-                logger.info(f"Using proxy: {proxy}")
+        context_pool を渡すとプールのコンテキストを借りて使い回す。
+        省略時はこの呼び出し専用のコンテキストを作成して終了時に閉じる。
+        """
+        if context_pool is None:
+            context_pool = ContextPool(
+                browser, size=1, monitor=self.performance_monitor, blocking_policy=self.blocking_policy
+            )
+            try:
+                return await self.scrape_with_browser(browser, keyword, area, max_pages, context_pool)
+            finally:
+                await context_pool.close()
 
-        # Stealthコンテキスト作成
-        context = await create_stealth_context(
-            browser,
-            user_agent=user_agent,
-            proxy=proxy_config
+        all_jobs = []
+        listener = self.page_listener or PageListener()
+
+        async def notify(callback: Callable[..., Any], *args: Any) -> Any:
+            if self.page_listener is None:
+                return callback(*args)
+            return await asyncio.to_thread(callback, *args)
+
+        # 再開したクロールでは取得済みのページを除く
+        page_numbers = await notify(listener.pending_pages, keyword, area, max_pages)
+        if page_numbers is None:
+            page_numbers = list(range(1, max_pages + 1))
+        if not page_numbers:
+            logger.info(f"No pending pages for {keyword} / {area}")
+            return all_jobs
+        # 増分クロールでは既知の求人だけのページが続いたら打ち切る
+        tracker = (
+            KnownPageTracker(self.known_pages_to_stop, first_page=page_numbers[0]) if self.known_job_checker else None
         )
 
-        try:
-            page = await context.new_page()
+        async def fetch(tab: Page, page_num: int, allow_cached: bool = True) -> Optional[List[Dict[str, Any]]]:
+            await notify(listener.page_started, keyword, area, page_num)
+            page_jobs = await self.scrape_page(tab, self.generate_search_url(keyword, area, page_num), allow_cached)
+            if page_jobs is None:
+                await notify(listener.page_failed, keyword, area, page_num, "Failed to scrape page")
+                return None
+            new_jobs = [job for job in page_jobs if not is_known_stub(job)]
+            self.performance_monitor.record_item(len(new_jobs))
+            await notify(listener.page_finished, keyword, area, page_num, new_jobs)
+            if self.page_sink is not None:
+                # 受け取り側が詰まっていればここで待つ（取得の速度を保存等の後段に合わせる）
+                await self.page_sink(PageBatch(keyword, area, page_num, new_jobs))
+            return page_jobs
+
+        # 取得不要になった最初のページ（タブの並列取得中は同期の判定関数から記録し、終了時にまとめて通知する）
+        exhausted_from: List[int] = []
+
+        def stop_after(page_num: int, page_jobs: List[Dict[str, Any]]) -> Optional[int]:
+            limit = tracker.record(page_num, page_jobs) if tracker else (page_num if not page_jobs else None)
+            if limit is not None:
+                exhausted_from.append(limit)
+            return limit
+
+        async with context_pool.lease() as pooled:
+            logger.info(f"Using User-Agent: {pooled.user_agent[:50]}...")
+            page = pooled.page
 
-            # Stealthスクリプト適用
-            await StealthConfig.apply_stealth_scripts(page)
+            try:
+                if page_numbers[0] == 1:
+                    # 1ページ目で総ページ数を確認（ページ番号を読むためブラウザで開く）
+                    jobs = await fetch(page, 1, allow_cached=False)
+                    if self.page_sink is None:
+                        all_jobs.extend(jobs or [])
+
+                    if not jobs:  # 求人が見つからなければ終了
+                        logger.info("No jobs found at page 1")
+                        if jobs is not None:
+                            exhausted_from.append(2)
+                        return self.drop_known_stubs(all_jobs)
+
+                    if stop_after(1, jobs) is not None:
+                        logger.info("No new jobs at page 1; stopping pagination")
+                        return self.drop_known_stubs(all_jobs)
+
+                    last_page = min(max_pages, await self.detect_last_page(page, len(jobs)) or max_pages)
+                    if last_page < max_pages:
+                        exhausted_from.append(last_page + 1)
+                    page_numbers = [page_num for page_num in page_numbers[1:] if page_num <= last_page]
+                if not page_numbers:
+                    return self.drop_known_stubs(all_jobs)
+
+                # 2ページ目以降はURLが分かっているので複数タブで並列に取得
+                # （再開時は最終ページが分からないため、空のページが出た時点で打ち切る）
+                tabs = await context_pool.get_tabs(pooled, min(self.pagination_tabs, len(page_numbers)))
+                pages = await self.fetch_pages_concurrently(tabs, page_numbers, fetch, stop_after=stop_after)
+                if self.page_sink is None:
+                    for page_jobs in pages:
+                        all_jobs.extend(page_jobs)
+
+            except Exception as e:
+                logger.error(f"Error in scrape_with_browser: {e}", exc_info=True)
+                # 状態が不明なコンテキストは再利用しない
+                pooled.mark_discard()
+            finally:
+                if exhausted_from:
+                    await notify(listener.pages_exhausted, keyword, area, min(exhausted_from))
 
-            # リソースブロッキングを適用（画像・動画・フォント等を無効化）
-            if hasattr(context, '_block_resources') and context._block_resources:
-                await context._setup_route_blocking(page)
+        return self.drop_known_stubs(all_jobs)
 
-            for page_num in range(1, max_pages + 1):
-                url = self.generate_search_url(keyword, area, page_num)
-                jobs = await self.scrape_page(page, url)
-                all_jobs.extend(jobs)
+    def drop_known_stubs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """増分クロールで抽出を省略した既知の求人の目印を除く"""
+        new_jobs = [job for job in jobs if not is_known_stub(job)]
+        if len(new_jobs) < len(jobs):
+            logger.info(f"Skipped {len(jobs) - len(new_jobs)} known jobs ({len(new_jobs)} new)")
+        return new_jobs
 
-                # パフォーマンス測定
-                self.performance_monitor.record_item(len(jobs))
+    async def detect_last_page(self, page: Page, first_page_count: int) -> Optional[int]:
+        """
+        1ページ目から最終ページ番号を求める（分からなければNone）
 
-                if not jobs:  # 求人が見つからなければ終了
-                    logger.info(f"No more jobs found at page {page_num}")
-                    break
+        selectors.json の pagination.last_page_selector（ページ番号ボタン）の最大値、
+        またはペイロードの総件数 ÷ 1ページ目の件数から求める。
+        """
+        selector = self.site_config.get("pagination", {}).get("last_page_selector")
+        if selector:
+            try:
+                texts = await page.eval_on_selector_all(selector, "els => els.map(el => el.innerText)")
+                numbers = [int(text.strip()) for text in texts if text and text.strip().isdigit()]
+                if numbers:
+                    return max(numbers)
+            except Exception as e:
+                logger.debug(f"Failed to read page buttons: {e}")
+
+        if self.payload_extractor and first_page_count:
+            try:
+                total = await self.payload_extractor.extract_total(page)
+            except Exception as e:
+                logger.debug(f"Failed to read total count from payload: {e}")
+                total = None
+            if total is not None:
+                return max(1, math.ceil(total / first_page_count))
 
-                # 次のページへ行く前に待機（短縮版）
-                wait_time = 0.5 + (asyncio.get_event_loop().time() % 0.5)  # 0.5-1.0秒
-                await asyncio.sleep(wait_time)
+        return None
 
-        except Exception as e:
-            logger.error(f"Error in scrape_with_browser: {e}", exc_info=True)
+    @asynccontextmanager
+    async def open_tabs(self, page: Page, count: int) -> AsyncIterator[List[Page]]:
+        """
+        page と同じコンテキストにタブを追加で開き、page を含む count 個のタブを使う（終了時に追加分を閉じる）
 
+        コンテキストに登録済みのリソースブロックは追加のタブにもそのまま効く。
+        """
+        extra_tabs: List[Page] = []
+        try:
+            for _ in range(max(0, count - 1)):
+                tab = await page.context.new_page()
+                await StealthConfig.apply_stealth_scripts(tab)
+                extra_tabs.append(tab)
+            yield [page] + extra_tabs
         finally:
-            await context.close()
+            for tab in extra_tabs:
+                try:
+                    await tab.close()
+                except Exception as e:
+                    logger.debug(f"Error closing tab: {e}")
 
-        return all_jobs
+    async def fetch_pages_concurrently(
+        self,
+        tabs: List[Page],
+        page_numbers: Sequence[int],
+        fetch: Callable[[Page, int], Awaitable[Optional[List[Dict[str, Any]]]]],
+        stop_after: Optional[Callable[[int, List[Dict[str, Any]]], Optional[int]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        ページを複数タブで並列に取得し、ページ順に返す
+
+        各タブは未取得のページ番号を小さい順に1つずつ取り、空（または失敗）のページが出たら
+        それより後のページは取得を始めず、結果からも除く。
+        ページ間の間隔は fetch 内のページ遷移が HostLimiter で調整されるため、ここでは待機しない。
+
+        Args:
+            tabs: 取得に使うタブ（タブ数が並列数になる）
+            page_numbers: 取得するページ番号（昇順）
+            fetch: (タブ, ページ番号) → 求人リスト（空・Noneで打ち切り）
+            stop_after: 打ち切り判定を置き換える関数。(ページ番号, 求人リスト) → これ以降を取得しない
+                        ページ番号（続ける場合はNone）。失敗（None）のページでは常に打ち切る
+        """
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        pending = iter(page_numbers)
+        stop_at = page_numbers[-1] + 1 if page_numbers else 0
+
+        async def worker(tab: Page):
+            nonlocal stop_at
+            for page_num in pending:
+                if page_num >= stop_at:
+                    break
+                page_jobs = await fetch(tab, page_num)
+                results[page_num] = page_jobs or []
+                if page_jobs is None or stop_after is None:
+                    limit = page_num if not page_jobs else None
+                else:
+                    limit = stop_after(page_num, page_jobs)
+                if limit is not None:
+                    logger.info(f"Stopping pagination before page {limit}")
+                    stop_at = min(stop_at, limit)
+                    if limit <= page_num + 1:
+                        break
+
+        await asyncio.gather(*[worker(tab) for tab in tabs])
+
+        ordered = []
+        for page_num in page_numbers:
+            if page_num >= stop_at:
+                break
+            ordered.append(results.get(page_num, []))
+        return ordered
 
     async def scrape(
         self,
@@ -279,7 +775,9 @@ class BaseScraper(ABC):
         areas: List[str],
         max_pages: int = 5,
         parallel: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        browser: Optional[Browser] = None,
+        combinations: Optional[List[Tuple[str, str]]] = None
     ) -> List[Dict[str, Any]]:
         """
         非同期並列スクレイピング
@@ -288,62 +786,160 @@ class BaseScraper(ABC):
             keywords: 検索キーワードリスト
             areas: 地域リスト
             max_pages: 各条件での最大ページ数
-            parallel: 並列数
+            parallel: 並列数（同時に使うコンテキスト数。サイトへのリクエスト間隔は HostLimiter が調整する）
+            browser: 起動済みのブラウザ（BrowserManagerの共有ブラウザ等）。
+                     省略時はこの呼び出しの間だけChromiumを起動する
+            combinations: (キーワード, 地域) の組み合わせ。省略時は keywords × areas の全て
         """
         # パフォーマンス測定開始
         self.performance_monitor.start()
 
-        all_results = []
-
         # 現在のフィルタを設定
         self.current_filters = filters or {}
 
-        async with async_playwright() as p:
-            # Stealth設定を適用してブラウザ起動
-            browser = await p.chromium.launch(**StealthConfig.get_launch_args())
+        if combinations is None:
+            combinations = [(keyword, area) for keyword in keywords for area in areas]
 
-            try:
-                # 全ての組み合わせのタスクを生成
-                tasks = []
-                for keyword in keywords:
-                    for area in areas:
-                        tasks.append(
-                            self.scrape_with_browser(browser, keyword, area, max_pages)
-                        )
-
-                # セマフォで並列数を制限
-                semaphore = asyncio.Semaphore(parallel)
-
-                async def limited_task(task):
-                    async with semaphore:
-                        return await task
-
-                # 並列実行
-                results = await asyncio.gather(
-                    *[limited_task(task) for task in tasks],
-                    return_exceptions=True
-                )
-
-                # 結果をマージ
-                for result in results:
-                    if isinstance(result, list):
-                        all_results.extend(result)
-                    elif isinstance(result, Exception):
-                        logger.error(f"Task failed: {result}")
-                        self.performance_monitor.record_error()
-
-            finally:
-                await browser.close()
+        if browser is not None:
+            all_results = await self._scrape_combinations(browser, combinations, max_pages, parallel)
+        else:
+            async with async_playwright() as p:
+                # Stealth設定を適用してブラウザ起動
+                browser = await p.chromium.launch(**StealthConfig.get_launch_args())
+                try:
+                    all_results = await self._scrape_combinations(browser, combinations, max_pages, parallel)
+                finally:
+                    await browser.close()
 
         self.results = all_results
 
         # パフォーマンス測定終了
         metrics = self.performance_monitor.finish()
         logger.info(f"Scraping completed: {metrics}")
+        logger.info(
+            f"Context setups: {metrics.context_setups} ({metrics.context_setup_seconds:.2f}s), "
+            f"reuses: {metrics.context_reuses} (~{metrics.context_setup_saved_seconds:.2f}s saved)"
+        )
+        logger.info(
+            f"Page waits: {metrics.page_waits} (avg {metrics.avg_page_wait_seconds:.2f}s, "
+            f"timeouts: {metrics.page_wait_timeouts}), "
+            f"blocked requests: {metrics.blocked_requests} "
+            f"(~{metrics.blocked_bytes_estimate / (1024 * 1024):.2f} MB estimated)"
+        )
+        host = self.host_limiter.host_of(self.site_config.get("base_url", ""))
+        rate_stats = self.host_limiter.get_stats().get(host)
+        if rate_stats:
+            logger.info(
+                f"Rate limit for {host}: {rate_stats['rate']:.2f} req/s "
+                f"({rate_stats['requests']} requests, {rate_stats['failures']} failures, "
+                f"{rate_stats['decreases']} slowdowns, waited {rate_stats['waited_seconds']:.1f}s)"
+            )
+        if self.response_cache:
+            logger.info(
+                f"Response cache: {metrics.cache_hits} hits, {metrics.cache_revalidations} revalidated, "
+                f"{metrics.cache_misses} misses (~{metrics.cache_bytes_saved / (1024 * 1024):.2f} MB saved)"
+            )
         logger.info(f"Error stats: {self.error_counter}")
 
         return all_results
 
+    async def iter_pages(
+        self,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int = 5,
+        parallel: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        browser: Optional[Browser] = None,
+        max_buffered_pages: int = 4,
+        combinations: Optional[List[Tuple[str, str]]] = None
+    ) -> AsyncIterator[PageBatch]:
+        """
+        scrape() と同じ条件でスクレイピングし、一覧ページを取得した順に1ページずつ返す
+
+        結果を全件溜めないため、メモリ使用量はクロールの規模によらない。
+        受け取り側が max_buffered_pages ページ分遅れるとページの取得を待たせる。
+        途中でイテレーションをやめた場合はスクレイピングも中断する。
+
+        使用例:
+            async for batch in scraper.iter_pages(["IT"], ["東京"], browser=browser):
+                save(batch.jobs)
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffered_pages))
+        finished = object()
+        error: List[BaseException] = []
+
+        async def produce():
+            try:
+                await self.scrape(keywords, areas, max_pages, parallel, filters, browser, combinations)
+            except Exception as e:
+                error.append(e)
+            # キャンセル時は受け取り側がいないので終端を入れない
+            await queue.put(finished)
+
+        self.page_sink = queue.put
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is finished:
+                    break
+                yield batch
+            if error:
+                raise error[0]
+        finally:
+            self.page_sink = None
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    async def _scrape_combinations(
+        self,
+        browser: Browser,
+        combinations: List[Tuple[str, str]],
+        max_pages: int,
+        parallel: int
+    ) -> List[Dict[str, Any]]:
+        """(キーワード, 地域) の組み合わせを並列にスクレイピング"""
+        all_results = []
+
+        # 並列数ぶんのコンテキストを用意し、組み合わせ間で使い回す
+        context_pool = ContextPool(
+            browser,
+            size=min(parallel, len(combinations)),
+            monitor=self.performance_monitor,
+            blocking_policy=self.blocking_policy
+        )
+
+        try:
+            await context_pool.start()
+
+            # 並列実行（同時に動く組み合わせの数はプールのコンテキスト数、
+            # サイトへのリクエストの間隔・同時数は HostLimiter で制限される）
+            results = await asyncio.gather(
+                *[
+                    self.scrape_with_browser(browser, keyword, area, max_pages, context_pool)
+                    for keyword, area in combinations
+                ],
+                return_exceptions=True
+            )
+
+            # 結果をマージ
+            for result in results:
+                if isinstance(result, list):
+                    all_results.extend(result)
+                elif isinstance(result, Exception):
+                    logger.error(f"Task failed: {result}")
+                    self.performance_monitor.record_error()
+
+        finally:
+            await context_pool.close()
+
+        return all_results
+
     @abstractmethod
     async def extract_detail_info(self, page: Page, url: str) -> Dict[str, Any]:
         """詳細ページから追加情報を取得（サイトごとに実装）"""
@@ -0,0 +1,110 @@
+"""
+求人カードの一括抽出
+カード内の各項目を要素ごとに query_selector → inner_text で取ると1件あたり十数回のIPCになるため、
+サイトのセレクタ群を1つのページ内JS関数にまとめ、全カード分を page.evaluate 1回で取得する
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from playwright.async_api import Page
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# ページ内で実行する抽出関数（セレクタは引数で渡すため、セレクタ中の引用符等をエスケープする必要はない）
+_EXTRACT_CARDS_JS = """
+(spec) => {
+    const cards = Array.from(document.querySelectorAll(spec.cards));
+    return cards.map((card) => {
+        const record = {};
+        for (const [name, selector, attr, includeSelf] of spec.fields) {
+            let value = null;
+            if (attr) {
+                if (includeSelf && card.hasAttribute(attr)) {
+                    value = card.getAttribute(attr);
+                } else if (selector) {
+                    const el = card.querySelector(selector);
+                    value = el ? el.getAttribute(attr) : null;
+                }
+            } else {
+                const el = includeSelf && card.matches(selector) ? card : card.querySelector(selector);
+                value = el ? el.innerText.trim() : null;
+            }
+            record[name] = value;
+        }
+        return record;
+    });
+}
+"""
+
+
+@dataclass
+class CardField:
+    """カード内の1項目の取得方法"""
+    # カード内の要素のセレクタ（attr指定かつ include_self のみの場合は None 可）
+    selector: Optional[str]
+    # 取得する属性名（None ならテキスト＝innerText）
+    attr: Optional[str] = None
+    # カード要素自身も対象にする（カード自体がリンクの場合など）
+    include_self: bool = False
+
+
+class CardExtractor:
+    """
+    サイトのカードセレクタから作る一括抽出器
+
+    使用例:
+        extractor = CardExtractor("[class*='jobCard']", {
+            "title": CardField("[class*='title__']"),
+            "url": CardField("a[href]", attr="href", include_self=True),
+        })
+        records = await extractor.extract(page)  # [{"title": ..., "url": ...}, ...]
+    """
+
+    def __init__(self, card_selector: str, fields: Dict[str, CardField]):
+        self.card_selector = card_selector
+        self.fields = fields
+        # page.evaluate に渡す引数（毎回組み立てないよう作成時に1回だけ作る）
+        self._spec = {
+            "cards": card_selector,
+            "fields": [
+                [name, field.selector, field.attr, field.include_self]
+                for name, field in fields.items()
+            ],
+        }
+
+    @classmethod
+    def from_selectors(cls, selectors: Dict[str, str]) -> Optional["CardExtractor"]:
+        """
+        selectors.json の selectors 定義から作成（job_cards が無ければ None）
+
+        detail_link はカード自身がリンクの場合もあるため、カード自身の href を優先する。
+        """
+        card_selector = selectors.get("job_cards")
+        if not card_selector:
+            return None
+
+        fields = {
+            name: CardField(selectors[name])
+            for name in ("title", "company", "location", "salary", "employment_type")
+            if selectors.get(name)
+        }
+        if selectors.get("detail_link"):
+            fields["url"] = CardField(selectors["detail_link"], attr="href", include_self=True)
+        return cls(card_selector, fields)
+
+    async def extract(self, page: Page) -> List[Dict[str, Optional[str]]]:
+        """ページ上の全カードの項目を1回の page.evaluate で取得（カードの並び順）"""
+        return await page.evaluate(_EXTRACT_CARDS_JS, self._spec)
+
+    async def extract_field(self, page: Page, name: str) -> List[Optional[str]]:
+        """全カードの1項目だけを取得（既知の求人かどうかの確認など、全項目が要らない場合）"""
+        field = self.fields.get(name)
+        if field is None:
+            return []
+        spec = {
+            "cards": self.card_selector,
+            "fields": [[name, field.selector, field.attr, field.include_self]],
+        }
+        records = await page.evaluate(_EXTRACT_CARDS_JS, spec)
+        return [record.get(name) for record in records]
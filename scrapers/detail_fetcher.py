@@ -0,0 +1,155 @@
+"""
+詳細ページの並列取得
+求人ごとの詳細ページを複数タブのワーカーで並列に取得し、取得できた順に求人データへ反映する
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+import logging
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from utils.retry import async_retry, RetryConfig
+from utils.performance import PerformanceMonitor
+from utils.host_limiter import HostLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class TransientDetailError(Exception):
+    """再試行で回復しうる詳細ページの取得失敗（HTTP 429・5xx 等）"""
+
+
+class DetailFetcher:
+    """
+    詳細ページ取得のワーカープール
+
+    タブ1つにつきワーカー1つが求人のキューから順に取り出して取得する。
+    1件ごとにタイムアウトを設け、タイムアウト・一時的なエラーは指数バックオフで再試行する。
+    取得は HostLimiter の枠内で行い、同じホストへの同時取得数と間隔はサイトの応答に合わせて調整される
+    （429・5xx・タイムアウトでは減速する）。
+
+    使用例:
+        fetcher = DetailFetcher(scraper.fetch_detail, monitor=monitor)
+        stats = await fetcher.run(tabs, jobs)  # jobs の各辞書に詳細が追加される
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Page, str], Awaitable[Dict[str, Any]]],
+        job_timeout: float = 45.0,
+        retry_config: Optional[RetryConfig] = None,
+        host_limiter: Optional[HostLimiter] = None,
+        monitor: Optional[PerformanceMonitor] = None
+    ):
+        """
+        Args:
+            fetch: (タブ, 詳細URL) → 詳細データ。一時的な失敗は例外で通知する
+            job_timeout: 1件あたりのタイムアウト（秒、再試行ごと）
+            retry_config: 再試行設定（対象の例外を含む）
+            host_limiter: ホストごとのレート制御
+            monitor: 取得件数・エラー・リトライを記録するモニター
+        """
+        self.fetch = fetch
+        self.job_timeout = job_timeout
+        self.retry_config = retry_config or RetryConfig(
+            max_attempts=3,
+            initial_delay=2.0,
+            max_delay=15.0,
+            exceptions=(PlaywrightTimeoutError, asyncio.TimeoutError, TransientDetailError)
+        )
+        self.host_limiter = host_limiter or HostLimiter.shared()
+        self.monitor = monitor
+
+        # 統計
+        self.fetched = 0
+        self.failed = 0
+        self.attempts = 0
+
+    async def run(
+        self,
+        tabs: List[Page],
+        jobs: List[Dict[str, Any]],
+        url_key: str = "page_url",
+        on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        jobs の詳細ページを tabs で並列に取得し、各求人の辞書に反映する
+
+        Args:
+            tabs: 取得に使うタブ（タブ数が並列数になる）
+            jobs: 求人データ（url_key に詳細URLを持つもの）
+            url_key: 詳細URLのキー
+            on_result: 1件反映するごとに (求人, 詳細データ) で呼ばれる
+
+        Returns:
+            統計情報
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, job in enumerate(jobs):
+            if job.get(url_key):
+                queue.put_nowait((index, job))
+        total = queue.qsize()
+        start = time.perf_counter()
+
+        async def worker(tab: Page):
+            while True:
+                try:
+                    index, job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                url = job[url_key]
+                logger.info(f"Fetching detail {index + 1}/{len(jobs)}: {url}")
+                try:
+                    detail = await self._fetch_with_retry(tab, url)
+                except Exception as e:
+                    self.failed += 1
+                    if self.monitor:
+                        self.monitor.record_error()
+                    logger.error(f"Error fetching detail for job {index + 1}: {e}")
+                else:
+                    # 取得できた順に反映
+                    job.update(detail)
+                    self.fetched += 1
+                    if self.monitor:
+                        self.monitor.record_item()
+                    if on_result:
+                        on_result(job, detail)
+
+        await asyncio.gather(*[worker(tab) for tab in tabs])
+
+        stats = self.get_stats()
+        stats["elapsed"] = round(time.perf_counter() - start, 2)
+        logger.info(
+            f"Detail pages: {self.fetched}/{total} fetched, {self.failed} failed, "
+            f"{self.attempts - self.fetched - self.failed} retries in {stats['elapsed']:.1f}s "
+            f"({len(tabs)} tabs)"
+        )
+        return stats
+
+    async def _fetch_with_retry(self, tab: Page, url: str) -> Dict[str, Any]:
+        """1件を取得（タイムアウト付き、一時的な失敗は再試行）"""
+        attempt = 0
+
+        @async_retry(self.retry_config)
+        async def fetch_once() -> Dict[str, Any]:
+            nonlocal attempt
+            attempt += 1
+            self.attempts += 1
+            if attempt > 1 and self.monitor:
+                self.monitor.record_retry()
+            async with self.host_limiter.slot(url):
+                return await asyncio.wait_for(self.fetch(tab, url), self.job_timeout)
+
+        return await fetch_once()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        return {
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "attempts": self.attempts,
+        }
@@ -20,7 +20,7 @@ class HelloworkScraper(BaseScraper):
         detail_data = {}
 
         try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await self.navigate(page, url, timeout=30000)
             await page.wait_for_timeout(1000)
 
             # ハローワークは公的機関なので詳細情報が充実
@@ -20,7 +20,7 @@ class IndeedScraper(BaseScraper):
         detail_data = {}
 
         try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await self.navigate(page, url, timeout=30000)
             await page.wait_for_timeout(1500)
 
             # 電話番号
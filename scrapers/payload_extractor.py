@@ -0,0 +1,300 @@
+"""
+Next.js ペイロードからの求人抽出
+Next.js製のサイトは画面に描画するデータを __NEXT_DATA__（Pages Router）や
+self.__next_f のフライトデータ（App Router）としてJSONのままページに埋め込んでいる。
+CSS Moduleのハッシュ付きクラス名を辿る代わりにこのJSONを直接読み、カードに出ない項目もまとめて取得する
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from playwright.async_api import Page
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# ページに埋め込まれたペイロードの生テキストを取得する（JSONの解析はPython側で行う）
+_READ_PAYLOAD_JS = """
+() => {
+    const el = document.getElementById('__NEXT_DATA__');
+    const chunks = Array.isArray(self.__next_f) ? self.__next_f : [];
+    return {
+        nextData: el ? el.textContent : null,
+        flight: chunks
+            .filter((chunk) => Array.isArray(chunk) && chunk[0] === 1 && typeof chunk[1] === 'string')
+            .map((chunk) => chunk[1])
+            .join(''),
+    };
+}
+"""
+
+# HTMLに埋め込まれたペイロード（描画せずにキャッシュ済みのHTMLから読む場合）
+_NEXT_DATA_SCRIPT = re.compile(
+    r"<script[^>]*\bid=[\"']__NEXT_DATA__[\"'][^>]*>(.*?)</script>", re.DOTALL | re.IGNORECASE
+)
+_FLIGHT_PUSH = re.compile(r"self\.__next_f\.push\((\[.*?\])\)\s*;?\s*</script>", re.DOTALL)
+
+# フライトデータの1行（"<16進ID>:<JSON>"）
+_FLIGHT_ROW = re.compile(r"^([0-9a-fA-F]+):(.*)$")
+
+# 値が辞書のときに表示用の文字列として使うキー
+_TEXT_KEYS = ("name", "label", "text", "value", "title")
+
+# カードに表示される項目（CardExtractor のレコードと同じキー）
+CARD_FIELDS = ("url", "title", "company", "salary", "location", "employment_type")
+
+
+def read_payload_html(html: str) -> Dict[str, Optional[str]]:
+    """HTMLの文字列から _READ_PAYLOAD_JS と同じ形の生テキストを取り出す"""
+    match = _NEXT_DATA_SCRIPT.search(html)
+    chunks = []
+    for push in _FLIGHT_PUSH.finditer(html):
+        try:
+            chunk = json.loads(push.group(1))
+        except ValueError:
+            continue
+        if isinstance(chunk, list) and len(chunk) > 1 and chunk[0] == 1 and isinstance(chunk[1], str):
+            chunks.append(chunk[1])
+    return {
+        "nextData": match.group(1) if match else None,
+        "flight": "".join(chunks),
+    }
+
+
+def parse_payload(raw: Dict[str, Optional[str]]) -> List[Any]:
+    """
+    _READ_PAYLOAD_JS の結果をJSONとして解析し、探索の起点となるオブジェクトのリストを返す
+
+    フライトデータはJSON以外の行（テキストチャンク・モジュール参照等）も含むため、
+    JSONとして読める行だけを使う。
+    """
+    roots: List[Any] = []
+
+    next_data = raw.get("nextData")
+    if next_data:
+        try:
+            roots.append(json.loads(next_data))
+        except ValueError as e:
+            logger.debug(f"Invalid __NEXT_DATA__ JSON: {e}")
+
+    for line in (raw.get("flight") or "").splitlines():
+        match = _FLIGHT_ROW.match(line)
+        if not match:
+            continue
+        body = match.group(2)
+        if not body or body[0] not in "[{":
+            continue
+        try:
+            roots.append(json.loads(body))
+        except ValueError:
+            continue
+
+    return roots
+
+
+def _lookup(obj: Dict[str, Any], key: str) -> Any:
+    """"employer.name" のようなドット区切りのキーで値を取得"""
+    value: Any = obj
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """ペイロードの値を文字列に変換（辞書は名前系のキー、リストは読点区切り）"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, dict):
+        for key in _TEXT_KEYS:
+            text = _to_text(value.get(key))
+            if text:
+                return text
+        return None
+    if isinstance(value, list):
+        texts = [text for text in map(_to_text, value) if text]
+        return "、".join(texts) or None
+    return None
+
+
+class NextPayloadExtractor:
+    """
+    Next.js のペイロードから求人レコードを取り出す抽出器
+
+    ペイロードの構造（どの階層に求人の配列があるか）には依存せず、全体を辿って
+    「ID・タイトルと、その他のカード項目を1つ以上持つオブジェクト」を求人とみなす。
+    各項目はキー名の候補リストで指定し、最初に見つかったキーの値を使う。
+    ナビゲーション・パンくず等の {id, title, url} だけのオブジェクトを拾わないよう、
+    id_pattern でIDの形式を、required_fields で必須のカード項目（いずれか1つ）を絞り込める。
+
+    返すレコードは CardExtractor と同じキー（url, title, company, ...）に、
+    求人ID（job_id）とカード外の項目をまとめた details を加えたもの。
+
+    使用例:
+        extractor = NextPayloadExtractor.from_config(site_config.get("next_payload"))
+        records = await extractor.extract(page)  # ペイロードがなければ []
+    """
+
+    def __init__(
+        self,
+        id_keys: Sequence[str],
+        fields: Dict[str, Sequence[str]],
+        detail_fields: Optional[Dict[str, Sequence[str]]] = None,
+        url_template: Optional[str] = None,
+        total_keys: Optional[Sequence[str]] = None,
+        id_pattern: Optional[str] = None,
+        url_id_pattern: Optional[str] = None,
+        required_fields: Optional[Sequence[str]] = None
+    ):
+        """
+        Args:
+            id_keys: 求人IDのキー候補
+            fields: カード項目名 → キー候補（title は必須）
+            detail_fields: カード外の項目名（jobs テーブルの入力キー）→ キー候補
+            url_template: URLがペイロードにない場合に求人IDから組み立てる書式（{id}）
+            total_keys: 検索結果の総件数のキー候補（ページ数の算出に使う）
+            id_pattern: 求人IDとみなす値の正規表現（全体一致。省略時は形式を問わない）
+            url_id_pattern: 詳細URLから求人IDを取り出す正規表現（1番目のグループがID）。
+                            IDのキーがない・id_pattern に合わない場合に使う
+            required_fields: 求人とみなすために1つ以上必要なカード項目（省略時は title 以外のいずれか）
+        """
+        self.id_keys = list(id_keys)
+        self.fields = {name: list(keys) for name, keys in fields.items()}
+        self.detail_fields = {name: list(keys) for name, keys in (detail_fields or {}).items()}
+        self.url_template = url_template
+        self.total_keys = list(total_keys or [])
+        self.id_pattern = re.compile(id_pattern) if id_pattern else None
+        self.url_id_pattern = re.compile(url_id_pattern) if url_id_pattern else None
+        self.required_fields = list(required_fields or [name for name in self.fields if name != "title"])
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["NextPayloadExtractor"]:
+        """selectors.json の next_payload 定義から作成（定義がなければ None）"""
+        if not config or not config.get("id_keys") or "title" not in config.get("fields", {}):
+            return None
+        return cls(
+            id_keys=config["id_keys"],
+            fields=config["fields"],
+            detail_fields=config.get("detail_fields"),
+            url_template=config.get("url_template"),
+            total_keys=config.get("total_keys"),
+            id_pattern=config.get("id_pattern"),
+            url_id_pattern=config.get("url_id_pattern"),
+            required_fields=config.get("required_fields"),
+        )
+
+    async def extract(self, page: Page) -> List[Dict[str, Any]]:
+        """ページのペイロードから求人レコードを取得（ペイロードがない・求人が見つからなければ空）"""
+        raw = await page.evaluate(_READ_PAYLOAD_JS)
+        if not raw or not (raw.get("nextData") or raw.get("flight")):
+            return []
+        return self.find_records(parse_payload(raw))
+
+    def extract_from_html(self, html: str) -> List[Dict[str, Any]]:
+        """HTMLの文字列に埋め込まれたペイロードから求人レコードを取得（ブラウザで描画しない）"""
+        raw = read_payload_html(html)
+        if not (raw.get("nextData") or raw.get("flight")):
+            return []
+        return self.find_records(parse_payload(raw))
+
+    async def extract_total(self, page: Page) -> Optional[int]:
+        """ページのペイロードから検索結果の総件数を取得（見つからなければNone）"""
+        if not self.total_keys:
+            return None
+        raw = await page.evaluate(_READ_PAYLOAD_JS)
+        if not raw or not (raw.get("nextData") or raw.get("flight")):
+            return None
+        return self.find_total(parse_payload(raw))
+
+    def find_total(self, roots: Iterable[Any]) -> Optional[int]:
+        """総件数のキー候補に最初に一致した整数値（求人オブジェクトの中は見ない）"""
+        stack = list(reversed(list(roots)))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if self._is_job(node):
+                    continue
+                for key in self.total_keys:
+                    value = node.get(key)
+                    if isinstance(value, bool):
+                        continue
+                    if isinstance(value, int) or (isinstance(value, str) and value.replace(",", "").isdigit()):
+                        return int(str(value).replace(",", ""))
+                stack.extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+        return None
+
+    def find_records(self, roots: Iterable[Any]) -> List[Dict[str, Any]]:
+        """解析済みのペイロードから求人レコードを出現順に取り出す（同じIDは最初の1件のみ）"""
+        records: List[Dict[str, Any]] = []
+        seen = set()
+        for obj in self._walk(roots):
+            record = self._to_record(obj)
+            if record is None:
+                continue
+            if record["job_id"] not in seen:
+                seen.add(record["job_id"])
+                records.append(record)
+        return records
+
+    def _walk(self, roots: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """全ての辞書を文書順に列挙（求人と判定された辞書の中までは辿らない）"""
+        stack = list(reversed(list(roots)))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if self._is_job(node):
+                    yield node
+                    continue
+                stack.extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+
+    def _first(self, obj: Dict[str, Any], keys: Sequence[str]) -> Optional[str]:
+        """キー候補のうち最初に値があるものを文字列で返す"""
+        for key in keys:
+            text = _to_text(_lookup(obj, key))
+            if text:
+                return text
+        return None
+
+    def _job_id(self, obj: Dict[str, Any]) -> Optional[str]:
+        """求人ID（IDのキーの値が id_pattern に合わなければ詳細URLから取り出す）"""
+        job_id = self._first(obj, self.id_keys)
+        if job_id and (self.id_pattern is None or self.id_pattern.fullmatch(job_id)):
+            return job_id
+        if self.url_id_pattern is not None:
+            match = self.url_id_pattern.search(self._first(obj, self.fields.get("url", [])) or "")
+            if match:
+                return match.group(1)
+        return None
+
+    def _is_job(self, obj: Dict[str, Any]) -> bool:
+        """求人オブジェクトか（ID・タイトルに加え、必須のカード項目を1つ以上持つ）"""
+        if not self._job_id(obj) or not self._first(obj, self.fields["title"]):
+            return False
+        return any(self._first(obj, self.fields.get(name, [])) for name in self.required_fields)
+
+    def _to_record(self, obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """求人オブジェクトをカードと同じキーのレコードに変換"""
+        job_id = self._job_id(obj)
+        if not job_id:
+            return None
+
+        record: Dict[str, Any] = {name: self._first(obj, self.fields.get(name, [])) for name in CARD_FIELDS}
+        if not record["url"] and self.url_template:
+            record["url"] = self.url_template.format(id=job_id)
+        record["job_id"] = job_id
+        record["details"] = {
+            name: value
+            for name, value in ((name, self._first(obj, keys)) for name, keys in self.detail_fields.items())
+            if value
+        }
+        return record
@@ -2,12 +2,17 @@
 タウンワーク専用スクレイパー
 2024年更新版 - 新しいサイト構造に対応
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
-from playwright.async_api import Page, Browser, TimeoutError as PlaywrightTimeoutError
-from .base_scraper import BaseScraper
+from playwright.async_api import Page, Browser
+from .base_scraper import BaseScraper, KnownPageTracker
+from .card_extractor import CardExtractor, CardField
+from .detail_fetcher import DetailFetcher, TransientDetailError
+from utils.page_utils import PageUtils, ReadyCondition
+from utils.host_limiter import report_result
 import logging
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +22,114 @@ class TownworkScraper(BaseScraper):
 
     def __init__(self):
         super().__init__(site_name="townwork")
+        # 詳細ページを同時に取得するタブ数
+        self.detail_tabs = 4
+        self.detail_ready_condition = ReadyCondition.from_site_config(
+            self.site_config, key="detail_ready", default_selector="body"
+        )
+
+    def _build_card_extractor(self) -> CardExtractor:
+        """タウンワークの求人カード用の一括抽出器（_extract_card_data と同じセレクタ）"""
+        return CardExtractor(
+            self.selectors.get("job_cards", "[class*='jobCard']"),
+            {
+                # カード自体がリンクの場合はその href、なければ内部のanchor
+                "url": CardField(
+                    "a[href*='jobid_'], a[href^='/jobid_'], a[href*='job/'], a[href]",
+                    attr="href",
+                    include_self=True
+                ),
+                "title": CardField("[class*='title__']"),
+                "company": CardField("[class*='employerName']"),
+                "salary": CardField("[class*='salaryText']"),
+                "location": CardField("[class*='accessText']"),
+                "employment_type": CardField("[class*='jobType']"),
+            }
+        )
+
+    def _absolute_url(self, href: str) -> str:
+        """相対URLを絶対URLに変換"""
+        if href.startswith("/"):
+            return f"https://townwork.net{href}"
+        return href
+
+    def job_id_from_url(self, url: str) -> Optional[str]:
+        """詳細URL（/jobid_xxx/）から求人IDを取得"""
+        match = re.search(r"jobid_([a-f0-9]+)", url)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _strip_access_prefix(text: str) -> str:
+        """先頭の「交通・アクセス」を除去"""
+        return re.sub(r"^交通・アクセス\s*", "", text)
+
+    def build_job_from_card(self, record: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """一括抽出したカードを extract_job_card と同じ形式に変換"""
+        job_data = {
+            "site": "タウンワーク",
+            "title": record.get("title") or "",
+            "company": record.get("company") or "",
+            "location": self._strip_access_prefix(record.get("location") or ""),
+            "salary": record.get("salary") or "",
+            "employment_type": record.get("employment_type") or "",
+            "url": "",
+        }
+
+        href = record.get("url")
+        if href:
+            href = self._absolute_url(href)
+            job_data["url"] = href
+
+            # 求人IDを抽出
+            match = re.search(r"jobid_([a-f0-9]+)", href)
+            if match:
+                job_data["job_id"] = match.group(1)
+
+        # ペイロード由来のレコード: URLから取れなければペイロードの求人ID、カード外の項目も追加
+        if record.get("job_id") and "job_id" not in job_data:
+            job_data["job_id"] = record["job_id"]
+        job_data.update(record.get("details") or {})
+
+        return job_data
+
+    def _card_record_to_data(self, record: Dict[str, Optional[str]]) -> Optional[Dict[str, Any]]:
+        """一括抽出したカードを _extract_card_data と同じ形式に変換（URLがなければNone）"""
+        href = record.get("url")
+        if not href:
+            return None
+
+        # クエリやフラグメントで差分が出ないよう正規化
+        href = self._normalize_url(self._absolute_url(href))
+        data = {"page_url": href}
+
+        # 求人IDを抽出
+        match = re.search(r"jobid_([a-f0-9]+)", href)
+        if match:
+            data["job_number"] = match.group(1)
+        elif record.get("job_id"):
+            data["job_number"] = record["job_id"]
+
+        for key, field in (("title", "title"), ("company_name", "company"),
+                           ("salary", "salary"), ("employment_type", "employment_type")):
+            if record.get(field) is not None:
+                data[key] = record[field]
+        if record.get("location") is not None:
+            data["location"] = self._strip_access_prefix(record["location"])
+        data.update(record.get("details") or {})
+
+        return data
+
+    def _records_to_data(self, records: List[Dict[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """一括抽出・ペイロードのレコードを変換（増分クロール時、既知の求人は目印にする）"""
+        jobs = []
+        for record, known in zip(records, self.known_flags(records)):
+            if known:
+                jobs.append(self.known_stub(record))
+                continue
+            job_data = self._card_record_to_data(record)
+            if job_data:
+                jobs.append(job_data)
+        return jobs
 
     async def extract_job_card(self, card_element, page: Page) -> Dict[str, Any]:
         """
@@ -109,105 +222,160 @@ class TownworkScraper(BaseScraper):
     async def search_jobs(self, page: Page, keyword: str, area: str, max_pages: int = 5) -> List[Dict[str, Any]]:
         """
         求人検索を実行し、結果を返す
+
+        1ページ目で最終ページを確認し、2ページ目以降は同じコンテキストの複数タブで並列に取得する。
+        増分クロールが有効なら、既知の求人だけのページが続いた時点で打ち切り、既知の求人は結果に含めない。
         """
         all_jobs = []
+        tracker = KnownPageTracker(self.known_pages_to_stop) if self.known_job_checker else None
 
-        for page_num in range(1, max_pages + 1):
-            url = self.generate_search_url(keyword, area, page_num)
-            logger.info(f"Fetching page {page_num}: {url}")
+        first_jobs = await self._search_page(page, self.generate_search_url(keyword, area, 1), 1)
+        if not first_jobs:
+            return all_jobs
+        all_jobs.extend(first_jobs)
 
-            success = False
-            # ページ取得・抽出をリトライ（最大2回）し、取りこぼしを減らす
-            for attempt in range(2):
-                try:
-                    response = await page.goto(
-                        url,
-                        wait_until="networkidle",
-                        timeout=30000 if attempt == 0 else 40000  # 2回目は少し長めに待つ
+        if tracker and tracker.record(1, first_jobs) is not None:
+            logger.info("No new jobs at page 1; stopping pagination")
+            return self.drop_known_stubs(all_jobs)
+
+        last_page = min(max_pages, await self.detect_last_page(page, len(first_jobs)) or max_pages)
+        if last_page < 2:
+            logger.info("No more pages available")
+            return self.drop_known_stubs(all_jobs)
+
+        async def fetch(tab: Page, page_num: int) -> Optional[List[Dict[str, Any]]]:
+            return await self._search_page(tab, self.generate_search_url(keyword, area, page_num), page_num)
+
+        async with self.open_tabs(page, min(self.pagination_tabs, last_page - 1)) as tabs:
+            pages = await self.fetch_pages_concurrently(
+                tabs, range(2, last_page + 1), fetch,
+                stop_after=tracker.record if tracker else None
+            )
+            for page_jobs in pages:
+                all_jobs.extend(page_jobs)
+
+        return self.drop_known_stubs(all_jobs)
+
+    async def _search_page(self, page: Page, url: str, page_num: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        検索結果の1ページを取得（ホストのレート制御の枠内で実行し、応答・タイムアウトをレートに反映）
+
+        Returns:
+            求人リスト（求人がなければ空）、取得に失敗した場合はNone
+        """
+        # 2ページ目以降はキャッシュ済みのページから読めればブラウザを使わない（1ページ目はページ番号を読むため開く）
+        if page_num > 1:
+            records = self.cached_payload_records(url)
+            if records:
+                return self._records_to_data(records)
+
+        logger.info(f"Fetching page {page_num}: {url}")
+        # ページ取得・抽出をリトライ（最大2回）し、取りこぼしを減らす
+        # 試行ごとに枠を取り直すため、やり直しもトークンを消費し、直前の失敗による減速・クールダウンを待つ
+        for attempt in range(2):
+            async with self.host_limiter.slot(url):
+                retry, jobs = await self._search_page_attempt(page, url, page_num, attempt)
+            if not retry:
+                return jobs
+
+        return None
+
+    async def _search_page_attempt(
+        self, page: Page, url: str, page_num: int, attempt: int
+    ) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+        """
+        検索結果の1ページを1回取得（host_limiter.slot の中で呼ぶ）
+
+        Returns:
+            (もう一度やり直すか, 求人リスト（求人がなければ空）、取得に失敗した場合はNone)
+        """
+        try:
+            # 読み込み後はnetworkidleではなくサイトの準備完了条件で待つ
+            start = time.perf_counter()
+            async with self.cache_route(page, url, "listing"):
+                response = await page.goto(
+                    url,
+                    wait_until="domcontentloaded",
+                    timeout=30000 if attempt == 0 else 40000  # 2回目は少し長めに待つ
+                )
+            report_result(
+                status=response.status if response else None,
+                latency=time.perf_counter() - start
+            )
+
+            if response and response.status == 404:
+                logger.warning(f"Page not found: {url}")
+                return False, None
+
+            card_selector = self.selectors.get("job_cards", "[class*='jobCard']")
+            ready = await PageUtils.wait_until_ready(page, self.ready_condition, self.performance_monitor)
+
+            # ペイロードに求人があればカードの描画を待たずにそこから抽出
+            job_cards = await self.extract_payload_records(page)
+            from_payload = bool(job_cards)
+
+            if not from_payload:
+                # ペイロードはあったが求人が見つからない場合はカードの描画を待つ
+                if ready == "payload":
+                    ready = await PageUtils.wait_until_ready(
+                        page, self.ready_condition.without_payload(), self.performance_monitor
                     )
 
-                    if response and response.status == 404:
-                        logger.warning(f"Page not found: {url}")
-                        break
-
-                    card_selector = self.selectors.get("job_cards", "[class*='jobCard']")
-
-                    # カードが描画されるまで数回リトライし、描画遅延による取りこぼしを減らす
-                    selector_ready = False
-                    for sel_attempt in range(4):
-                        try:
-                            await page.wait_for_selector(card_selector, timeout=2000 + 500 * sel_attempt)
-                            selector_ready = True
-                            break
-                        except PlaywrightTimeoutError:
-                            logger.warning(
-                                f"Job cards selector timeout on page {page_num} (attempt {sel_attempt + 1}/4). Retrying after short wait."
-                            )
-                            await page.wait_for_timeout(600 + 200 * sel_attempt)
-
-                    if not selector_ready:
-                        logger.warning(
-                            f"Job cards selector not ready on page {page_num}; attempt {attempt + 1}/2. Retrying page if attempts remain."
-                        )
-                        if attempt == 0:
-                            continue  # もう一度このページをやり直す
-
-                    # 求人カードを取得
-                    job_cards = await page.query_selector_all(card_selector)
-
-                    # 0件の場合は短い待機のあと再取得（描画遅延対策）
-                    if len(job_cards) == 0:
-                        await page.wait_for_timeout(1000)
-                        job_cards = await page.query_selector_all(card_selector)
-
-                    # それでも0件なら別のリトライ機会があればやり直す
-                    if len(job_cards) == 0:
-                        logger.warning(f"No job cards found on page {page_num} (attempt {attempt + 1}/2).")
-                        if attempt == 0:
-                            await page.wait_for_timeout(1200)
-                            continue
-                        else:
-                            logger.info(f"No jobs on page {page_num} after retries; stopping.")
-                            success = True  # これ以上ないので終了扱い
-                            break
-
-                    logger.info(f"Found {len(job_cards)} jobs on page {page_num} (attempt {attempt + 1})")
-
-                    for card in job_cards:
-                        try:
-                            job_data = await self._extract_card_data(card)
-                            if job_data:
-                                all_jobs.append(job_data)
-                        except Exception as e:
-                            logger.error(f"Error extracting job card: {e}")
-                            continue
-
-                    success = True
-                    break  # ページ処理成功
+                # 増分クロールで全カードが既知なら項目は抽出しない
+                if ready:
+                    known = await self.known_cards_only(page)
+                    if known:
+                        return False, known
+
+                if not ready:
+                    # ブロックされていれば（減速したうえで）このページは諦める
+                    if (await PageUtils.check_for_block(page))["is_blocked"]:
+                        logger.error(f"Access blocked on page {page_num}: {url}")
+                        return False, None
+                    logger.warning(
+                        f"Job cards not ready on page {page_num}; attempt {attempt + 1}/2. Retrying page if attempts remain."
+                    )
+                    if attempt == 0:
+                        return True, None  # もう一度このページをやり直す
 
-                except Exception as e:
-                    logger.error(f"Error fetching page {page_num} (attempt {attempt + 1}/2): {e}")
+                # 求人カードを取得
+                job_cards = await self._fetch_cards(page, card_selector)
+
+                # 0件なら別のリトライ機会があればやり直す
+                if len(job_cards) == 0:
+                    logger.warning(f"No job cards found on page {page_num} (attempt {attempt + 1}/2).")
                     if attempt == 0:
-                        await page.wait_for_timeout(1500)
-                        continue
-                    else:
-                        break
-
-            if not success:
-                break
-
-            # 次のページがあるか確認（見えなくても最大ページ数までは試行し、取りこぼしを減らす）
-            next_page = await page.query_selector(f"[class*='pageButton']:has-text('{page_num + 1}')")
-            if not next_page and page_num < max_pages:
-                logger.warning(
-                    f"Next page button not found for page {page_num}, but continuing to page {page_num + 1} to avoid missing results."
-                )
-                continue
-            if not next_page:
-                logger.info("No more pages available")
-                break
+                        return True, None
+                    logger.info(f"No jobs on page {page_num} after retries; stopping.")
+                    return False, []
+
+            logger.info(f"Found {len(job_cards)} jobs on page {page_num} (attempt {attempt + 1})")
 
-        return all_jobs
+            if from_payload or self.batch_extraction:
+                return False, self._records_to_data(job_cards)
+
+            jobs = []
+            for card in job_cards:
+                try:
+                    job_data = await self._extract_card_data(card)
+                    if job_data:
+                        jobs.append(job_data)
+                except Exception as e:
+                    logger.error(f"Error extracting job card: {e}")
+                    continue
+            return False, jobs
+
+        except Exception as e:
+            # 待ち時間は固定せず、失敗による減速（次の試行の枠）に任せる
+            logger.error(f"Error fetching page {page_num} (attempt {attempt + 1}/2): {e}")
+            report_result(error=True)
+            return attempt == 0, None
+
+    async def _fetch_cards(self, page: Page, card_selector: str) -> List[Any]:
+        """一覧ページのカードを取得（一括抽出時は項目の辞書、従来方式では要素ハンドル）"""
+        if self.batch_extraction:
+            return await self.card_extractor.extract(page)
+        return await page.query_selector_all(card_selector)
 
     async def _extract_card_data(self, card) -> Optional[Dict[str, Any]]:
         """
@@ -292,13 +460,42 @@ class TownworkScraper(BaseScraper):
         - 求人番号
         - 事業内容
         - 従業員数
+
+        ブラウザの失敗は例外にせずログに残して空の辞書を返す（再試行が必要な場合は fetch_detail を使う）
+        """
+        try:
+            async with self.host_limiter.slot(url):
+                return await self.fetch_detail(page, url)
+        except Exception as e:
+            logger.error(f"Error extracting detail info from {url}: {e}")
+            return {}
+
+    async def fetch_detail(self, page: Page, url: str) -> Dict[str, Any]:
         """
+        詳細ページを開いて追加情報を取得
+
+        タイムアウト・HTTP 429/5xx は例外で通知する（DetailFetcher が再試行する）。
+        HostLimiter の枠内で呼ぶこと（DetailFetcher・extract_detail_info が枠を確保する）。
+        """
+        # networkidle・固定待機ではなく詳細ページの準備完了条件で待つ
+        start = time.perf_counter()
+        async with self.cache_route(page, url, "detail"):
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        report_result(status=response.status if response else None, latency=time.perf_counter() - start)
+        if response and (response.status == 429 or response.status >= 500):
+            raise TransientDetailError(f"HTTP {response.status} for {url}")
+        if response and response.status >= 400:
+            logger.warning(f"HTTP {response.status} for detail page: {url}")
+            return {}
+
+        await PageUtils.wait_until_ready(page, self.detail_ready_condition, self.performance_monitor)
+        return await self._parse_detail_page(page)
+
+    async def _parse_detail_page(self, page: Page) -> Dict[str, Any]:
+        """表示中の詳細ページの本文から各項目を抽出"""
         detail_data = {}
 
         try:
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            await page.wait_for_timeout(2000)
-
             # ページ全体のテキストを取得して解析
             body_text = await page.inner_text("body")
 
@@ -360,7 +557,8 @@ class TownworkScraper(BaseScraper):
                 detail_data["qualifications"] = qualification_match.group(1).strip()[:300]
 
         except Exception as e:
-            logger.error(f"Error extracting detail info from {url}: {e}")
+            # 取得できた項目までは返す
+            logger.error(f"Error parsing detail page {page.url}: {e}")
 
         return detail_data
 
@@ -375,15 +573,13 @@ class TownworkScraper(BaseScraper):
         if not fetch_details:
             return jobs
 
-        # 各求人の詳細情報を取得
-        for i, job in enumerate(jobs):
-            if job.get("page_url"):
-                logger.info(f"Fetching detail {i+1}/{len(jobs)}: {job['page_url']}")
-                try:
-                    detail_data = await self.extract_detail_info(page, job["page_url"])
-                    job.update(detail_data)
-                    await page.wait_for_timeout(1000)  # サーバーに負荷をかけないよう待機
-                except Exception as e:
-                    logger.error(f"Error fetching detail for job {i+1}: {e}")
+        # 各求人の詳細情報を複数タブで並列に取得し、取得できた順に反映
+        fetcher = DetailFetcher(
+            self.fetch_detail,
+            host_limiter=self.host_limiter,
+            monitor=self.performance_monitor
+        )
+        async with self.open_tabs(page, self.detail_tabs) as tabs:
+            await fetcher.run(tabs, jobs)
 
         return jobs
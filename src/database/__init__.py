@@ -1,5 +1,8 @@
 # Database module
 from .db_manager import DatabaseManager
-from .job_repository import JobRepository
+from .job_repository import JobRepository, BulkSaveResult
+from .retention import RetentionManager, RetentionResult
+from .frontier_repository import FrontierRepository, CrawlRun
 
-__all__ = ['DatabaseManager', 'JobRepository']
+__all__ = ['DatabaseManager', 'JobRepository', 'BulkSaveResult', 'RetentionManager', 'RetentionResult',
+           'FrontierRepository', 'CrawlRun']
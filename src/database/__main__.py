@@ -0,0 +1,61 @@
+"""
+DBメンテナンス用CLI
+
+使い方:
+    python -m src.database stats [--db data/db/jobs.db]
+    python -m src.database rebuild-stats [--db data/db/jobs.db]
+    python -m src.database rebuild-search [--db data/db/jobs.db]
+    python -m src.database purge [--days 90] [--archive-dir data/archive] [--archive-format jsonl]
+    python -m src.database vacuum [--convert] [--db data/db/jobs.db]
+"""
+import argparse
+import json
+import logging
+from dataclasses import asdict
+
+from .db_manager import DatabaseManager
+from .retention import ARCHIVE_FORMATS, RetentionManager
+
+
+def main():
+    """DBメンテナンス用CLI"""
+    parser = argparse.ArgumentParser(description="Job database maintenance")
+    parser.add_argument("command", choices=["stats", "rebuild-stats", "rebuild-search", "purge", "vacuum"])
+    parser.add_argument("--db", default="data/db/jobs.db", help="DBファイルのパス")
+    parser.add_argument("--days", type=int, default=90, help="purge: 保持日数")
+    parser.add_argument("--chunk-size", type=int, default=RetentionManager.DEFAULT_CHUNK_SIZE,
+                        help="purge: 1トランザクションで削除する件数")
+    parser.add_argument("--archive-dir", help="purge: 削除前に月別ファイルへ書き出すディレクトリ")
+    parser.add_argument("--archive-format", choices=ARCHIVE_FORMATS, default="jsonl")
+    parser.add_argument("--no-vacuum", action="store_true", help="purge: 空き領域を解放しない")
+    parser.add_argument("--convert", action="store_true",
+                        help="vacuum: 既存DBを auto_vacuum=INCREMENTAL に切り替える（VACUUMでファイル全体を作り直す）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = DatabaseManager(args.db)
+    try:
+        if args.command == "purge":
+            stats = asdict(RetentionManager(db).purge(
+                days=args.days,
+                chunk_size=args.chunk_size,
+                archive_dir=args.archive_dir,
+                archive_format=args.archive_format,
+                vacuum=not args.no_vacuum,
+            ))
+        elif args.command == "vacuum":
+            converted = db.convert_to_incremental_vacuum() if args.convert else False
+            stats = {"converted": converted, "freed_pages": db.incremental_vacuum()}
+        elif args.command == "rebuild-stats":
+            stats = db.rebuild_job_stats()
+        elif args.command == "rebuild-search":
+            stats = {"indexed": db.rebuild_search_index()}
+        else:
+            stats = db.get_db_stats()
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
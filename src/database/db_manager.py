@@ -3,27 +3,66 @@ SQLiteデータベース管理
 要件定義 12.2 主要テーブル定義に準拠
 """
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import logging
 
+from .migrations import apply_migrations, normalize_search_text, rebuild_job_stats, rebuild_jobs_fts
+
 logger = logging.getLogger(__name__)
 
 
 class DatabaseManager:
     """SQLiteデータベース管理クラス"""
 
+    # スキーマ検査済みのDBパス（プロセス内で共有し、検査はパスごとに1回だけ行う）
+    _schema_ready: Set[str] = set()
+    _schema_lock = threading.Lock()
+
+    # DBパスごとの書き込みロック（プロセス内の書き込みを1本に直列化する）
+    _write_locks: Dict[str, threading.Lock] = {}
+
+    # 接続ごとに設定するPRAGMA
+    CONNECTION_PRAGMAS = (
+        "PRAGMA busy_timeout = 5000",   # 他プロセスのロック解除を最大5秒待つ
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -20000",   # 約20MB（負値はKiB単位）
+        "PRAGMA mmap_size = 268435456",  # 256MB
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    # 書き込みロック取得（BEGIN IMMEDIATE）のリトライ設定
+    WRITE_RETRY_ATTEMPTS = 5
+    WRITE_RETRY_INITIAL_DELAY = 0.1
+
+    # この回数コミットするごとにWALをチェックポイントする
+    CHECKPOINT_INTERVAL = 100
+
     def __init__(self, db_path: str = "data/db/jobs.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        # DBが消されても再生成できるよう、初期化状態を持たない（接続時に検査する）
+        # スレッドごとに長寿命の接続を保持する
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._source_ids: Dict[str, int] = {}
+        self._commits_since_checkpoint = 0
+        with DatabaseManager._schema_lock:
+            self._write_lock = DatabaseManager._write_locks.setdefault(self._schema_key, threading.Lock())
         self._init_database()
 
+    @property
+    def _schema_key(self) -> str:
+        return str(self.db_path.resolve())
+
     def _init_database(self):
         """データベースを初期化"""
-        with self.get_connection() as conn:
-            self._ensure_schema(conn)
-            logger.info(f"Database initialized: {self.db_path}")
+        self.get_connection()
+        logger.info(f"Database initialized: {self.db_path}")
 
     def _insert_default_sources(self, cursor):
         """デフォルトの媒体マスタを登録"""
@@ -48,162 +87,311 @@ class DatabaseManager:
             """, (name, display_name, base_url, is_active, priority))
 
     def get_connection(self) -> sqlite3.Connection:
-        """データベース接続を取得"""
-        conn = sqlite3.connect(str(self.db_path))
+        """
+        データベース接続を取得
+
+        スレッドごとに1本の接続を使い回す。`with` で使うとコミット／ロールバックのみ行い、
+        接続自体は閉じない（sqlite3.Connectionのコンテキストマネージャ仕様）。
+        """
+        # DBファイルが消された場合は接続とスキーマ検査状態を捨てて作り直す
+        if not self.db_path.exists():
+            self._reset_connections()
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+
+        if self._schema_key not in DatabaseManager._schema_ready:
+            with DatabaseManager._schema_lock:
+                if self._schema_key not in DatabaseManager._schema_ready:
+                    self._ensure_schema(conn)
+                    DatabaseManager._schema_ready.add(self._schema_key)
+
+        return conn
+
+    def get_read_connection(self) -> sqlite3.Connection:
+        """
+        読み取り専用の接続を取得（検索・集計用）
+
+        WALモードでは読み取りは書き込み中でもブロックされず、直近にコミットされた内容を読む。
+        書き込み系の接続とは別に、スレッドごとに1本を使い回す。
+        """
+        if not self.db_path.exists() or self._schema_key not in DatabaseManager._schema_ready:
+            # DBの再作成・スキーマ検査は書き込み用接続で行う
+            self.get_connection()
+
+        conn = getattr(self._local, "read_conn", None)
+        if conn is None:
+            conn = self._open_connection(read_only=True)
+            self._local.read_conn = conn
+        return conn
+
+    @contextmanager
+    def write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        書き込みトランザクション
+
+        プロセス内の書き込みはDBごとのロックで1本に直列化し、BEGIN IMMEDIATEで
+        先に書き込みロックを取る（他プロセスと競合した場合はバックオフしてリトライ）。
+        正常終了でコミット、例外でロールバック。同一スレッド内で入れ子にした場合は
+        外側のトランザクションにまとめる。
+
+        使用例:
+            with db.write_transaction() as conn:
+                conn.execute("UPDATE ...")
+        """
+        conn = self.get_connection()
+
+        depth = getattr(self._local, "write_depth", 0)
+        if depth:
+            self._local.write_depth = depth + 1
+            try:
+                yield conn
+            finally:
+                self._local.write_depth = depth
+            return
+
+        with self._write_lock:
+            self._begin_immediate(conn)
+            self._local.write_depth = 1
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.write_depth = 0
+
+            self._commits_since_checkpoint += 1
+            if self._commits_since_checkpoint >= self.CHECKPOINT_INTERVAL:
+                self.checkpoint()
+
+    def _begin_immediate(self, conn: sqlite3.Connection):
+        """書き込みロックを取得（busy_timeoutを超えてロックされていればリトライ）"""
+        delay = self.WRITE_RETRY_INITIAL_DELAY
+        for attempt in range(1, self.WRITE_RETRY_ATTEMPTS + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                if "locked" not in message and "busy" not in message:
+                    raise
+                if attempt == self.WRITE_RETRY_ATTEMPTS:
+                    logger.error(f"Failed to acquire write lock after {attempt} attempts: {e}")
+                    raise
+                logger.warning(
+                    f"Database busy (attempt {attempt}/{self.WRITE_RETRY_ATTEMPTS}). Retrying in {delay:.1f}s..."
+                )
+                time.sleep(delay)
+                delay *= 2
+
+    def checkpoint(self, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        """
+        WALの内容をDB本体に書き戻す
+
+        Args:
+            mode: PASSIVE（読み取り中の接続を待たない）/ FULL / RESTART / TRUNCATE（WALファイルを空にする）
+
+        Returns:
+            (busy, WALのフレーム数, 書き戻したフレーム数)
+        """
+        mode = mode.upper()
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+
+        self._commits_since_checkpoint = 0
+        row = self.get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        logger.debug(f"WAL checkpoint ({mode}): {tuple(row)}")
+        return tuple(row)
+
+    def incremental_vacuum(self, max_pages: Optional[int] = None) -> int:
+        """
+        削除で空いたページをDBファイルから解放する
+
+        auto_vacuum = INCREMENTAL でないDB（この設定以前に作成したもの）では何もしない
+        （切り替えは convert_to_incremental_vacuum で明示的に行う）。
+
+        Args:
+            max_pages: 解放する最大ページ数（Noneなら全て）
+
+        Returns:
+            解放したページ数
+        """
+        conn = self.get_connection()
+        with self._write_lock:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logger.info(
+                    f"Skipping incremental vacuum: auto_vacuum is not INCREMENTAL for {self.db_path} "
+                    f"(convert once with: python -m src.database vacuum --convert)"
+                )
+                return 0
+
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # execute() は1ステップ（1ページ）しか進めないため、最後まで実行する executescript を使う
+            conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages) if max_pages else 0});")
+            freed = before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        # WALモードではチェックポイントでDB本体に書き戻した時点でファイルが縮む
+        self.checkpoint("TRUNCATE")
+        logger.debug(f"Incremental vacuum freed {freed} pages: {self.db_path}")
+        return freed
+
+    def convert_to_incremental_vacuum(self) -> bool:
+        """
+        DBを auto_vacuum = INCREMENTAL に切り替える（メンテナンス用）
+
+        VACUUM でファイル全体を作り直すため、DBサイズに比例して時間がかかり、その間は書き込みできない。
+        クロール・スケジューラーを止めてから実行する。
+
+        Returns:
+            切り替えた場合True（切り替え済みならFalse）
+        """
+        conn = self.get_connection()
+        with self._write_lock:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            logger.info(f"Converting database to incremental auto_vacuum (VACUUM): {self.db_path}")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+
+        self.checkpoint("TRUNCATE")
+        return True
+
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """新しい接続を開いてPRAGMAを設定"""
+        # 接続はスレッドごとに分けて使うが、close()を任意のスレッドから呼べるようにする
+        if read_only:
+            uri = self.db_path.resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         conn.row_factory = sqlite3.Row
-        # DBファイルが消された場合でも接続時にスキーマを作成
-        self._ensure_schema(conn)
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._connections_lock:
+            self._connections.append(conn)
         return conn
 
+    def _reset_connections(self):
+        """保持している全接続を閉じ、スキーマ検査状態をリセット"""
+        self.close()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with DatabaseManager._schema_lock:
+            DatabaseManager._schema_ready.discard(self._schema_key)
+
+    def close(self):
+        """保持している全接続を閉じる（アプリ終了時などに呼ぶ）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self.db_path.exists():
+            try:
+                # 終了時はWALを空にしておく
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                logger.debug(f"Checkpoint on close skipped: {e}")
+
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self._source_ids.clear()
+
     def _ensure_schema(self, conn: sqlite3.Connection):
-        """スキーマが無ければ作成（毎回呼んでも冪等）"""
-        cursor = conn.cursor()
+        """スキーマを最新バージョンまでマイグレーション（プロセス内でDBごとに1回だけ呼ばれる）"""
+        # auto_vacuum はテーブル作成前にしか設定できないため、新規DBの場合だけ設定する
+        if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+        # WALはDBファイルに永続化されるため初回だけ設定すればよい
+        conn.execute("PRAGMA journal_mode = WAL")
 
-        # 媒体マスタテーブル
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name VARCHAR(50) NOT NULL UNIQUE,
-                display_name VARCHAR(100),
-                base_url VARCHAR(200),
-                is_active BOOLEAN DEFAULT 1,
-                priority INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # 求人情報テーブル
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id VARCHAR(100) NOT NULL,
-                source_id INTEGER NOT NULL,
-                company_name VARCHAR(200) NOT NULL,
-                company_name_kana VARCHAR(200),
-                postal_code VARCHAR(8),
-                address_pref VARCHAR(10),
-                address_city VARCHAR(50),
-                address_detail VARCHAR(200),
-                phone_number VARCHAR(20),
-                phone_number_normalized VARCHAR(15),
-                fax_number VARCHAR(20),
-                job_title VARCHAR(200) NOT NULL,
-                employment_type VARCHAR(50),
-                salary VARCHAR(100),
-                salary_min INTEGER,
-                salary_max INTEGER,
-                working_hours VARCHAR(200),
-                holidays VARCHAR(500),
-                work_location VARCHAR(500),
-                business_description TEXT,
-                job_description TEXT,
-                requirements TEXT,
-                hiring_count INTEGER,
-                contact_person VARCHAR(100),
-                contact_email VARCHAR(200),
-                page_url VARCHAR(500) NOT NULL,
-                employee_count INTEGER,
-                established_year INTEGER,
-                capital BIGINT,
-                posted_date DATE,
-                expire_date DATE,
-                crawled_at DATETIME NOT NULL,
-                updated_at DATETIME NOT NULL,
-                is_new BOOLEAN DEFAULT 1,
-                is_filtered BOOLEAN DEFAULT 0,
-                filter_reason VARCHAR(100),
-                UNIQUE(source_id, job_id),
-                FOREIGN KEY (source_id) REFERENCES sources(id)
-            )
-        """)
-
-        # クロールログテーブル
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS crawl_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_id INTEGER NOT NULL,
-                keyword VARCHAR(100),
-                area VARCHAR(100),
-                status VARCHAR(20) NOT NULL,
-                total_count INTEGER DEFAULT 0,
-                new_count INTEGER DEFAULT 0,
-                error_message TEXT,
-                started_at DATETIME,
-                finished_at DATETIME,
-                FOREIGN KEY (source_id) REFERENCES sources(id)
-            )
-        """)
-
-        # 検索条件保存テーブル
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS search_conditions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name VARCHAR(100) NOT NULL,
-                conditions TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # インデックス作成
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_phone ON jobs(phone_number_normalized)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_crawled ON jobs(crawled_at)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_pref ON jobs(address_pref)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_name)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_new ON jobs(is_new)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_filtered ON jobs(is_filtered)")
+        version = apply_migrations(conn)
 
         # デフォルト媒体を登録
+        cursor = conn.cursor()
         self._insert_default_sources(cursor)
-
         conn.commit()
 
-    def get_source_id(self, source_name: str) -> int:
-        """媒体名からIDを取得"""
-        with self.get_connection() as conn:
+        logger.debug(f"Schema ready (version {version}): {self.db_path}")
+
+    def get_source_id(self, source_name: str) -> Optional[int]:
+        """媒体名からIDを取得（媒体マスタは実行中に変わらないためキャッシュする）"""
+        if source_name in self._source_ids:
+            return self._source_ids[source_name]
+
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM sources WHERE name = ?", (source_name,))
             row = cursor.fetchone()
-            return row['id'] if row else None
+
+        if not row:
+            return None
+        self._source_ids[source_name] = row['id']
+        return row['id']
 
     def get_all_sources(self) -> list:
         """全媒体を取得"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM sources ORDER BY priority")
             return [dict(row) for row in cursor.fetchall()]
 
     def get_db_stats(self) -> dict:
-        """データベース統計を取得"""
-        with self.get_connection() as conn:
+        """
+        データベース統計を取得
+
+        件数は job_stats（トリガーで差分更新される集計表）から読むため、求人数によらず媒体数ぶんの行しか読まない。
+        """
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
 
             stats = {}
 
-            # 総求人数
-            cursor.execute("SELECT COUNT(*) as count FROM jobs")
-            stats['total_jobs'] = cursor.fetchone()['count']
-
-            # 新着数
-            cursor.execute("SELECT COUNT(*) as count FROM jobs WHERE is_new = 1")
-            stats['new_jobs'] = cursor.fetchone()['count']
-
-            # フィルタ済み数
-            cursor.execute("SELECT COUNT(*) as count FROM jobs WHERE is_filtered = 1")
-            stats['filtered_jobs'] = cursor.fetchone()['count']
+            # 総求人数・新着数・フィルタ済み数
+            cursor.execute("""
+                SELECT
+                    IFNULL(SUM(total_count), 0) as total_jobs,
+                    IFNULL(SUM(new_count), 0) as new_jobs,
+                    IFNULL(SUM(filtered_count), 0) as filtered_jobs
+                FROM job_stats
+            """)
+            row = cursor.fetchone()
+            stats['total_jobs'] = row['total_jobs']
+            stats['new_jobs'] = row['new_jobs']
+            stats['filtered_jobs'] = row['filtered_jobs']
 
             # 媒体別件数
             cursor.execute("""
-                SELECT s.display_name, COUNT(j.id) as count
+                SELECT s.display_name, IFNULL(js.total_count, 0) as count
                 FROM sources s
-                LEFT JOIN jobs j ON s.id = j.source_id
-                GROUP BY s.id
+                LEFT JOIN job_stats js ON s.id = js.source_id
                 ORDER BY s.priority
             """)
             stats['by_source'] = {row['display_name']: row['count'] for row in cursor.fetchall()}
 
-            # DBファイルサイズ
-            stats['db_size_mb'] = self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0
+            # DBファイルサイズ（WALモードではチェックポイントまでの書き込みが -wal ファイルにあるため合算する）
+            wal_path = self.db_path.with_name(self.db_path.name + "-wal")
+            size = sum(path.stat().st_size for path in (self.db_path, wal_path) if path.exists())
+            stats['db_size_mb'] = size / (1024 * 1024)
 
             return stats
+
+    def rebuild_job_stats(self) -> dict:
+        """集計表 job_stats を jobs から再集計し、再集計後の統計を返す"""
+        with self.write_transaction() as conn:
+            rebuild_job_stats(conn.cursor())
+        logger.info("job_stats rebuilt")
+        return self.get_db_stats()
+
+    def rebuild_search_index(self) -> int:
+        """全文検索インデックス jobs_fts を jobs から作り直す（アプリ以外から jobs を書き換えた後に使う）"""
+        with self.write_transaction() as conn:
+            rebuild_jobs_fts(conn.cursor())
+            count = conn.execute("SELECT COUNT(*) FROM jobs_fts").fetchone()[0]
+        logger.info(f"jobs_fts rebuilt ({count} rows)")
+        return count
+
@@ -0,0 +1,273 @@
+"""
+クロールフロンティアリポジトリ
+クロールを (キーワード, 地域, ページ) の作業項目に分けてDBに記録し、中断したクロールを続きから再開できるようにする
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from .db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+# 実行（crawl_runs）の状態
+RUN_STATUS_RUNNING = "running"        # 実行中（プロセスが落ちた場合もこのまま残る）
+RUN_STATUS_COMPLETED = "completed"    # 全項目が完了・スキップ
+RUN_STATUS_INCOMPLETE = "incomplete"  # 再試行できる項目が残っている
+RUN_STATUS_FAILED = "failed"          # 再試行の上限に達した項目がある
+
+# 作業項目（crawl_frontier）の状態
+ITEM_STATUS_PENDING = "pending"  # 未取得（失敗して再試行待ちのものを含む）
+ITEM_STATUS_RUNNING = "running"  # 取得中
+ITEM_STATUS_DONE = "done"        # 取得・保存済み
+ITEM_STATUS_SKIPPED = "skipped"  # 最終ページより後などで取得不要
+ITEM_STATUS_FAILED = "failed"    # 再試行の上限に達した
+
+
+@dataclass
+class CrawlRun:
+    """クロールの実行単位"""
+    id: int
+    source_name: str
+    keywords: List[str]
+    areas: List[str]
+    max_pages: int
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = RUN_STATUS_RUNNING
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class FrontierRepository:
+    """
+    クロールフロンティア（作業項目）の管理
+
+    実行開始時に全組み合わせ×全ページの項目を pending で作成し、ページごとに
+    running → done / pending（失敗・再試行待ち）/ failed と更新する。
+    最終ページが分かった時点で、それより後のページは skipped にする。
+    プロセスが落ちて running のまま残った項目は、再開時に pending に戻す。
+    """
+
+    DEFAULT_MAX_ATTEMPTS = 3
+
+    def __init__(self, db_manager: DatabaseManager, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.db = db_manager
+        self.max_attempts = max(1, max_attempts)
+
+    def create_run(
+        self,
+        source_name: str,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int,
+        options: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        実行と全作業項目を1トランザクションで作成
+
+        Returns:
+            実行ID
+        """
+        source_id = self.db.get_source_id(source_name)
+        if not source_id:
+            raise ValueError(f"Unknown source: {source_name}")
+
+        now = datetime.now()
+        with self.db.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO crawl_runs (source_id, keywords, areas, max_pages, options, status, started_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                source_id,
+                json.dumps(keywords, ensure_ascii=False),
+                json.dumps(areas, ensure_ascii=False),
+                max_pages,
+                json.dumps(options or {}, ensure_ascii=False),
+                RUN_STATUS_RUNNING,
+                now,
+            ))
+            run_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO crawl_frontier (run_id, keyword, area, page) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, keyword, area, page)
+                    for keyword in keywords
+                    for area in areas
+                    for page in range(1, max_pages + 1)
+                ]
+            )
+
+        logger.info(
+            f"Crawl run {run_id} created: {len(keywords)} keywords x {len(areas)} areas x {max_pages} pages"
+        )
+        return run_id
+
+    def get_run(self, run_id: int) -> Optional[CrawlRun]:
+        """実行を取得"""
+        with self.db.get_read_connection() as conn:
+            row = conn.execute("""
+                SELECT r.*, s.name AS source_name
+                FROM crawl_runs r
+                JOIN sources s ON s.id = r.source_id
+                WHERE r.id = ?
+            """, (run_id,)).fetchone()
+
+        if not row:
+            return None
+        return CrawlRun(
+            id=row['id'],
+            source_name=row['source_name'],
+            keywords=json.loads(row['keywords']),
+            areas=json.loads(row['areas']),
+            max_pages=row['max_pages'],
+            options=json.loads(row['options'] or "{}"),
+            status=row['status'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at'],
+        )
+
+    def get_unfinished_runs(self, source_name: Optional[str] = None) -> List[CrawlRun]:
+        """完了していない実行（running / incomplete）を新しい順に取得"""
+        query = """
+            SELECT r.id
+            FROM crawl_runs r
+            JOIN sources s ON s.id = r.source_id
+            WHERE r.status IN (?, ?)
+        """
+        params: List[Any] = [RUN_STATUS_RUNNING, RUN_STATUS_INCOMPLETE]
+        if source_name:
+            query += " AND s.name = ?"
+            params.append(source_name)
+        query += " ORDER BY r.id DESC"
+
+        with self.db.get_read_connection() as conn:
+            run_ids = [row['id'] for row in conn.execute(query, params).fetchall()]
+        return [run for run in map(self.get_run, run_ids) if run]
+
+    def reopen_run(self, run_id: int) -> int:
+        """
+        再開のため、取得中のまま残った項目を pending に戻して実行を running にする
+
+        Returns:
+            pending に戻した項目数
+        """
+        with self.db.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE crawl_frontier SET status = ?, started_at = NULL WHERE run_id = ? AND status = ?",
+                (ITEM_STATUS_PENDING, run_id, ITEM_STATUS_RUNNING)
+            )
+            reset = cursor.rowcount
+            cursor.execute(
+                "UPDATE crawl_runs SET status = ?, finished_at = NULL WHERE id = ?",
+                (RUN_STATUS_RUNNING, run_id)
+            )
+        return reset
+
+    def pending_pages(self, run_id: int, keyword: str, area: str) -> List[int]:
+        """組み合わせの未取得のページ番号（昇順）"""
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute("""
+                SELECT page FROM crawl_frontier
+                WHERE run_id = ? AND keyword = ? AND area = ? AND status = ?
+                ORDER BY page
+            """, (run_id, keyword, area, ITEM_STATUS_PENDING)).fetchall()
+        return [row['page'] for row in rows]
+
+    def pending_combinations(self, run_id: int) -> List[Dict[str, str]]:
+        """未取得のページが残っている (キーワード, 地域) の組み合わせ"""
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute("""
+                SELECT DISTINCT keyword, area FROM crawl_frontier
+                WHERE run_id = ? AND status = ?
+                ORDER BY keyword, area
+            """, (run_id, ITEM_STATUS_PENDING)).fetchall()
+        return [{"keyword": row['keyword'], "area": row['area']} for row in rows]
+
+    def mark_running(self, run_id: int, keyword: str, area: str, page: int):
+        """取得開始を記録（試行回数を加算）"""
+        with self.db.write_transaction() as conn:
+            conn.execute("""
+                UPDATE crawl_frontier SET status = ?, attempts = attempts + 1, started_at = ?
+                WHERE run_id = ? AND keyword = ? AND area = ? AND page = ?
+            """, (ITEM_STATUS_RUNNING, datetime.now(), run_id, keyword, area, page))
+
+    def mark_done(self, run_id: int, keyword: str, area: str, page: int, job_count: int):
+        """取得・保存の完了を記録（求人の保存と同じトランザクション内で呼べる）"""
+        with self.db.write_transaction() as conn:
+            conn.execute("""
+                UPDATE crawl_frontier SET status = ?, job_count = ?, error_message = NULL, finished_at = ?
+                WHERE run_id = ? AND keyword = ? AND area = ? AND page = ?
+            """, (ITEM_STATUS_DONE, job_count, datetime.now(), run_id, keyword, area, page))
+
+    def mark_failed(self, run_id: int, keyword: str, area: str, page: int, error: str):
+        """取得失敗を記録（試行回数が上限未満なら再試行待ちとして pending に戻す）"""
+        with self.db.write_transaction() as conn:
+            conn.execute("""
+                UPDATE crawl_frontier
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    error_message = ?, finished_at = ?
+                WHERE run_id = ? AND keyword = ? AND area = ? AND page = ?
+            """, (
+                self.max_attempts, ITEM_STATUS_FAILED, ITEM_STATUS_PENDING,
+                error, datetime.now(), run_id, keyword, area, page
+            ))
+
+    def skip_pages_from(self, run_id: int, keyword: str, area: str, page: int) -> int:
+        """page 以降の未取得ページを取得不要（skipped）にする"""
+        with self.db.write_transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE crawl_frontier SET status = ?, finished_at = ?
+                WHERE run_id = ? AND keyword = ? AND area = ? AND page >= ? AND status = ?
+            """, (ITEM_STATUS_SKIPPED, datetime.now(), run_id, keyword, area, page, ITEM_STATUS_PENDING))
+            return cursor.rowcount
+
+    def get_progress(self, run_id: int) -> Dict[str, int]:
+        """状態ごとの項目数と取得した求人数"""
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute("""
+                SELECT status, COUNT(*) AS items, SUM(job_count) AS jobs
+                FROM crawl_frontier WHERE run_id = ? GROUP BY status
+            """, (run_id,)).fetchall()
+
+        progress = {status: 0 for status in (
+            ITEM_STATUS_PENDING, ITEM_STATUS_RUNNING, ITEM_STATUS_DONE, ITEM_STATUS_SKIPPED, ITEM_STATUS_FAILED
+        )}
+        progress["jobs"] = 0
+        for row in rows:
+            progress[row['status']] = row['items']
+            progress["jobs"] += row['jobs'] or 0
+        return progress
+
+    def finish_run(self, run_id: int) -> str:
+        """
+        項目の状態から実行の状態を決めて終了を記録
+
+        Returns:
+            実行の状態
+        """
+        progress = self.get_progress(run_id)
+        if progress[ITEM_STATUS_PENDING] or progress[ITEM_STATUS_RUNNING]:
+            status = RUN_STATUS_INCOMPLETE
+        elif progress[ITEM_STATUS_FAILED]:
+            status = RUN_STATUS_FAILED
+        else:
+            status = RUN_STATUS_COMPLETED
+
+        with self.db.write_transaction() as conn:
+            conn.execute(
+                "UPDATE crawl_runs SET status = ?, finished_at = ? WHERE id = ?",
+                (status, datetime.now(), run_id)
+            )
+        logger.info(f"Crawl run {run_id} finished: {status} {progress}")
+        return status
+
+    def delete_run(self, run_id: int):
+        """実行と作業項目を削除"""
+        with self.db.write_transaction() as conn:
+            conn.execute("DELETE FROM crawl_frontier WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM crawl_runs WHERE id = ?", (run_id,))
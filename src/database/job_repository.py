@@ -3,179 +3,500 @@
 データベースへの求人情報の保存・取得・検索を担当
 """
 import sqlite3
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from collections import namedtuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterator, Tuple
 import re
 import logging
 from urllib.parse import urlparse, urlunparse
 import hashlib
 
-from .db_manager import DatabaseManager
+from .db_manager import DatabaseManager, normalize_search_text
+from .retention import RetentionManager
 
 logger = logging.getLogger(__name__)
 
 
+# 保存時の行ごとの結果
+SAVE_STATUS_NEW = "new"              # 新規挿入
+SAVE_STATUS_CHANGED = "changed"      # 既存・内容に変更あり（全列を更新）
+SAVE_STATUS_UNCHANGED = "unchanged"  # 既存・内容が同一（updated_at のみ更新）
+
+# 再クロール時に上書きする列（job_id / source_id / crawled_at は初回の値を保持）
+JOB_MUTABLE_COLUMNS = [
+    'company_name', 'company_name_kana',
+    'postal_code', 'address_pref', 'address_city', 'address_detail',
+    'phone_number', 'phone_number_normalized', 'fax_number',
+    'job_title', 'employment_type', 'salary', 'salary_min', 'salary_max',
+    'working_hours', 'holidays', 'work_location',
+    'business_description', 'job_description', 'requirements',
+    'hiring_count', 'contact_person', 'contact_email', 'page_url',
+    'employee_count',
+]
+
+# NOT NULL 制約のある列（欠けた行は正規化の段階で弾く）
+JOB_REQUIRED_COLUMNS = ['company_name', 'job_title', 'page_url']
+
+# 書き込む列（内容の指紋 content_hash は JOB_MUTABLE_COLUMNS の値から計算する）
+_WRITE_COLUMNS = JOB_MUTABLE_COLUMNS + ['content_hash']
+
+_INSERT_COLUMNS = ['job_id', 'source_id'] + _WRITE_COLUMNS + ['crawled_at', 'updated_at', 'is_new']
+
+_INSERT_SQL = f"""
+    INSERT INTO jobs ({', '.join(_INSERT_COLUMNS)})
+    VALUES ({', '.join(['?'] * len(_INSERT_COLUMNS))})
+"""
+
+_UPDATE_SQL = f"""
+    UPDATE jobs SET
+        {', '.join(f'{col} = ?' for col in _WRITE_COLUMNS)},
+        updated_at = ?,
+        is_new = 0
+    WHERE id = ?
+"""
+
+_UPSERT_SQL = _INSERT_SQL + f"""
+    ON CONFLICT(source_id, job_id) DO UPDATE SET
+        {', '.join(f'{col} = excluded.{col}' for col in _WRITE_COLUMNS)},
+        updated_at = excluded.updated_at,
+        is_new = 0
+"""
+
+# 内容が同一の既存行は updated_at だけを更新する（is_new が立っている行のみ is_new も落とす）
+_TOUCH_SQL = "UPDATE jobs SET updated_at = ? WHERE source_id = ? AND job_id = ?"
+_TOUCH_NEW_SQL = "UPDATE jobs SET updated_at = ?, is_new = 0 WHERE source_id = ? AND job_id = ?"
+
+# 全文検索インデックス jobs_fts の列（NFKC正規化した値を書き込みと同じトランザクションで反映する）
+JOB_SEARCH_COLUMNS = ['job_title', 'company_name', 'job_description']
+_SEARCH_VALUE_INDEXES = [_WRITE_COLUMNS.index(col) for col in JOB_SEARCH_COLUMNS]
+
+_SEARCH_DELETE_SQL = "DELETE FROM jobs_fts WHERE rowid = ?"
+_SEARCH_INSERT_SQL = f"""
+    INSERT INTO jobs_fts (rowid, {', '.join(JOB_SEARCH_COLUMNS)})
+    VALUES ({', '.join(['?'] * (len(JOB_SEARCH_COLUMNS) + 1))})
+"""
+
+# trigramトークナイザで索引検索できるキーワードの最小文字数
+FTS_TRIGRAM_MIN_LENGTH = 3
+
+# IN句に渡すパラメータ数の上限（古いSQLiteの変数上限999を下回る値）
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+def _chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """リストを指定サイズごとに分割"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@dataclass
+class BulkSaveResult:
+    """一括保存結果"""
+    saved_count: int = 0
+    new_count: int = 0
+    changed_count: int = 0
+    unchanged_count: int = 0
+    failed_count: int = 0
+    # 入力順の行ごとの結果（SAVE_STATUS_*、失敗時はNone）
+    statuses: List[Optional[str]] = field(default_factory=list)
+
+    @property
+    def updated_count(self) -> int:
+        """既存行の件数（内容の変更有無を問わない）"""
+        return self.changed_count + self.unchanged_count
+
+
 class JobRepository:
     """求人情報リポジトリ"""
 
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
 
-    def save_job(self, job_data: Dict[str, Any], source_name: str) -> int:
-        """求人情報を保存（UPSERT）"""
-        source_id = self.db.get_source_id(source_name)
-        if not source_id:
-            raise ValueError(f"Unknown source: {source_name}")
+    def get_job_key(self, job_data: Dict[str, Any]) -> Tuple[str, str]:
+        """保存時と同じ規則で (job_id, 正規化URL) を求める"""
+        normalized_url = self._normalize_url(job_data.get('page_url') or job_data.get('url', ''))
+        job_id_value = (
+            job_data.get('job_id')
+            or job_data.get('job_number')
+            or normalized_url
+            or self._generate_fallback_id(job_data)
+        )
+        return job_id_value, normalized_url
 
+    def _build_job_values(self, job_data: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """スクレイピング結果を (job_id, _WRITE_COLUMNS順の値リスト) に正規化"""
         # 電話番号の正規化
         phone_normalized = self._normalize_phone(job_data.get('phone_number', ''))
 
         # 住所の分解
         address_parts = self._parse_address(job_data.get('location', ''))
 
+        job_id_value, normalized_url = self.get_job_key(job_data)
+
+        values = [
+            job_data.get('company', ''),
+            job_data.get('company_kana', ''),
+            job_data.get('postal_code', ''),
+            address_parts.get('pref', ''),
+            address_parts.get('city', ''),
+            address_parts.get('detail', ''),
+            job_data.get('phone_number', ''),
+            phone_normalized,
+            job_data.get('fax', ''),
+            job_data.get('title', ''),
+            job_data.get('employment_type', ''),
+            job_data.get('salary', ''),
+            self._parse_salary_min(job_data.get('salary', '')),
+            self._parse_salary_max(job_data.get('salary', '')),
+            job_data.get('working_hours', ''),
+            job_data.get('holidays', ''),
+            job_data.get('location', ''),
+            job_data.get('business_content', ''),
+            job_data.get('job_description', ''),
+            job_data.get('requirements', ''),
+            job_data.get('hiring_count'),
+            job_data.get('recruiter', ''),
+            job_data.get('recruiter_email', ''),
+            normalized_url,
+            job_data.get('employee_count'),
+        ]
+        for column in JOB_REQUIRED_COLUMNS:
+            if values[JOB_MUTABLE_COLUMNS.index(column)] is None:
+                raise ValueError(f"Missing required field: {column}")
+        values.append(self._content_hash(values))
+        return job_id_value, values
+
+    def _content_hash(self, values: List[Any]) -> str:
+        """正規化済みの可変列の値から内容の指紋を計算"""
+        key = "\x1f".join("" if value is None else str(value) for value in values)
+        return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def save_job(self, job_data: Dict[str, Any], source_name: str) -> int:
+        """求人情報を保存（UPSERT）。内容が前回と同一なら updated_at のみ更新する"""
+        source_id = self.db.get_source_id(source_name)
+        if not source_id:
+            raise ValueError(f"Unknown source: {source_name}")
+
         now = datetime.now()
-        normalized_url = self._normalize_url(job_data.get('page_url') or job_data.get('url', ''))
-        job_id_value = (
-            job_data.get('job_id')
-            or job_data.get('job_number')
-            or normalized_url
-            or self._generate_fallback_id(job_data)
-        )
-        page_url_value = normalized_url
+        job_id_value, values = self._build_job_values(job_data)
+        content_hash = values[-1]
 
-        with self.db.get_connection() as conn:
+        with self.db.write_transaction() as conn:
             cursor = conn.cursor()
 
             # 既存レコードの確認
             cursor.execute("""
-                SELECT id, crawled_at FROM jobs
+                SELECT id, content_hash, is_new FROM jobs
                 WHERE source_id = ? AND job_id = ?
             """, (source_id, job_id_value))
 
             existing = cursor.fetchone()
 
-            if existing:
+            if existing and existing['content_hash'] == content_hash:
+                # 内容に変更なし
+                touch_sql = _TOUCH_NEW_SQL if existing['is_new'] else _TOUCH_SQL
+                cursor.execute(touch_sql, (now, source_id, job_id_value))
+                job_id = existing['id']
+            elif existing:
                 # 更新
-                cursor.execute("""
-                    UPDATE jobs SET
-                        company_name = ?,
-                        company_name_kana = ?,
-                        postal_code = ?,
-                        address_pref = ?,
-                        address_city = ?,
-                        address_detail = ?,
-                        phone_number = ?,
-                        phone_number_normalized = ?,
-                        fax_number = ?,
-                        job_title = ?,
-                        employment_type = ?,
-                        salary = ?,
-                        salary_min = ?,
-                        salary_max = ?,
-                        working_hours = ?,
-                        holidays = ?,
-                        work_location = ?,
-                        business_description = ?,
-                        job_description = ?,
-                        requirements = ?,
-                        hiring_count = ?,
-                        contact_person = ?,
-                        contact_email = ?,
-                        page_url = ?,
-                        employee_count = ?,
-                        updated_at = ?,
-                        is_new = 0
-                    WHERE id = ?
-                """, (
-                    job_data.get('company', ''),
-                    job_data.get('company_kana', ''),
-                    job_data.get('postal_code', ''),
-                    address_parts.get('pref', ''),
-                    address_parts.get('city', ''),
-                    address_parts.get('detail', ''),
-                    job_data.get('phone_number', ''),
-                    phone_normalized,
-                    job_data.get('fax', ''),
-                    job_data.get('title', ''),
-                    job_data.get('employment_type', ''),
-                    job_data.get('salary', ''),
-                    self._parse_salary_min(job_data.get('salary', '')),
-                    self._parse_salary_max(job_data.get('salary', '')),
-                    job_data.get('working_hours', ''),
-                    job_data.get('holidays', ''),
-                    job_data.get('location', ''),
-                    job_data.get('business_content', ''),
-                    job_data.get('job_description', ''),
-                    job_data.get('requirements', ''),
-                    job_data.get('hiring_count'),
-                    job_data.get('recruiter', ''),
-                    job_data.get('recruiter_email', ''),
-                    page_url_value,
-                    job_data.get('employee_count'),
-                    now,
-                    existing['id']
-                ))
+                cursor.execute(_UPDATE_SQL, (*values, now, existing['id']))
                 job_id = existing['id']
+                self._index_jobs(cursor, [(job_id, values)])
             else:
                 # 新規挿入
-                cursor.execute("""
-                    INSERT INTO jobs (
-                        job_id, source_id, company_name, company_name_kana,
-                        postal_code, address_pref, address_city, address_detail,
-                        phone_number, phone_number_normalized, fax_number,
-                        job_title, employment_type, salary, salary_min, salary_max,
-                        working_hours, holidays, work_location,
-                        business_description, job_description, requirements,
-                        hiring_count, contact_person, contact_email, page_url,
-                        employee_count, crawled_at, updated_at, is_new
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    job_id_value,
-                    source_id,
-                    job_data.get('company', ''),
-                    job_data.get('company_kana', ''),
-                    job_data.get('postal_code', ''),
-                    address_parts.get('pref', ''),
-                    address_parts.get('city', ''),
-                    address_parts.get('detail', ''),
-                    job_data.get('phone_number', ''),
-                    phone_normalized,
-                    job_data.get('fax', ''),
-                    job_data.get('title', ''),
-                    job_data.get('employment_type', ''),
-                    job_data.get('salary', ''),
-                    self._parse_salary_min(job_data.get('salary', '')),
-                    self._parse_salary_max(job_data.get('salary', '')),
-                    job_data.get('working_hours', ''),
-                    job_data.get('holidays', ''),
-                    job_data.get('location', ''),
-                    job_data.get('business_content', ''),
-                    job_data.get('job_description', ''),
-                    job_data.get('requirements', ''),
-                    job_data.get('hiring_count'),
-                    job_data.get('recruiter', ''),
-                    job_data.get('recruiter_email', ''),
-                    page_url_value,
-                    job_data.get('employee_count'),
-                    now,
-                    now,
-                    True
-                ))
+                cursor.execute(_INSERT_SQL, (job_id_value, source_id, *values, now, now, True))
                 job_id = cursor.lastrowid
+                self._index_jobs(cursor, [(job_id, values)])
 
-            conn.commit()
-            return job_id
+        return job_id
 
-    def save_jobs_bulk(self, jobs_data: List[Dict[str, Any]], source_name: str) -> int:
-        """複数の求人情報を一括保存"""
-        saved_count = 0
-        for job_data in jobs_data:
+    def upsert_jobs(self, jobs_data: List[Dict[str, Any]], source_name: str) -> BulkSaveResult:
+        """
+        複数の求人情報を1トランザクションで一括UPSERT
+
+        バッチ全体を先に正規化し、INSERT ... ON CONFLICT DO UPDATE を executemany で実行する。
+        制約違反などで一括実行が失敗した場合は1行ずつ実行し直し、失敗した行だけをスキップする（failed_count）。
+        内容の指紋（content_hash）が既存行と同じ行は書き換えず、updated_at だけを更新する。
+        同一バッチ内で job_id が重複した場合は後勝ちで1行にまとめる。
+
+        Args:
+            jobs_data: スクレイピング結果のリスト
+            source_name: 媒体名
+
+        Returns:
+            BulkSaveResult（statusesは入力と同じ順序）
+        """
+        source_id = self.db.get_source_id(source_name)
+        if not source_id:
+            raise ValueError(f"Unknown source: {source_name}")
+
+        now = datetime.now()
+        result = BulkSaveResult(statuses=[None] * len(jobs_data))
+
+        # 正規化（失敗した行はスキップして記録）
+        row_keys: List[Optional[str]] = [None] * len(jobs_data)
+        row_hashes: List[Optional[str]] = [None] * len(jobs_data)
+        rows_by_key: Dict[str, Tuple[Any, ...]] = {}
+        for idx, job_data in enumerate(jobs_data):
             try:
-                self.save_job(job_data, source_name)
-                saved_count += 1
+                job_id_value, values = self._build_job_values(job_data)
             except Exception as e:
-                logger.warning(f"Failed to save job: {e}")
-        return saved_count
+                logger.warning(f"Failed to normalize job: {e}")
+                result.failed_count += 1
+                continue
+            row_keys[idx] = job_id_value
+            row_hashes[idx] = values[-1]
+            rows_by_key[job_id_value] = (job_id_value, source_id, *values, now, now, True)
+
+        if not rows_by_key:
+            return result
+
+        # write_transaction は先に書き込みロックを取るため、既存判定と書き込みの間に他の書き込みは入らない
+        with self.db.write_transaction() as conn:
+            cursor = conn.cursor()
+
+            # sqlite3のexecutemanyはRETURNINGの結果を捨てるため、
+            # 新規／変更／変更なしの判定は同じトランザクション内の一括キー照会で行う
+            existing = self._fetch_existing_hashes(cursor, source_id, list(rows_by_key))
+
+            upserts = []
+            touches = []
+            touches_new = []
+            hash_index = _WRITE_COLUMNS.index('content_hash') + 2
+            for key, row in rows_by_key.items():
+                if key in existing and existing[key][0] == row[hash_index]:
+                    (touches_new if existing[key][1] else touches).append((now, source_id, key))
+                else:
+                    upserts.append(row)
+
+            failed_keys = self._execute_upserts(cursor, upserts) if upserts else set()
+            saved = [row for row in upserts if row[0] not in failed_keys]
+            if saved:
+                row_ids = self._fetch_row_ids(cursor, source_id, [row[0] for row in saved])
+                self._index_jobs(cursor, [(row_ids[row[0]], row[2:2 + len(_WRITE_COLUMNS)]) for row in saved])
+            if touches:
+                cursor.executemany(_TOUCH_SQL, touches)
+            if touches_new:
+                cursor.executemany(_TOUCH_NEW_SQL, touches_new)
+
+        # 行ごとの結果（バッチ内重複は直前の同一キー行と比較する）
+        last_hashes = {key: content_hash for key, (content_hash, _) in existing.items()}
+        for idx, key in enumerate(row_keys):
+            if key is None:
+                continue
+            if key in failed_keys:
+                result.failed_count += 1
+                continue
+            if key not in last_hashes:
+                result.statuses[idx] = SAVE_STATUS_NEW
+                result.new_count += 1
+            elif last_hashes[key] == row_hashes[idx]:
+                result.statuses[idx] = SAVE_STATUS_UNCHANGED
+                result.unchanged_count += 1
+            else:
+                result.statuses[idx] = SAVE_STATUS_CHANGED
+                result.changed_count += 1
+            last_hashes[key] = row_hashes[idx]
+            result.saved_count += 1
+
+        return result
+
+    def _execute_upserts(self, cursor: sqlite3.Cursor, rows: List[Tuple[Any, ...]]) -> set:
+        """
+        一括UPSERTを実行（失敗したら SAVEPOINT で巻き戻して1行ずつ実行し直す）
+
+        Returns:
+            保存に失敗した行の job_id
+        """
+        cursor.execute("SAVEPOINT upsert_batch")
+        try:
+            cursor.executemany(_UPSERT_SQL, rows)
+            cursor.execute("RELEASE SAVEPOINT upsert_batch")
+            return set()
+        except sqlite3.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT upsert_batch")
+            cursor.execute("RELEASE SAVEPOINT upsert_batch")
+            logger.warning(f"Bulk upsert failed, retrying {len(rows)} rows one by one: {e}")
+
+        failed = set()
+        for row in rows:
+            cursor.execute("SAVEPOINT upsert_row")
+            try:
+                cursor.execute(_UPSERT_SQL, row)
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT upsert_row")
+                logger.warning(f"Failed to save job {row[0]}: {e}")
+                failed.add(row[0])
+            cursor.execute("RELEASE SAVEPOINT upsert_row")
+        return failed
+
+    def _fetch_row_ids(self, cursor: sqlite3.Cursor, source_id: int, job_ids: List[str]) -> Dict[str, int]:
+        """job_id → 行ID をチャンク化したIN句でまとめて取得"""
+        found = {}
+        for chunk in _chunked(job_ids, IN_CLAUSE_CHUNK_SIZE):
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(
+                f"SELECT id, job_id FROM jobs WHERE source_id = ? AND job_id IN ({placeholders})",
+                (source_id, *chunk)
+            )
+            for row in cursor.fetchall():
+                found[row['job_id']] = row['id']
+        return found
+
+    def _index_jobs(self, cursor: sqlite3.Cursor, entries: List[Tuple[int, List[Any]]]):
+        """
+        新規・変更した行を全文検索インデックスに反映（行の書き込みと同じトランザクション内で呼ぶ）
+
+        Args:
+            entries: (行ID, _WRITE_COLUMNS順の値) のリスト
+        """
+        cursor.executemany(_SEARCH_DELETE_SQL, [(row_id,) for row_id, _ in entries])
+        cursor.executemany(_SEARCH_INSERT_SQL, [
+            (row_id, *(normalize_search_text(values[i]) for i in _SEARCH_VALUE_INDEXES))
+            for row_id, values in entries
+        ])
+
+    def _fetch_existing_hashes(
+        self,
+        cursor: sqlite3.Cursor,
+        source_id: int,
+        job_ids: List[str]
+    ) -> Dict[str, Tuple[Optional[str], bool]]:
+        """既存行の job_id → (content_hash, is_new) をチャンク化したIN句でまとめて取得"""
+        found = {}
+        for chunk in _chunked(job_ids, IN_CLAUSE_CHUNK_SIZE):
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(
+                f"SELECT job_id, content_hash, is_new FROM jobs WHERE source_id = ? AND job_id IN ({placeholders})",
+                (source_id, *chunk)
+            )
+            for row in cursor.fetchall():
+                found[row['job_id']] = (row['content_hash'], bool(row['is_new']))
+        return found
+
+    def find_existing_jobs(self, source_name: str, keys: List[Tuple[str, str]]) -> List[bool]:
+        """
+        (job_id, 正規化URL) のリストについて、DBに既存かどうかを一括判定
+
+        job_id と page_url のどちらかが一致すれば既存とみなす。
+        それぞれ UNIQUE(source_id, job_id) と idx_jobs_source_url で引くため、
+        件数によらずチャンク数ぶんのクエリで済む。
+
+        Args:
+            source_name: 媒体名
+            keys: get_job_key() で求めた (job_id, 正規化URL) のリスト
+
+        Returns:
+            入力と同じ順序の既存フラグ
+        """
+        if not keys:
+            return []
+
+        source_id = self.db.get_source_id(source_name)
+        if not source_id:
+            return [False] * len(keys)
+
+        job_ids = list({job_id for job_id, _ in keys if job_id})
+        page_urls = list({url for _, url in keys if url})
+
+        with self.db.get_read_connection() as conn:
+            cursor = conn.cursor()
+            known_ids = self._fetch_existing_values(cursor, source_id, 'job_id', job_ids)
+            known_urls = self._fetch_existing_values(cursor, source_id, 'page_url', page_urls)
+
+        return [
+            bool(job_id and job_id in known_ids) or bool(url and url in known_urls)
+            for job_id, url in keys
+        ]
+
+    def _fetch_existing_values(
+        self,
+        cursor: sqlite3.Cursor,
+        source_id: int,
+        column: str,
+        values: List[str]
+    ) -> set:
+        """source_id内で指定列の値が存在するものをチャンク化したIN句でまとめて取得"""
+        found = set()
+        for chunk in _chunked(values, IN_CLAUSE_CHUNK_SIZE):
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(
+                f"SELECT {column} FROM jobs WHERE source_id = ? AND {column} IN ({placeholders})",
+                (source_id, *chunk)
+            )
+            found.update(row[0] for row in cursor.fetchall())
+        return found
+
+    def save_jobs_bulk(self, jobs_data: List[Dict[str, Any]], source_name: str) -> int:
+        """複数の求人情報を一括保存"""
+        return self.upsert_jobs(jobs_data, source_name).saved_count
+
+    def _build_job_query(
+        self,
+        source_name: Optional[str] = None,
+        keyword: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        employment_type: Optional[str] = None,
+        is_new: Optional[bool] = None,
+        is_filtered: Optional[bool] = None
+    ) -> Tuple[str, List[Any], bool]:
+        """
+        検索条件からSELECT文（ORDER BY無し）を組み立てる
+
+        Returns:
+            (クエリ, パラメータ, 全文検索のBM25で並べ替え可能か)
+        """
+        query = """
+            SELECT j.*, s.display_name as source_display_name
+            FROM jobs j
+            JOIN sources s ON j.source_id = s.id
+        """
+        params: List[Any] = []
+        ranked = False
+
+        normalized_keyword = normalize_search_text(keyword).strip()
+        if normalized_keyword:
+            query += " JOIN jobs_fts ON jobs_fts.rowid = j.id"
+
+        query += " WHERE 1=1"
+
+        if source_name:
+            # 媒体IDで直接絞り込み、(source_id, ...) の複合インデックスを使わせる
+            query += " AND j.source_id = ?"
+            params.append(self.db.get_source_id(source_name))
+
+        if normalized_keyword:
+            if len(normalized_keyword) >= FTS_TRIGRAM_MIN_LENGTH:
+                # trigram索引で部分一致検索
+                query += " AND jobs_fts MATCH ?"
+                params.append(self._to_fts_phrase(normalized_keyword))
+                ranked = True
+            else:
+                # 3文字未満はtrigramで引けないため、正規化済みの索引列に対して部分一致
+                query += (
+                    " AND (jobs_fts.job_title LIKE ? OR jobs_fts.company_name LIKE ?"
+                    " OR jobs_fts.job_description LIKE ?)"
+                )
+                kw = f"%{normalized_keyword}%"
+                params.extend([kw, kw, kw])
+
+        if prefecture:
+            query += " AND j.address_pref = ?"
+            params.append(prefecture)
+
+        if employment_type:
+            query += " AND j.employment_type LIKE ?"
+            params.append(f"%{employment_type}%")
+
+        # 真偽値はリテラルで埋め込む（部分インデックス idx_jobs_new_crawled はバインド値では使われない）
+        if is_new is not None:
+            query += f" AND j.is_new = {1 if is_new else 0}"
+
+        if is_filtered is not None:
+            query += f" AND j.is_filtered = {1 if is_filtered else 0}"
+
+        return query, params, ranked
 
     def get_jobs(
         self,
@@ -189,47 +510,88 @@ class JobRepository:
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """求人情報を検索"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-
-            query = """
-                SELECT j.*, s.display_name as source_display_name
-                FROM jobs j
-                JOIN sources s ON j.source_id = s.id
-                WHERE 1=1
-            """
-            params = []
+        query, params, ranked = self._build_job_query(
+            source_name, keyword, prefecture, employment_type, is_new, is_filtered
+        )
+        # キーワード検索時はBM25の関連度順
+        order_by = "bm25(jobs_fts), j.crawled_at DESC" if ranked else "j.crawled_at DESC"
+        query += f" ORDER BY {order_by} LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
 
-            if source_name:
-                query += " AND s.name = ?"
-                params.append(source_name)
+        with self.db.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
 
-            if keyword:
-                query += " AND (j.job_title LIKE ? OR j.company_name LIKE ? OR j.job_description LIKE ?)"
-                kw = f"%{keyword}%"
-                params.extend([kw, kw, kw])
+    def iter_jobs(
+        self,
+        source_name: Optional[str] = None,
+        keyword: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        employment_type: Optional[str] = None,
+        is_new: Optional[bool] = None,
+        is_filtered: Optional[bool] = None,
+        chunk_size: int = 1000,
+        as_tuples: bool = False
+    ) -> Iterator[List[Any]]:
+        """
+        求人情報を新しい順に chunk_size 件ずつ返すジェネレータ
 
-            if prefecture:
-                query += " AND j.address_pref = ?"
-                params.append(prefecture)
+        (crawled_at, id) のキーセットでページングするため、OFFSETのように読み飛ばし分を
+        再走査せず、何百万件でもメモリ使用量は1チャンク分で済む。
+        チャンク間で接続やカーソルを保持しない。
 
-            if employment_type:
-                query += " AND j.employment_type LIKE ?"
-                params.append(f"%{employment_type}%")
+        Args:
+            source_name 〜 is_filtered: get_jobs と同じ検索条件（キーワード指定時も新しい順）
+            chunk_size: 1回のクエリで取得する件数
+            as_tuples: Trueなら辞書ではなく列名で参照できる軽量なnamedtupleを返す
 
-            if is_new is not None:
-                query += " AND j.is_new = ?"
-                params.append(1 if is_new else 0)
+        Yields:
+            最大 chunk_size 件の行リスト
+        """
+        base_query, base_params, _ = self._build_job_query(
+            source_name, keyword, prefecture, employment_type, is_new, is_filtered
+        )
+        row_type = None
+        last_key: Optional[Tuple[Any, int]] = None
+
+        while True:
+            query = base_query
+            params = list(base_params)
+            if last_key is not None:
+                # 行値比較にするとインデックスの範囲検索になり、読み終えた分を再走査しない
+                query += " AND (j.crawled_at, j.id) < (?, ?)"
+                params.extend(last_key)
+            query += " ORDER BY j.crawled_at DESC, j.id DESC LIMIT ?"
+            params.append(chunk_size)
+
+            with self.db.get_read_connection() as conn:
+                cursor = conn.cursor()
+                if as_tuples:
+                    cursor.row_factory = None
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                if as_tuples and row_type is None:
+                    row_type = namedtuple('JobRow', [col[0] for col in cursor.description], rename=True)
+
+            if not rows:
+                return
+
+            if as_tuples:
+                chunk = [row_type._make(row) for row in rows]
+                last_key = (chunk[-1].crawled_at, chunk[-1].id)
+            else:
+                chunk = [dict(row) for row in rows]
+                last_key = (chunk[-1]['crawled_at'], chunk[-1]['id'])
 
-            if is_filtered is not None:
-                query += " AND j.is_filtered = ?"
-                params.append(1 if is_filtered else 0)
+            yield chunk
 
-            query += " ORDER BY j.crawled_at DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+            if len(rows) < chunk_size:
+                return
 
-            cursor.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+    def _to_fts_phrase(self, keyword: str) -> str:
+        """キーワードをFTS5のフレーズ文字列に変換（演算子として解釈させない）"""
+        return '"' + keyword.replace('"', '""') + '"'
 
     def get_jobs_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
         """ID指定で求人情報を取得"""
@@ -245,7 +607,7 @@ class JobRepository:
             ORDER BY j.crawled_at DESC
         """
 
-        with self.db.get_connection() as conn:
+        with self.db.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, ids)
             return [dict(row) for row in cursor.fetchall()]
@@ -257,28 +619,42 @@ class JobRepository:
         is_filtered: Optional[bool] = None
     ) -> int:
         """求人件数を取得"""
-        with self.db.get_connection() as conn:
+        with self.db.get_read_connection() as conn:
             cursor = conn.cursor()
 
-            query = """
+            if is_new is None or is_filtered is None:
+                # 条件が1種類以下なら集計表 job_stats から求める（媒体数ぶんの行のみ読む）
+                if is_new is not None:
+                    count_expr = "new_count" if is_new else "total_count - new_count"
+                elif is_filtered is not None:
+                    count_expr = "filtered_count" if is_filtered else "total_count - filtered_count"
+                else:
+                    count_expr = "total_count"
+
+                query = f"""
+                    SELECT IFNULL(SUM({count_expr}), 0) as count
+                    FROM job_stats js
+                    JOIN sources s ON js.source_id = s.id
+                    WHERE 1=1
+                """
+                params = []
+                if source_name:
+                    query += " AND s.name = ?"
+                    params.append(source_name)
+
+                cursor.execute(query, params)
+                return cursor.fetchone()['count']
+
+            query = f"""
                 SELECT COUNT(*) as count
                 FROM jobs j
-                JOIN sources s ON j.source_id = s.id
-                WHERE 1=1
+                WHERE j.is_new = {1 if is_new else 0} AND j.is_filtered = {1 if is_filtered else 0}
             """
             params = []
 
             if source_name:
-                query += " AND s.name = ?"
-                params.append(source_name)
-
-            if is_new is not None:
-                query += " AND j.is_new = ?"
-                params.append(1 if is_new else 0)
-
-            if is_filtered is not None:
-                query += " AND j.is_filtered = ?"
-                params.append(1 if is_filtered else 0)
+                query += " AND j.source_id = ?"
+                params.append(self.db.get_source_id(source_name))
 
             cursor.execute(query, params)
             return cursor.fetchone()['count']
@@ -299,7 +675,7 @@ class JobRepository:
 
     def get_new_jobs_since(self, since: datetime, source_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """指定日時以降の新着求人を取得"""
-        with self.db.get_connection() as conn:
+        with self.db.get_read_connection() as conn:
             cursor = conn.cursor()
 
             query = """
@@ -311,8 +687,8 @@ class JobRepository:
             params = [since]
 
             if source_name:
-                query += " AND s.name = ?"
-                params.append(source_name)
+                query += " AND j.source_id = ?"
+                params.append(self.db.get_source_id(source_name))
 
             query += " ORDER BY j.crawled_at DESC"
 
@@ -321,23 +697,17 @@ class JobRepository:
 
     def mark_jobs_as_old(self, before: datetime):
         """指定日時より前の求人を「新着でない」に更新"""
-        with self.db.get_connection() as conn:
+        with self.db.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE jobs SET is_new = 0
                 WHERE crawled_at < ? AND is_new = 1
             """, (before,))
-            conn.commit()
             return cursor.rowcount
 
     def delete_old_jobs(self, days: int = 90) -> int:
-        """古い求人を削除"""
-        cutoff = datetime.now() - timedelta(days=days)
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM jobs WHERE crawled_at < ?", (cutoff,))
-            conn.commit()
-            return cursor.rowcount
+        """古い求人を削除（チャンク単位の短いトランザクションで削除する。詳細は RetentionManager）"""
+        return RetentionManager(self.db).purge(days, vacuum=False).deleted_count
 
     def _normalize_url(self, url: str) -> str:
         """クエリ・フラグメントを除去し、末尾スラッシュを揃えたURLを返す"""
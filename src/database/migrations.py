@@ -0,0 +1,469 @@
+"""
+スキーママイグレーション
+PRAGMA user_version でスキーマのバージョンを管理し、未適用のものだけを順番に実行する
+
+トリガーにはアプリ側で登録するSQL関数を使わないこと（sqlite3 CLI など他のツールから jobs を
+書き換えられなくなるため）。全文検索インデックス jobs_fts の追加・更新は正規化が必要なため
+JobRepository の書き込み処理が同じトランザクション内で行い、トリガーは削除だけを反映する。
+アプリ以外から jobs の検索対象列を書き換えた場合は `python -m src.database rebuild-search` で作り直す。
+"""
+import sqlite3
+import unicodedata
+from typing import Callable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_search_text(text: Optional[str]) -> str:
+    """全文検索用にNFKC正規化（全角英数→半角、半角カナ→全角カナ）"""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKC", text)
+
+
+def _migration_001_initial(cursor: sqlite3.Cursor):
+    """初期スキーマ（要件定義 12.2 主要テーブル定義）"""
+    # 媒体マスタテーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sources (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(50) NOT NULL UNIQUE,
+            display_name VARCHAR(100),
+            base_url VARCHAR(200),
+            is_active BOOLEAN DEFAULT 1,
+            priority INTEGER DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # 求人情報テーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id VARCHAR(100) NOT NULL,
+            source_id INTEGER NOT NULL,
+            company_name VARCHAR(200) NOT NULL,
+            company_name_kana VARCHAR(200),
+            postal_code VARCHAR(8),
+            address_pref VARCHAR(10),
+            address_city VARCHAR(50),
+            address_detail VARCHAR(200),
+            phone_number VARCHAR(20),
+            phone_number_normalized VARCHAR(15),
+            fax_number VARCHAR(20),
+            job_title VARCHAR(200) NOT NULL,
+            employment_type VARCHAR(50),
+            salary VARCHAR(100),
+            salary_min INTEGER,
+            salary_max INTEGER,
+            working_hours VARCHAR(200),
+            holidays VARCHAR(500),
+            work_location VARCHAR(500),
+            business_description TEXT,
+            job_description TEXT,
+            requirements TEXT,
+            hiring_count INTEGER,
+            contact_person VARCHAR(100),
+            contact_email VARCHAR(200),
+            page_url VARCHAR(500) NOT NULL,
+            employee_count INTEGER,
+            established_year INTEGER,
+            capital BIGINT,
+            posted_date DATE,
+            expire_date DATE,
+            crawled_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL,
+            is_new BOOLEAN DEFAULT 1,
+            is_filtered BOOLEAN DEFAULT 0,
+            filter_reason VARCHAR(100),
+            UNIQUE(source_id, job_id),
+            FOREIGN KEY (source_id) REFERENCES sources(id)
+        )
+    """)
+
+    # クロールログテーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL,
+            keyword VARCHAR(100),
+            area VARCHAR(100),
+            status VARCHAR(20) NOT NULL,
+            total_count INTEGER DEFAULT 0,
+            new_count INTEGER DEFAULT 0,
+            error_message TEXT,
+            started_at DATETIME,
+            finished_at DATETIME,
+            FOREIGN KEY (source_id) REFERENCES sources(id)
+        )
+    """)
+
+    # 検索条件保存テーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS search_conditions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL,
+            conditions TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # インデックス作成
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_phone ON jobs(phone_number_normalized)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_crawled ON jobs(crawled_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_pref ON jobs(address_pref)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_new ON jobs(is_new)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_filtered ON jobs(is_filtered)")
+
+
+def _migration_002_source_url_index(cursor: sqlite3.Cursor):
+    """既存判定用の (source_id, page_url) インデックス"""
+    # job_id側は UNIQUE(source_id, job_id) の自動インデックスで引ける
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_source_url ON jobs(source_id, page_url)")
+
+
+def _migration_003_jobs_fts(cursor: sqlite3.Cursor):
+    """キーワード検索用の全文検索インデックス（FTS5 trigram）"""
+    # 日本語は単語境界がないためtrigramで部分一致を索引化する。
+    # 索引にはNFKC正規化した文字列を入れる（追加・更新のトリガーは 009 で削除）
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            job_title, company_name, job_description,
+            tokenize = 'trigram'
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, job_title, company_name, job_description)
+            VALUES (new.id, nfkc(new.job_title), nfkc(new.company_name), nfkc(new.job_description));
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+            DELETE FROM jobs_fts WHERE rowid = old.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF job_title, company_name, job_description ON jobs BEGIN
+            UPDATE jobs_fts SET
+                job_title = nfkc(new.job_title),
+                company_name = nfkc(new.company_name),
+                job_description = nfkc(new.job_description)
+            WHERE rowid = new.id;
+        END
+    """)
+
+    # 既存データを索引に投入
+    rebuild_jobs_fts(cursor)
+
+
+def rebuild_jobs_fts(cursor: sqlite3.Cursor):
+    """全文検索インデックス jobs_fts を jobs から作り直す（正規化はPython側で行う）"""
+    cursor.execute("DELETE FROM jobs_fts")
+    rows = cursor.execute("SELECT id, job_title, company_name, job_description FROM jobs")
+    insert = cursor.connection.cursor()
+    while True:
+        chunk = rows.fetchmany(1000)
+        if not chunk:
+            break
+        insert.executemany(
+            "INSERT INTO jobs_fts (rowid, job_title, company_name, job_description) VALUES (?, ?, ?, ?)",
+            [(row[0], *(normalize_search_text(value) for value in row[1:])) for row in chunk]
+        )
+
+
+def _migration_004_job_stats(cursor: sqlite3.Cursor):
+    """媒体別の件数集計テーブル（トリガーで差分更新）"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_stats (
+            source_id INTEGER PRIMARY KEY,
+            total_count INTEGER NOT NULL DEFAULT 0,
+            new_count INTEGER NOT NULL DEFAULT 0,
+            filtered_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    # is_new / is_filtered は NULL を 0 として数える。
+    # 行の作成は INSERT OR IGNORE ではなく NOT EXISTS で行う（トリガー内の衝突解決は
+    # 外側の文の ON CONFLICT で上書きされ、UPSERT 時に一意制約違反になるため）
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_stats_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO job_stats (source_id)
+                SELECT new.source_id WHERE NOT EXISTS (SELECT 1 FROM job_stats WHERE source_id = new.source_id);
+            UPDATE job_stats SET
+                total_count = total_count + 1,
+                new_count = new_count + IFNULL(new.is_new = 1, 0),
+                filtered_count = filtered_count + IFNULL(new.is_filtered = 1, 0)
+            WHERE source_id = new.source_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_stats_ad AFTER DELETE ON jobs BEGIN
+            UPDATE job_stats SET
+                total_count = total_count - 1,
+                new_count = new_count - IFNULL(old.is_new = 1, 0),
+                filtered_count = filtered_count - IFNULL(old.is_filtered = 1, 0)
+            WHERE source_id = old.source_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_stats_au AFTER UPDATE OF source_id, is_new, is_filtered ON jobs BEGIN
+            UPDATE job_stats SET
+                total_count = total_count - 1,
+                new_count = new_count - IFNULL(old.is_new = 1, 0),
+                filtered_count = filtered_count - IFNULL(old.is_filtered = 1, 0)
+            WHERE source_id = old.source_id;
+            INSERT INTO job_stats (source_id)
+                SELECT new.source_id WHERE NOT EXISTS (SELECT 1 FROM job_stats WHERE source_id = new.source_id);
+            UPDATE job_stats SET
+                total_count = total_count + 1,
+                new_count = new_count + IFNULL(new.is_new = 1, 0),
+                filtered_count = filtered_count + IFNULL(new.is_filtered = 1, 0)
+            WHERE source_id = new.source_id;
+        END
+    """)
+
+    rebuild_job_stats(cursor)
+
+
+def rebuild_job_stats(cursor: sqlite3.Cursor):
+    """job_stats を jobs から作り直す（トリガー導入時・整合性が崩れた場合の再集計）"""
+    cursor.execute("DELETE FROM job_stats")
+    cursor.execute("""
+        INSERT INTO job_stats (source_id, total_count, new_count, filtered_count)
+        SELECT
+            source_id,
+            COUNT(*),
+            SUM(IFNULL(is_new = 1, 0)),
+            SUM(IFNULL(is_filtered = 1, 0))
+        FROM jobs
+        GROUP BY source_id
+    """)
+
+
+def _migration_005_content_hash(cursor: sqlite3.Cursor):
+    """内容の指紋列と、値が変わったときだけ発火するトリガーへの置き換え"""
+    # 既存行はNULLのまま（次回保存時に「変更あり」として計算・保存される）
+    cursor.execute("ALTER TABLE jobs ADD COLUMN content_hash VARCHAR(32)")
+
+    # UPDATE OF は SET に列が含まれるだけで発火するため、値が変わった場合に限定する
+    cursor.execute("DROP TRIGGER IF EXISTS jobs_fts_au")
+    cursor.execute("""
+        CREATE TRIGGER jobs_fts_au AFTER UPDATE OF job_title, company_name, job_description ON jobs
+        WHEN old.job_title IS NOT new.job_title
+          OR old.company_name IS NOT new.company_name
+          OR old.job_description IS NOT new.job_description
+        BEGIN
+            UPDATE jobs_fts SET
+                job_title = nfkc(new.job_title),
+                company_name = nfkc(new.company_name),
+                job_description = nfkc(new.job_description)
+            WHERE rowid = new.id;
+        END
+    """)
+
+    cursor.execute("DROP TRIGGER IF EXISTS job_stats_au")
+    cursor.execute("""
+        CREATE TRIGGER job_stats_au AFTER UPDATE OF source_id, is_new, is_filtered ON jobs
+        WHEN old.source_id IS NOT new.source_id
+          OR old.is_new IS NOT new.is_new
+          OR old.is_filtered IS NOT new.is_filtered
+        BEGIN
+            UPDATE job_stats SET
+                total_count = total_count - 1,
+                new_count = new_count - IFNULL(old.is_new = 1, 0),
+                filtered_count = filtered_count - IFNULL(old.is_filtered = 1, 0)
+            WHERE source_id = old.source_id;
+            INSERT INTO job_stats (source_id)
+                SELECT new.source_id WHERE NOT EXISTS (SELECT 1 FROM job_stats WHERE source_id = new.source_id);
+            UPDATE job_stats SET
+                total_count = total_count + 1,
+                new_count = new_count + IFNULL(new.is_new = 1, 0),
+                filtered_count = filtered_count + IFNULL(new.is_filtered = 1, 0)
+            WHERE source_id = new.source_id;
+        END
+    """)
+
+
+def _migration_006_query_indexes(cursor: sqlite3.Cursor):
+    """検索クエリの形（絞り込み＋crawled_at降順）に合わせた複合インデックス"""
+    # crawled_at は昇順で作り、逆順に走査させる（暗黙に付く rowid も降順になり、
+    # iter_jobs の ORDER BY crawled_at DESC, id DESC をソート無しで満たせる）
+    # get_jobs / iter_jobs: 媒体・フィルタ済みで絞り込み、新しい順に並べる
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_source_crawled
+        ON jobs(source_id, crawled_at)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_source_filtered_crawled
+        ON jobs(source_id, is_filtered, crawled_at)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_filtered_crawled
+        ON jobs(is_filtered, crawled_at)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_pref_crawled
+        ON jobs(address_pref, crawled_at)
+    """)
+    # 新着は全体の一部なので部分インデックスにする（WHERE句に is_new = 1 をリテラルで書くこと）
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_new_crawled
+        ON jobs(crawled_at) WHERE is_new = 1
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_source_new_crawled
+        ON jobs(source_id, crawled_at) WHERE is_new = 1
+    """)
+
+    # 上の複合インデックスの先頭列と重複する、または真偽値のみで選択性が低い単一列インデックス
+    cursor.execute("DROP INDEX IF EXISTS idx_jobs_source")
+    cursor.execute("DROP INDEX IF EXISTS idx_jobs_pref")
+    cursor.execute("DROP INDEX IF EXISTS idx_jobs_new")
+    cursor.execute("DROP INDEX IF EXISTS idx_jobs_filtered")
+
+
+def _migration_007_crawl_frontier(cursor: sqlite3.Cursor):
+    """再開可能なクロールの実行単位（crawl_runs）と、(キーワード, 地域, ページ) ごとの作業項目（crawl_frontier）"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL,
+            keywords TEXT NOT NULL,
+            areas TEXT NOT NULL,
+            max_pages INTEGER NOT NULL,
+            options TEXT,
+            status VARCHAR(20) NOT NULL DEFAULT 'running',
+            started_at DATETIME NOT NULL,
+            finished_at DATETIME,
+            FOREIGN KEY (source_id) REFERENCES sources(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_frontier (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL,
+            keyword VARCHAR(100) NOT NULL,
+            area VARCHAR(100) NOT NULL,
+            page INTEGER NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            job_count INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT,
+            started_at DATETIME,
+            finished_at DATETIME,
+            UNIQUE(run_id, keyword, area, page),
+            FOREIGN KEY (run_id) REFERENCES crawl_runs(id) ON DELETE CASCADE
+        )
+    """)
+    # 再開時の未完了項目の取得・進捗集計（run_id, status で絞り込む）
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_crawl_frontier_run_status
+        ON crawl_frontier(run_id, status)
+    """)
+
+
+def _migration_008_work_queue(cursor: sqlite3.Cursor):
+    """複数ワーカーで分担するクロールのタスクキュー（work_tasks）"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS work_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            plan VARCHAR(100) NOT NULL,
+            site VARCHAR(50) NOT NULL,
+            keyword VARCHAR(100) NOT NULL,
+            area VARCHAR(100) NOT NULL,
+            page INTEGER NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            lease_owner VARCHAR(100),
+            lease_token VARCHAR(64),
+            lease_expires_at REAL,
+            result TEXT,
+            error_message TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(plan, site, keyword, area, page)
+        )
+    """)
+    # 取り出し（status で絞って id 順）と、期限切れのリースの回収（lease_expires_at）
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_work_tasks_status
+        ON work_tasks(status, id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_work_tasks_lease
+        ON work_tasks(status, lease_expires_at)
+    """)
+
+
+def _migration_009_fts_without_udf(cursor: sqlite3.Cursor):
+    """全文検索インデックスのトリガーからアプリ独自のSQL関数 nfkc() を除く"""
+    # 追加・更新は JobRepository が行う。削除のトリガー jobs_fts_ad はSQL関数を使わないため残す
+    cursor.execute("DROP TRIGGER IF EXISTS jobs_fts_ai")
+    cursor.execute("DROP TRIGGER IF EXISTS jobs_fts_au")
+    rebuild_jobs_fts(cursor)
+
+
+# (バージョン, 適用関数) のリスト。必ずバージョン昇順で末尾に追加すること
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Cursor], None]]] = [
+    (1, _migration_001_initial),
+    (2, _migration_002_source_url_index),
+    (3, _migration_003_jobs_fts),
+    (4, _migration_004_job_stats),
+    (5, _migration_005_content_hash),
+    (6, _migration_006_query_indexes),
+    (7, _migration_007_crawl_frontier),
+    (8, _migration_008_work_queue),
+    (9, _migration_009_fts_without_udf),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """現在のスキーマバージョンを取得"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    未適用のマイグレーションを順番に適用
+
+    Args:
+        conn: SQLite接続
+
+    Returns:
+        適用後のスキーマバージョン
+    """
+    current = get_schema_version(conn)
+
+    for version, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+
+        cursor = conn.cursor()
+        try:
+            # DDLも含めて1トランザクションで適用し、途中失敗時はバージョンごと巻き戻す。
+            # 複数プロセスが同時に新しいDBを開いた場合に同じマイグレーションを二重に適用しないよう、
+            # 先に書き込みロックを取ってからバージョンを読み直す
+            cursor.execute("BEGIN IMMEDIATE")
+            current = get_schema_version(conn)
+            if version <= current:
+                conn.rollback()
+                continue
+
+            logger.info(f"Applying schema migration {version}: {migrate.__doc__}")
+            migrate(cursor)
+            # PRAGMAはパラメータバインド不可のため整数を直接埋め込む
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        current = version
+
+    return current
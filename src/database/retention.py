@@ -0,0 +1,213 @@
+"""
+保持期間管理（古い求人の削除・アーカイブ）
+書き込みロックを長時間握らないよう、期限切れの求人をチャンク単位の短いトランザクションで削除する
+"""
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+ARCHIVE_FORMATS = ("jsonl", "parquet")
+
+# parquetで数値として保持する列（それ以外は型が混在しうるため文字列で保存する）
+_PARQUET_INT_COLUMNS = ("id", "source_id", "is_new", "is_filtered")
+
+
+@dataclass
+class RetentionResult:
+    """保持期間処理の結果"""
+    deleted_count: int = 0
+    archived_count: int = 0
+    chunk_count: int = 0
+    freed_pages: int = 0
+    archive_files: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class _JsonlArchive:
+    """月ごとのgzip圧縮JSONLファイル（既存ファイルには追記する）"""
+
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = archive_dir
+        self._files: Dict[str, Any] = {}
+
+    def write(self, month: str, rows: List[Dict[str, Any]]) -> Path:
+        path = self.archive_dir / f"jobs_{month}.jsonl.gz"
+        f = self._files.get(month)
+        if f is None:
+            # gzipは複数メンバーの連結を1ファイルとして読めるため、追記で問題ない
+            f = gzip.open(path, "at", encoding="utf-8")
+            self._files[month] = f
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, default=str))
+            f.write("\n")
+        # 削除をコミットする前に圧縮済みデータを書き出しておく
+        f.flush()
+        return path
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+class _ParquetArchive:
+    """月ごとのparquetファイル（チャンクごとに完結した別ファイルに書く。pyarrowが必要）"""
+
+    def __init__(self, archive_dir: Path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("parquet形式のアーカイブには pyarrow が必要です（pip install pyarrow）") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.archive_dir = archive_dir
+        self._run_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._sequence = 0
+
+    def write(self, month: str, rows: List[Dict[str, Any]]) -> Path:
+        # parquetはフッターを書くまで読めないため、書き込み中のファイルを持ち越さず、
+        # 削除をコミットする前にファイルを閉じ終えておく
+        self._sequence += 1
+        path = self.archive_dir / f"jobs_{month}_{self._run_stamp}_{self._sequence:05d}.parquet"
+        schema = self._pa.schema([
+            (col, self._pa.int64() if col in _PARQUET_INT_COLUMNS else self._pa.string())
+            for col in rows[0]
+        ])
+        records = [
+            {
+                col: value if value is None or col in _PARQUET_INT_COLUMNS else str(value)
+                for col, value in row.items()
+            }
+            for row in rows
+        ]
+        self._pq.write_table(self._pa.Table.from_pylist(records, schema=schema), str(path), compression="zstd")
+        return path
+
+    def close(self):
+        pass
+
+
+class RetentionManager:
+    """保持期間を過ぎた求人の削除・アーカイブ・領域解放"""
+
+    DEFAULT_CHUNK_SIZE = 1000
+
+    # チャンク間で書き込みロックを手放す時間（秒）。クロールの保存処理を割り込ませる
+    CHUNK_PAUSE = 0.01
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+
+    def purge(
+        self,
+        days: int = 90,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        archive_dir: Optional[str] = None,
+        archive_format: str = "jsonl",
+        vacuum: bool = True,
+    ) -> RetentionResult:
+        """
+        crawled_at が days 日より前の求人を削除
+
+        Args:
+            days: 保持日数
+            chunk_size: 1トランザクションで削除する最大件数
+            archive_dir: 指定すると削除前に月別ファイル（crawled_at の年月）へ書き出す
+            archive_format: "jsonl"（gzip圧縮）または "parquet"（pyarrowが必要）
+            vacuum: 削除後に incremental_vacuum で空き領域をファイルから解放する（auto_vacuum = INCREMENTAL のDBのみ）
+
+        アーカイブは各チャンクの削除をコミットする前に書き終えるため、途中で終了しても削除済みの求人は
+        必ずアーカイブに残る。ただしコミットが失敗した場合はアーカイブ済みの求人がDBにも残り、次回の
+        実行で再度書き出される（at-least-once）。アーカイブを読み込む側で id による重複除去を行うこと。
+
+        Returns:
+            RetentionResult
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+
+        cutoff = datetime.now() - timedelta(days=days)
+        result = RetentionResult()
+        start = time.perf_counter()
+
+        archive = None
+        if archive_dir:
+            Path(archive_dir).mkdir(parents=True, exist_ok=True)
+            archive_cls = _ParquetArchive if archive_format == "parquet" else _JsonlArchive
+            archive = archive_cls(Path(archive_dir))
+
+        try:
+            while True:
+                deleted = self._purge_chunk(cutoff, chunk_size, archive, result)
+                if not deleted:
+                    break
+                result.deleted_count += deleted
+                result.chunk_count += 1
+                if deleted < chunk_size:
+                    break
+                time.sleep(self.CHUNK_PAUSE)
+        finally:
+            if archive is not None:
+                archive.close()
+
+        if vacuum and result.deleted_count:
+            result.freed_pages = self.db.incremental_vacuum()
+
+        result.elapsed = time.perf_counter() - start
+        logger.info(
+            f"Retention purge: deleted {result.deleted_count} jobs older than {days} days "
+            f"in {result.chunk_count} chunks (archived {result.archived_count}, "
+            f"freed {result.freed_pages} pages, {result.elapsed:.2f}s)"
+        )
+        return result
+
+    def _purge_chunk(
+        self,
+        cutoff: datetime,
+        chunk_size: int,
+        archive,
+        result: RetentionResult
+    ) -> int:
+        """期限切れの求人を最大 chunk_size 件アーカイブして削除（1トランザクション）"""
+        with self.db.write_transaction() as conn:
+            cursor = conn.cursor()
+            if archive is None:
+                cursor.execute(
+                    "SELECT id FROM jobs WHERE crawled_at < ? ORDER BY crawled_at LIMIT ?",
+                    (cutoff, chunk_size)
+                )
+                rows = cursor.fetchall()
+            else:
+                cursor.execute(
+                    "SELECT * FROM jobs WHERE crawled_at < ? ORDER BY crawled_at LIMIT ?",
+                    (cutoff, chunk_size)
+                )
+                rows = cursor.fetchall()
+                by_month: Dict[str, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    record = dict(row)
+                    by_month.setdefault(str(record['crawled_at'])[:7], []).append(record)
+                for month, records in by_month.items():
+                    path = str(archive.write(month, records))
+                    if path not in result.archive_files:
+                        result.archive_files.append(path)
+                    result.archived_count += len(records)
+
+            if not rows:
+                return 0
+
+            cursor.executemany("DELETE FROM jobs WHERE id = ?", [(row['id'],) for row in rows])
+            return cursor.rowcount
@@ -3,7 +3,7 @@
 要件定義 7章 CSV出力時の除外・フィルタリングルールに準拠
 """
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
 import re
 import logging
 
@@ -180,6 +180,29 @@ class JobFilter:
         logger.info(f"Filtering completed: {result.total_count} -> {len(filtered_jobs)} jobs")
         return result
 
+    def iter_filtered(self, jobs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        求人を1件ずつ判定し、filter_jobs で除外されないものと同じ求人を返すジェネレータ
+
+        電話番号のない求人は判定しだい返す。電話番号のある求人は filter_jobs と同じ優先順位
+        （_should_replace）で電話番号ごとに1件に絞り、入力を読み終えてから返すため、
+        電話番号の種類数ぶんの求人を保持する（電話番号のない求人は保持しない）。
+        重複の絞り込みは除外判定より先に行う（残した求人が除外対象なら、その電話番号の求人は返さない）。
+        """
+        phone_map: Dict[str, Dict[str, Any]] = {}
+        for job in jobs:
+            phone = job.get('phone_number_normalized', '')
+            if phone:
+                existing = phone_map.get(phone)
+                if existing is None or self._should_replace(existing, job):
+                    phone_map[phone] = job
+            elif self._check_exclusion(job) is None:
+                yield job
+
+        for job in phone_map.values():
+            if self._check_exclusion(job) is None:
+                yield job
+
     def _remove_phone_duplicates(self, jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
         """
         電話番号による重複削除
@@ -153,6 +153,14 @@ class MainWindow(QMainWindow):
         self.init_ui()
         self.load_stats()
 
+        # 共有ブラウザを裏で起動しておき、最初のクロール開始を待たせない
+        self.service.start_browser(prewarm=True)
+
+    def closeEvent(self, event):
+        """ウィンドウを閉じる際に共有ブラウザとDB接続を終了"""
+        self.service.close()
+        super().closeEvent(event)
+
     def init_ui(self):
         """UIを初期化"""
         self.setWindowTitle("求人情報自動収集システム - タウンワーク")
@@ -1,5 +1,6 @@
 # Services module
 from .csv_exporter import CSVExporter
 from .crawl_service import CrawlService
+from .sharded_runner import ShardedCrawlRunner
 
-__all__ = ['CSVExporter', 'CrawlService']
+__all__ = ['CSVExporter', 'CrawlService', 'ShardedCrawlRunner']
@@ -0,0 +1,67 @@
+"""
+クロールフロンティアとスクレイパーの接続
+一覧ページの取得の開始・失敗・打ち切りを作業項目に記録する
+"""
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import sys
+import os
+
+# パス追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scrapers.base_scraper import PageBatch, PageListener
+from src.database.frontier_repository import FrontierRepository
+
+logger = logging.getLogger(__name__)
+
+
+class FrontierPageListener(PageListener):
+    """
+    スクレイパーのページ単位の進捗をクロールフロンティアに記録する
+
+    取得するページは実行の未取得（pending）の項目に絞り込む。取得できたページの完了は
+    求人の保存と同じトランザクションで commit_page が記録するため、
+    途中でプロセスが落ちても保存済みのページは再開時に取得し直さず、未保存のページは取得し直す。
+    """
+
+    def __init__(self, frontier: FrontierRepository, run_id: int):
+        """
+        Args:
+            frontier: クロールフロンティアリポジトリ
+            run_id: 実行ID
+        """
+        self.frontier = frontier
+        self.run_id = run_id
+
+        # 統計（進捗表示用）
+        self.pages_failed = 0
+        self.pages_skipped = 0
+
+    def pending_pages(self, keyword: str, area: str, max_pages: int) -> Optional[List[int]]:
+        return [
+            page_num
+            for page_num in self.frontier.pending_pages(self.run_id, keyword, area)
+            if page_num <= max_pages
+        ]
+
+    def page_started(self, keyword: str, area: str, page_num: int):
+        self.frontier.mark_running(self.run_id, keyword, area, page_num)
+
+    def commit_page(self, batch: PageBatch, save: Callable[[List[Dict[str, Any]]], None]):
+        """ページの求人を save で保存し、同じトランザクションで作業項目を完了にする"""
+        with self.frontier.db.write_transaction():
+            if batch.jobs:
+                save(batch.jobs)
+            self.frontier.mark_done(self.run_id, batch.keyword, batch.area, batch.page_num, len(batch.jobs))
+
+    def page_failed(self, keyword: str, area: str, page_num: int, error: str):
+        logger.warning(f"Run {self.run_id}: page {page_num} of {keyword} / {area} failed: {error}")
+        self.frontier.mark_failed(self.run_id, keyword, area, page_num, error)
+        self.pages_failed += 1
+
+    def pages_exhausted(self, keyword: str, area: str, page_num: int):
+        skipped = self.frontier.skip_pages_from(self.run_id, keyword, area, page_num)
+        self.pages_skipped += skipped
+        if skipped:
+            logger.info(f"Run {self.run_id}: skipped {skipped} pages from page {page_num} of {keyword} / {area}")
@@ -0,0 +1,147 @@
+"""
+クロールのストリーミングパイプライン
+取得 → 正規化 → 重複除去 → 保存 の各段を上限付きのキューでつなぎ、ページ単位で並行に処理する
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Set
+import logging
+import sys
+import os
+
+# パス追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scrapers.base_scraper import PageBatch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineStats:
+    """パイプラインの処理件数"""
+    pages: int = 0
+    scraped_count: int = 0    # 取得した求人数（重複を含む）
+    duplicate_count: int = 0  # 同じ実行の別ページで取得済みのため除いた求人数
+    persisted_count: int = 0  # 保存段に渡した求人数
+    max_queued_pages: int = 0  # 段の間のキューに同時に溜まったページ数の最大
+
+
+class CrawlPipeline:
+    """
+    一覧ページ単位のストリーミング処理
+
+    各段は別のタスクで動き、段の間は queue_size ページまでのキューでつなぐ。
+    保存が遅れるとキューが埋まって前段が待ち、最終的にページの取得も待たせる（背圧）。
+    保存はスレッドで実行するため、DBへの書き込み中もイベントループ上の取得は止まらない。
+    メモリに載るのは各キューのページ分と重複除去用のキーだけで、クロールの規模によらない。
+
+    使用例:
+        pipeline = CrawlPipeline(normalize=normalize_job, key=get_job_key, persist=save_batch)
+        stats = await pipeline.run(scraper.iter_pages(keywords, areas, browser=browser))
+    """
+
+    DEFAULT_QUEUE_SIZE = 4
+
+    def __init__(
+        self,
+        persist: Callable[[PageBatch], None],
+        normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        key: Optional[Callable[[Dict[str, Any]], Hashable]] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        """
+        Args:
+            persist: 1ページ分を保存する関数（スレッドで実行される。求人が全て重複でも呼ばれる）
+            normalize: 求人1件を正規化する関数
+            key: 重複判定のキー（省略時は重複除去しない）
+            queue_size: 段の間のキューに溜めるページ数の上限
+        """
+        self.persist = persist
+        self.normalize = normalize
+        self.key = key
+        self.queue_size = max(1, queue_size)
+        self.stats = PipelineStats()
+        self._seen: Set[Hashable] = set()
+
+    async def run(self, batches: AsyncIterator[PageBatch]) -> PipelineStats:
+        """
+        batches を最後まで処理する（どこかの段で例外が起きたら残りの段を止めて送出）
+
+        Returns:
+            処理件数
+        """
+        normalize_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        dedupe_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        queues = (normalize_queue, dedupe_queue, persist_queue)
+
+        async def extract():
+            async for batch in batches:
+                self.stats.pages += 1
+                self.stats.scraped_count += len(batch.jobs)
+                await self._put(normalize_queue, batch, queues)
+            await normalize_queue.put(None)
+
+        async def stage(source: asyncio.Queue, target: asyncio.Queue, process: Callable[[PageBatch], PageBatch]):
+            while True:
+                batch = await source.get()
+                if batch is None:
+                    await target.put(None)
+                    return
+                await self._put(target, process(batch), queues)
+
+        async def persist():
+            while True:
+                batch = await persist_queue.get()
+                if batch is None:
+                    return
+                await asyncio.to_thread(self.persist, batch)
+                self.stats.persisted_count += len(batch.jobs)
+
+        tasks = [
+            asyncio.create_task(extract()),
+            asyncio.create_task(stage(normalize_queue, dedupe_queue, self._normalize)),
+            asyncio.create_task(stage(dedupe_queue, persist_queue, self._dedupe)),
+            asyncio.create_task(persist()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # 途中で止めた場合も取得側（スクレイピング）を確実に終わらせる
+            aclose = getattr(batches, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        logger.info(
+            f"Pipeline: {self.stats.pages} pages, {self.stats.scraped_count} jobs scraped, "
+            f"{self.stats.duplicate_count} duplicates, {self.stats.persisted_count} persisted "
+            f"(max {self.stats.max_queued_pages} pages queued)"
+        )
+        return self.stats
+
+    async def _put(self, queue: asyncio.Queue, batch: PageBatch, queues: tuple):
+        await queue.put(batch)
+        self.stats.max_queued_pages = max(self.stats.max_queued_pages, sum(q.qsize() for q in queues))
+
+    def _normalize(self, batch: PageBatch) -> PageBatch:
+        if self.normalize is not None:
+            batch.jobs = [self.normalize(job) for job in batch.jobs]
+        return batch
+
+    def _dedupe(self, batch: PageBatch) -> PageBatch:
+        if self.key is None:
+            return batch
+        unique: List[Dict[str, Any]] = []
+        for job in batch.jobs:
+            key = self.key(job)
+            if key in self._seen:
+                self.stats.duplicate_count += 1
+                continue
+            self._seen.add(key)
+            unique.append(job)
+        batch.jobs = unique
+        return batch
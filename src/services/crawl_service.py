@@ -4,8 +4,8 @@
 """
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Callable
-from collections import Counter
+from typing import List, Dict, Any, Optional, Awaitable, Callable, Tuple, Type
+from urllib.parse import urlparse, urlunparse
 import logging
 import sys
 import os
@@ -13,17 +13,64 @@ import os
 # パス追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from scrapers.base_scraper import BaseScraper, KnownJobChecker, PageBatch
 from scrapers.townwork import TownworkScraper
 from src.database.db_manager import DatabaseManager
-from src.database.job_repository import JobRepository
+from src.database.job_repository import JobRepository, BulkSaveResult, SAVE_STATUS_NEW
+from src.database.frontier_repository import FrontierRepository, CrawlRun
+from src.database.retention import RetentionManager
 from src.filters.job_filter import JobFilter, FilterResult
 from src.services.csv_exporter import CSVExporter
+from src.services.crawl_frontier import FrontierPageListener
+from src.services.crawl_pipeline import CrawlPipeline, PipelineStats
+from src.work_queue import WorkQueue, plan_tasks
+from utils.browser_manager import BrowserManager
 
 logger = logging.getLogger(__name__)
 
 # デバッグログフラグ（True: 詳細ログ出力、False: 出力しない）
 DEBUG_JOB_LOG = True
 
+# (媒体名, キーワード, 地域, 最大ページ数, オプション, 進捗の通知先, パイプライン) → 処理件数
+PageCrawler = Callable[
+    [str, List[str], List[str], int, Dict[str, Any], FrontierPageListener, CrawlPipeline],
+    Awaitable[PipelineStats]
+]
+
+
+def normalize_job_url(url: Optional[str]) -> str:
+    """求人URLからクエリやフラグメントを除去し、末尾スラッシュを揃える"""
+    if not url:
+        return ""
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    path = path.rstrip("/") or "/"
+    return urlunparse((parsed.scheme, parsed.netloc, path, "", "", ""))
+
+
+def known_job_checker(job_repository: JobRepository, source_name: str) -> KnownJobChecker:
+    """スクレイパーの (求人ID, 詳細URL) を保存時と同じ規則で正規化してDBの既存判定を行う関数"""
+    def is_known(keys: List[Tuple[Optional[str], str]]) -> List[bool]:
+        return job_repository.find_existing_jobs(source_name, [
+            job_repository.get_job_key({'job_id': job_id, 'page_url': normalize_job_url(url)})
+            for job_id, url in keys
+        ])
+    return is_known
+
+
+def create_scraper(
+    scraper_class: Type[BaseScraper],
+    options: Dict[str, Any],
+    is_known: Optional[KnownJobChecker] = None
+) -> BaseScraper:
+    """クロールのオプション（レスポンスキャッシュ・増分クロール）を適用したスクレイパーを作成"""
+    scraper = scraper_class()
+    if options.get('use_cache'):
+        scraper.enable_response_cache()
+    if options.get('incremental') and is_known is not None:
+        scraper.enable_incremental(is_known, options.get('known_pages_to_stop', 1))
+    return scraper
+
 
 class CrawlService:
     """クローリングサービスクラス"""
@@ -35,9 +82,13 @@ class CrawlService:
     ):
         self.db_manager = DatabaseManager(db_path)
         self.job_repository = JobRepository(self.db_manager)
+        self.frontier_repository = FrontierRepository(self.db_manager)
         self.job_filter = JobFilter()
         self.csv_exporter = CSVExporter(output_dir)
 
+        # 全クロールで共有するブラウザ（初回クロール時または start_browser() で起動）
+        self.browser_manager = BrowserManager()
+
         # スクレイパー（タウンワークのみ）
         self.scrapers = {
             "townwork": TownworkScraper,
@@ -46,6 +97,15 @@ class CrawlService:
         # 進捗コールバック
         self.progress_callback: Optional[Callable[[str, int, int], None]] = None
 
+    def start_browser(self, prewarm: bool = True):
+        """共有ブラウザを起動（prewarm=Trueならバックグラウンドで起動し、呼び出し元はブロックしない）"""
+        self.browser_manager.start(prewarm=prewarm)
+
+    def close(self):
+        """共有ブラウザとDB接続を閉じる（アプリ終了時に呼ぶ）"""
+        self.browser_manager.shutdown()
+        self.db_manager.close()
+
     def set_progress_callback(self, callback: Callable[[str, int, int], None]):
         """進捗コールバックを設定"""
         self.progress_callback = callback
@@ -56,67 +116,39 @@ class CrawlService:
             self.progress_callback(message, current, total)
         logger.info(f"{message} ({current}/{total})")
 
-    def _output_debug_job_log(self, jobs: List[Dict[str, Any]]):
-        """デバッグ用: 取得した全件のjob_idとURLを出力"""
-        import sys
-
-        # ログ出力用のヘルパー関数
-        def log(msg: str):
-            logger.info(msg)
-            print(msg, file=sys.stderr, flush=True)
+    @staticmethod
+    def _debug_log(msg: str):
+        """デバッグログを標準エラーにも出力"""
+        logger.info(msg)
+        print(msg, file=sys.stderr, flush=True)
 
+    def _output_debug_job_log(self, batch: PageBatch, start: int = 1):
+        """デバッグ用: 保存する1ページ分のjob_idとURLを出力（start は通し番号の開始）"""
+        log = self._debug_log
         log("\n" + "=" * 80)
-        log(f"[DEBUG] 取得求人一覧 (全{len(jobs)}件)")
+        log(f"[DEBUG] 取得求人一覧 [{batch.area}] {batch.keyword} {batch.page_num}ページ目 ({len(batch.jobs)}件)")
         log("=" * 80)
 
-        job_ids = []
-        urls = []
-
-        for i, job in enumerate(jobs, 1):
+        for i, job in enumerate(batch.jobs, start):
             job_id = job.get('job_id') or job.get('job_number') or "N/A"
             url = job.get('page_url') or job.get('url') or "N/A"
             title = job.get('job_title') or job.get('title') or "N/A"
             company = job.get('company_name') or job.get('company') or "N/A"
 
-            job_ids.append(job_id)
-            urls.append(url)
-
             log(f"{i:3d}. job_id: {job_id}")
             log(f"     URL: {url}")
             log(f"     会社: {company[:30]}... | 職種: {title[:30]}...")
             log("-" * 40)
 
-        # 重複チェック
+    def _output_debug_summary(self, stats: PipelineStats):
+        """デバッグ用: 取得件数と重複の集計を出力"""
+        log = self._debug_log
         log("\n" + "=" * 80)
         log("[DEBUG] 重複分析")
         log("=" * 80)
-
-        # job_id重複
-        job_id_counts = Counter(job_ids)
-        duplicated_job_ids = {k: v for k, v in job_id_counts.items() if v > 1 and k != "N/A"}
-        if duplicated_job_ids:
-            log(f"\n重複job_id ({len(duplicated_job_ids)}種類):")
-            for jid, count in sorted(duplicated_job_ids.items(), key=lambda x: -x[1]):
-                log(f"  {jid}: {count}回")
-        else:
-            log("\njob_idの重複: なし")
-
-        # URL重複
-        url_counts = Counter(urls)
-        duplicated_urls = {k: v for k, v in url_counts.items() if v > 1 and k != "N/A"}
-        if duplicated_urls:
-            log(f"\n重複URL ({len(duplicated_urls)}種類):")
-            for url, count in sorted(duplicated_urls.items(), key=lambda x: -x[1]):
-                log(f"  {url[:60]}...: {count}回")
-        else:
-            log("\nURLの重複: なし")
-
-        # ユニーク数
-        unique_job_ids = len(set(jid for jid in job_ids if jid != "N/A"))
-        unique_urls = len(set(u for u in urls if u != "N/A"))
-        log(f"\n総件数: {len(jobs)}")
-        log(f"ユニークjob_id数: {unique_job_ids}")
-        log(f"ユニークURL数: {unique_urls}")
+        log(f"\n総件数: {stats.scraped_count}（{stats.pages}ページ）")
+        log(f"重複（job_idまたはURLが取得済み）: {stats.duplicate_count}件")
+        log(f"ユニーク数: {stats.persisted_count}")
         log("=" * 80 + "\n")
 
     async def crawl_townwork(
@@ -125,95 +157,267 @@ class CrawlService:
         areas: List[str],
         max_pages: int = 5,
         parallel: int = 5,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        use_cache: bool = False,
+        incremental: bool = False,
+        known_pages_to_stop: int = 1,
+        collect_jobs: bool = True,
+        queue_size: int = CrawlPipeline.DEFAULT_QUEUE_SIZE
     ) -> Dict[str, Any]:
         """
         タウンワークをクロール
 
+        キーワード×地域×ページの作業項目をクロールフロンティアに登録し、取得したページを
+        ストリーミングで正規化・重複除去・保存する（件数によらずメモリ使用量は一定）。
+        途中で中断した場合は結果の run_id を resume() に渡すと続きから再開できる。
+
         Args:
             keywords: 検索キーワードリスト
             areas: 地域リスト
             max_pages: 最大ページ数
             parallel: 並列数
             filters: 検索フィルタ
+            use_cache: 一覧・詳細ページのレスポンスキャッシュ（data/http_cache）を使うか
+            incremental: 増分クロール（DBに既存の求人は抽出せず、既知の求人だけのページが続いたら打ち切る）
+            known_pages_to_stop: 増分クロールでページ送りを打ち切る、既知の求人だけのページの連続数
+            collect_jobs: 結果の jobs にUI表示用の求人を入れるか（大規模なクロールでは False にする）
+            queue_size: パイプラインの段の間に溜めるページ数の上限
 
         Returns:
             クロール結果
         """
+        options = {
+            'parallel': parallel,
+            'filters': filters,
+            'use_cache': use_cache,
+            'incremental': incremental,
+            'known_pages_to_stop': known_pages_to_stop,
+            'collect_jobs': collect_jobs,
+            'queue_size': queue_size,
+        }
+        return await self._run_crawl("townwork", keywords, areas, max_pages, options)
+
+    async def resume(self, run_id: int) -> Dict[str, Any]:
+        """
+        中断したクロールを続きから再開
+
+        保存済みのページは取得し直さず、未取得・取得中のまま残ったページと
+        再試行の上限に達していない失敗ページだけを取得する。
+
+        Args:
+            run_id: crawl_townwork の結果の run_id（get_unfinished_runs で一覧を取得できる）
+
+        Returns:
+            クロール結果（今回の再開で取得・保存した分）
+        """
+        run = self.frontier_repository.get_run(run_id)
+        if run is None:
+            raise ValueError(f"Unknown crawl run: {run_id}")
+
+        reset = self.frontier_repository.reopen_run(run_id)
+        logger.info(f"Resuming crawl run {run_id} ({reset} interrupted pages re-queued)")
+        return await self._run_crawl(
+            run.source_name, run.keywords, run.areas, run.max_pages, run.options, run_id=run_id
+        )
+
+    def get_unfinished_runs(self, source_name: Optional[str] = None) -> List[CrawlRun]:
+        """完了していないクロールの実行を新しい順に取得"""
+        return self.frontier_repository.get_unfinished_runs(source_name)
+
+    def plan_distributed_crawl(
+        self,
+        queue: WorkQueue,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int = 5,
+        source_name: str = "townwork",
+        plan: Optional[str] = None,
+        max_attempts: int = WorkQueue.DEFAULT_MAX_ATTEMPTS
+    ) -> str:
+        """
+        キーワード×地域×ページのタスクをキューに登録（取得は QueueWorker、保存は collect_distributed_results）
+
+        Returns:
+            プラン名（省略時は日時から作成）
+        """
+        if source_name not in self.scrapers:
+            raise ValueError(f"Unknown source: {source_name}")
+
+        plan = plan or f"{source_name}-{datetime.now():%Y%m%d%H%M%S}"
+        added = queue.enqueue(plan_tasks(plan, source_name, keywords, areas, max_pages), max_attempts)
+        logger.info(f"Planned {added} tasks for {plan}")
+        return plan
+
+    def collect_distributed_results(
+        self,
+        queue: WorkQueue,
+        plan: Optional[str] = None,
+        batch_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        ワーカーが完了したタスクの求人を正規化・重複除去してDBに保存し、タスクを回収済みにする
+
+        保存の後に回収済みにするため、途中で落ちても次の回収で保存し直す（保存は upsert なので重複しない）。
+        ワーカーの実行中に繰り返し呼んでよい。
+
+        Returns:
+            保存結果の件数とキューの状態
+        """
+        result = {
+            'plan': plan,
+            'tasks': 0,
+            'scraped_count': 0,
+            'duplicate_count': 0,
+            'saved_count': 0,
+            'new_count': 0,
+            'changed_count': 0,
+            'unchanged_count': 0,
+        }
+        seen = set()
+        crawled_at = datetime.now()
+
+        while True:
+            task_results = queue.results(plan, limit=batch_size)
+            if not task_results:
+                break
+
+            jobs_by_source: Dict[str, List[Dict[str, Any]]] = {}
+            for task_result in task_results:
+                result['scraped_count'] += len(task_result.jobs)
+                for job in task_result.jobs:
+                    # URL差分（クエリ等）で重複を取り逃さないよう正規化
+                    if job.get('page_url'):
+                        job['page_url'] = self._normalize_url(job['page_url'])
+                    if job.get('url'):
+                        job['url'] = self._normalize_url(job['url'])
+                    job['crawled_at'] = crawled_at
+
+                    key = (task_result.task.site, self.job_repository.get_job_key(job))
+                    if key in seen:
+                        result['duplicate_count'] += 1
+                        continue
+                    seen.add(key)
+                    jobs_by_source.setdefault(task_result.task.site, []).append(job)
+
+            for source_name, jobs in jobs_by_source.items():
+                save_result, new_urls = self._save_jobs(jobs, source_name)
+                result['saved_count'] += save_result.saved_count
+                result['new_count'] += len(new_urls)
+                result['changed_count'] += save_result.changed_count
+                result['unchanged_count'] += save_result.unchanged_count
+
+            result['tasks'] += queue.mark_collected([task_result.task.id for task_result in task_results])
+
+        result['queue'] = queue.stats(plan)
+        logger.info(f"Collected distributed results: {result}")
+        return result
+
+    async def _run_crawl(
+        self,
+        source_name: str,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int,
+        options: Dict[str, Any],
+        run_id: Optional[int] = None,
+        crawl: Optional[PageCrawler] = None
+    ) -> Dict[str, Any]:
+        """
+        クロールフロンティアの実行を（run_id がなければ作成して）処理する
+
+        crawl（省略時は共有ブラウザでの取得）が取得したページを 正規化 → 重複除去 → 保存 の
+        パイプラインに流し、保存をページの取得と並行して行う（保存が遅れればページの取得を待たせる）。
+        """
         result = {
-            'source': 'townwork',
+            'source': source_name,
+            'run_id': run_id,
+            'run_status': None,
             'keywords': keywords,
             'areas': areas,
             'started_at': datetime.now(),
             'finished_at': None,
             'total_count': 0,
             'scraped_count': 0,  # 生の取得件数
+            'duplicate_count': 0,  # 同じクロールの別ページと重複したため除いた件数
             'saved_count': 0,
             'new_count': 0,
-            'jobs': [],  # 今回取得した求人（UI表示用）
+            'changed_count': 0,  # 既存求人のうち内容が変わった件数
+            'unchanged_count': 0,  # 既存求人のうち内容が同一の件数（書き換えなし）
+            'jobs': [],  # 今回取得した求人（UI表示用。collect_jobs が False なら空）
             'error': None,
         }
 
         try:
-            self._report_progress("タウンワーク クローリング開始", 0, 1)
+            self._report_progress(
+                "タウンワーク クローリング" + ("再開" if run_id is not None else "開始"), 0, 1
+            )
 
-            # スクレイパー初期化
-            scraper = TownworkScraper()
+            if run_id is None:
+                run_id = self.frontier_repository.create_run(source_name, keywords, areas, max_pages, options)
+                result['run_id'] = run_id
+
+            listener = FrontierPageListener(self.frontier_repository, run_id)
+            collect_jobs = options.get('collect_jobs', True)
+
+            def save_page(jobs: List[Dict[str, Any]]):
+                save_result, page_new_urls = self._save_jobs(jobs, source_name)
+                result['saved_count'] += save_result.saved_count
+                result['new_count'] += len(page_new_urls)
+                result['changed_count'] += save_result.changed_count
+                result['unchanged_count'] += save_result.unchanged_count
+                # 新規扱いとなったURLはページごとにログ出力し、クロール全体では件数だけを保持する
+                for url in page_new_urls:
+                    logger.info(f"NEW: {url}")
 
-            # スクレイピング実行
-            jobs = await scraper.scrape(
-                keywords=keywords,
-                areas=areas,
-                max_pages=max_pages,
-                parallel=parallel,
-                filters=filters
+            def persist(batch: PageBatch):
+                # デバッグログ出力
+                if DEBUG_JOB_LOG and batch.jobs:
+                    self._output_debug_job_log(batch, start=result['total_count'] + 1)
+                # 求人の保存と作業項目の完了を1トランザクションで記録
+                listener.commit_page(batch, save_page)
+                result['total_count'] += len(batch.jobs)
+                # UI表示用には表示に使う項目だけを残す
+                if collect_jobs:
+                    result['jobs'].extend(self._prepare_job_record(job) for job in batch.jobs)
+
+            crawled_at = datetime.now()
+
+            def normalize(job: Dict[str, Any]) -> Dict[str, Any]:
+                # URL差分（クエリ等）で重複を取り逃さないよう正規化
+                if job.get('page_url'):
+                    job['page_url'] = self._normalize_url(job['page_url'])
+                if job.get('url'):
+                    job['url'] = self._normalize_url(job['url'])
+                job['crawled_at'] = crawled_at
+                return job
+
+            pipeline = CrawlPipeline(
+                persist=persist,
+                normalize=normalize,
+                key=self.job_repository.get_job_key,
+                queue_size=options.get('queue_size', CrawlPipeline.DEFAULT_QUEUE_SIZE)
             )
 
-            result['total_count'] = len(jobs)
-            result['scraped_count'] = len(jobs)
-            self._report_progress(f"取得完了: {len(jobs)}件", 1, 2)
+            try:
+                stats = await (crawl or self._crawl_in_process)(
+                    source_name, keywords, areas, max_pages, options, listener, pipeline
+                )
+            finally:
+                result['run_status'] = self.frontier_repository.finish_run(run_id)
+
+            result['scraped_count'] = stats.scraped_count
+            result['duplicate_count'] = stats.duplicate_count
+            self._report_progress(f"取得完了: {stats.scraped_count}件", 1, 2)
 
-            # デバッグログ出力
             if DEBUG_JOB_LOG:
-                self._output_debug_job_log(jobs)
-
-            # データベースに保存
-            saved_count = 0
-            new_count = 0
-            new_urls = []
-            for job in jobs:
-                try:
-                    # URL差分（クエリ等）で重複を取り逃さないよう正規化
-                    if job.get('page_url'):
-                        job['page_url'] = self._normalize_url(job['page_url'])
-                    if job.get('url'):
-                        job['url'] = self._normalize_url(job['url'])
+                self._output_debug_summary(stats)
 
-                    job['crawled_at'] = datetime.now()
-                    # 既存チェック
-                    existing = self._check_existing(job)
-                    self.job_repository.save_job(job, "townwork")
-
-                    saved_count += 1
-                    if not existing:
-                        new_count += 1
-                        new_urls.append(job.get("page_url") or job.get("url") or "N/A")
-                except Exception as e:
-                    logger.warning(f"Failed to save job: {e}")
-
-            result['saved_count'] = saved_count
-            result['new_count'] = new_count
-            # 今回取得した全データをそのまま返す（DB保存の成否に関係なく）
-            result['jobs'] = [self._prepare_job_record(job) for job in jobs]
-
-            self._report_progress(f"保存完了: {saved_count}件（新着: {new_count}件）", 2, 2)
-
-            # 新規扱いとなったURLをログ出力
-            if new_urls:
-                logger.info("=== 新規扱いURL一覧 ===")
-                for url in new_urls:
-                    logger.info(f"NEW: {url}")
-                logger.info(f"=== 新規URL合計: {len(new_urls)}件 ===")
+            self._report_progress(f"保存完了: {result['saved_count']}件"
+                f"（新着: {result['new_count']}件 / 変更: {result['changed_count']}件 / "
+                f"変更なし: {result['unchanged_count']}件）", 2, 2)
+
+            if result['new_count']:
+                logger.info(f"=== 新規URL合計: {result['new_count']}件 ===")
 
             # クロールログを記録
             self._save_crawl_log(result)
@@ -225,52 +429,64 @@ class CrawlService:
         result['finished_at'] = datetime.now()
         return result
 
-    def _check_existing(self, job: Dict[str, Any]) -> bool:
-        """既存の求人かチェック"""
-        source_id = self.db_manager.get_source_id("townwork")
-        if not source_id:
-            return False
+    async def _crawl_in_process(
+        self,
+        source_name: str,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int,
+        options: Dict[str, Any],
+        listener: FrontierPageListener,
+        pipeline: CrawlPipeline
+    ) -> PipelineStats:
+        """このプロセスの共有ブラウザでスクレイピングし、取得したページをパイプラインに流す"""
+        scraper = create_scraper(
+            self.scrapers[source_name], options, self._known_job_checker(source_name)
+        )
+        scraper.page_listener = listener
+
+        # 共有ブラウザのイベントループ上で実行（呼び出し元のループ・スレッドは問わない）
+        async def crawl_with_shared_browser() -> PipelineStats:
+            return await pipeline.run(scraper.iter_pages(
+                keywords=keywords,
+                areas=areas,
+                max_pages=max_pages,
+                parallel=options.get('parallel', 5),
+                filters=options.get('filters'),
+                browser=await self.browser_manager.get_browser()
+            ))
 
-        job_identifier = job.get('job_id') or job.get('job_number')
-        page_url = self._normalize_url(job.get('page_url') or job.get('url'))
+        return await self.browser_manager.run(crawl_with_shared_browser())
 
-        if not job_identifier and not page_url:
-            # IDもURLも無い場合は内容ハッシュで近似判定
-            job_identifier = self.job_repository._generate_fallback_id(job)
-        else:
-            # 既存判定時もURL・テキストを正規化した値を使う
-            normalized_job = {
-                "company": job.get("company") or job.get("company_name") or "",
-                "title": job.get("title") or job.get("job_title") or "",
-                "location": job.get("location") or job.get("work_location") or "",
-            }
-            norm_fallback = self.job_repository._generate_fallback_id(normalized_job)
-            job_identifier = job_identifier or norm_fallback
-
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT 1
-                FROM jobs
-                WHERE source_id = ?
-                  AND (job_id = ? OR page_url = ?)
-                LIMIT 1
-                """,
-                (source_id, job_identifier or page_url, page_url or job_identifier)
-            )
-            return cursor.fetchone() is not None
+    def _save_jobs(self, jobs: List[Dict[str, Any]], source_name: str) -> Tuple[BulkSaveResult, List[str]]:
+        """
+        正規化済みの求人を一括保存
+
+        Returns:
+            (保存結果, 新規扱いとなったURLのリスト)
+        """
+        # 既存判定（job_id・URLのどちらかが一致すれば既存）を保存前に一括で行う
+        known_flags = self.job_repository.find_existing_jobs(
+            source_name,
+            [self.job_repository.get_job_key(job) for job in jobs]
+        )
+
+        # データベースに一括保存（1トランザクション）
+        save_result = self.job_repository.upsert_jobs(jobs, source_name)
+        new_urls = [
+            job.get("page_url") or job.get("url") or "N/A"
+            for job, status, known in zip(jobs, save_result.statuses, known_flags)
+            if status == SAVE_STATUS_NEW and not known
+        ]
+        return save_result, new_urls
+
+    def _known_job_checker(self, source_name: str) -> KnownJobChecker:
+        """スクレイパーの (求人ID, 詳細URL) を保存時と同じ規則で正規化してDBの既存判定を行う関数"""
+        return known_job_checker(self.job_repository, source_name)
 
     def _normalize_url(self, url: Optional[str]) -> str:
         """クエリやフラグメントを除去し、末尾スラッシュを揃えたURLに正規化"""
-        if not url:
-            return ""
-        from urllib.parse import urlparse, urlunparse
-
-        parsed = urlparse(url)
-        path = parsed.path or "/"
-        path = path.rstrip("/") or "/"
-        return urlunparse((parsed.scheme, parsed.netloc, path, "", "", ""))
+        return normalize_job_url(url)
 
     def _prepare_job_record(self, job: Dict[str, Any]) -> Dict[str, Any]:
         """テーブル表示用にキーを正規化"""
@@ -290,7 +506,7 @@ class CrawlService:
         if not source_id:
             return
 
-        with self.db_manager.get_connection() as conn:
+        with self.db_manager.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO crawl_logs (
@@ -309,7 +525,6 @@ class CrawlService:
                 result['started_at'],
                 result['finished_at'],
             ))
-            conn.commit()
 
     def get_jobs_with_filter(
         self,
@@ -359,6 +574,36 @@ class CrawlService:
         output_path = self.csv_exporter.export(jobs, keyword, area)
         return str(output_path)
 
+    def export_db_to_csv(
+        self,
+        source_name: Optional[str] = None,
+        keyword: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        apply_filter: bool = True,
+        area: Optional[str] = None
+    ) -> str:
+        """
+        DB上の求人を全件ストリーミングでCSVにエクスポート
+
+        get_jobs_with_filter と違い件数上限がなく、キーセットページングで
+        チャンクずつ読みながら書き出すためメモリ使用量は件数によらず一定。
+        """
+        jobs = (
+            job
+            for chunk in self.job_repository.iter_jobs(
+                source_name=source_name,
+                keyword=keyword,
+                prefecture=prefecture,
+                is_filtered=False
+            )
+            for job in chunk
+        )
+        if apply_filter:
+            jobs = self.job_filter.iter_filtered(jobs)
+
+        output_path = self.csv_exporter.export(jobs, keyword, area or prefecture)
+        return str(output_path)
+
     def get_stats(self) -> Dict[str, Any]:
         """統計情報を取得"""
         return self.db_manager.get_db_stats()
@@ -370,11 +615,36 @@ class CrawlService:
             is_new=True
         )
 
-    def cleanup_old_data(self, days: int = 90) -> int:
-        """古いデータを削除"""
-        deleted_count = self.job_repository.delete_old_jobs(days)
-        logger.info(f"Deleted {deleted_count} old jobs")
-        return deleted_count
+    def cleanup_old_data(
+        self,
+        days: int = 90,
+        archive_dir: Optional[str] = None,
+        archive_format: str = "jsonl",
+        chunk_size: int = RetentionManager.DEFAULT_CHUNK_SIZE,
+        vacuum: bool = True
+    ) -> int:
+        """
+        古いデータを削除
+
+        Args:
+            days: 保持日数（crawled_at がこれより前の求人を削除）
+            archive_dir: 指定すると削除前に月別の圧縮ファイルへ書き出す
+            archive_format: "jsonl"（gzip）または "parquet"（pyarrowが必要）
+            chunk_size: 1トランザクションで削除する件数
+            vacuum: 削除後にDBファイルの空き領域を解放する
+
+        Returns:
+            削除件数
+        """
+        result = RetentionManager(self.db_manager).purge(
+            days=days,
+            chunk_size=chunk_size,
+            archive_dir=archive_dir,
+            archive_format=archive_format,
+            vacuum=vacuum
+        )
+        logger.info(f"Deleted {result.deleted_count} old jobs (archived: {result.archived_count})")
+        return result.deleted_count
 
 
 # CLIから実行可能にする
@@ -404,6 +674,8 @@ async def main():
         )
         print(f"CSV出力: {csv_path}")
 
+    service.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
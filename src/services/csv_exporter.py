@@ -5,7 +5,7 @@ CSV出力機能
 import csv
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 import re
 import logging
 
@@ -50,7 +50,7 @@ class CSVExporter:
 
     def export(
         self,
-        jobs: List[Dict[str, Any]],
+        jobs: Iterable[Dict[str, Any]],
         keyword: Optional[str] = None,
         area: Optional[str] = None,
         filename: Optional[str] = None
@@ -59,7 +59,7 @@ class CSVExporter:
         求人データをCSVファイルにエクスポート
 
         Args:
-            jobs: 求人データのリスト
+            jobs: 求人データ（リストのほかジェネレータも可。1件ずつ書き出す）
             keyword: 検索キーワード（ファイル名用）
             area: 地域（ファイル名用）
             filename: カスタムファイル名
@@ -73,10 +73,8 @@ class CSVExporter:
         else:
             output_path = self.output_dir / self._generate_filename(keyword, area)
 
-        # データの前処理
-        processed_jobs = [self._process_job(job) for job in jobs]
-
         # CSV出力（UTF-8 BOM付き）
+        record_count = 0
         with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
             writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
 
@@ -84,12 +82,14 @@ class CSVExporter:
             headers = [col[1] for col in self.CSV_COLUMNS]
             writer.writerow(headers)
 
-            # データ行
-            for job in processed_jobs:
-                row = [self._get_value(job, col[0]) for col in self.CSV_COLUMNS]
+            # データ行（前処理しながら1件ずつ書き出す）
+            for job in jobs:
+                processed = self._process_job(job)
+                row = [self._get_value(processed, col[0]) for col in self.CSV_COLUMNS]
                 writer.writerow(row)
+                record_count += 1
 
-        logger.info(f"CSV exported: {output_path} ({len(jobs)} records)")
+        logger.info(f"CSV exported: {output_path} ({record_count} records)")
         return output_path
 
     def _generate_filename(self, keyword: Optional[str], area: Optional[str]) -> str:
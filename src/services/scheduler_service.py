@@ -9,6 +9,7 @@ import logging
 import threading
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ class SchedulerService:
         self.scheduler = BackgroundScheduler()
         self.is_running = False
         self.crawl_callback: Optional[Callable] = None
+        self.cleanup_callback: Optional[Callable[..., int]] = None
         self.notification_callback: Optional[Callable[[str, str], None]] = None
 
         # 設定
@@ -31,18 +33,38 @@ class SchedulerService:
             'enabled': False,
         }
 
+        # 古いデータの定期削除（毎日 cleanup_hour 時に実行）
+        self.cleanup_settings = {
+            'enabled': False,
+            'hour': 3,
+            'days': 90,
+            'archive_dir': None,
+            'archive_format': 'jsonl',
+        }
+
         # 統計
         self.stats = {
             'last_crawl_at': None,
             'total_crawls': 0,
             'total_new_jobs': 0,
             'errors': 0,
+            'last_cleanup_at': None,
+            'total_deleted_jobs': 0,
         }
 
     def set_crawl_callback(self, callback: Callable):
         """クロールコールバックを設定"""
         self.crawl_callback = callback
 
+    def set_cleanup_callback(self, callback: Callable[..., int]):
+        """
+        定期削除のコールバックを設定
+
+        callback(days=..., archive_dir=..., archive_format=...) の形で呼ばれ、削除件数を返すこと
+        （CrawlService.cleanup_old_data をそのまま渡せる）
+        """
+        self.cleanup_callback = callback
+
     def set_notification_callback(self, callback: Callable[[str, str], None]):
         """通知コールバックを設定"""
         self.notification_callback = callback
@@ -61,6 +83,40 @@ class SchedulerService:
         logger.info(f"Scheduler configured: interval={interval_minutes}min, "
                    f"hours={start_hour}-{end_hour}")
 
+    def configure_cleanup(
+        self,
+        enabled: bool = True,
+        hour: int = 3,
+        days: int = 90,
+        archive_dir: Optional[str] = None,
+        archive_format: str = "jsonl"
+    ):
+        """古いデータの定期削除を設定（実行中なら即座に反映）"""
+        self.cleanup_settings['enabled'] = enabled
+        self.cleanup_settings['hour'] = max(0, min(23, hour))
+        self.cleanup_settings['days'] = max(1, days)
+        self.cleanup_settings['archive_dir'] = archive_dir
+        self.cleanup_settings['archive_format'] = archive_format
+
+        logger.info(f"Cleanup configured: enabled={enabled}, hour={hour}, days={days}, "
+                   f"archive_dir={archive_dir}")
+
+        if self.is_running:
+            self._schedule_cleanup()
+
+    def _schedule_cleanup(self):
+        """定期削除ジョブを登録／解除"""
+        if self.cleanup_settings['enabled'] and self.cleanup_callback:
+            self.scheduler.add_job(
+                self._scheduled_cleanup,
+                CronTrigger(hour=self.cleanup_settings['hour']),
+                id='scheduled_cleanup',
+                name='古いデータの削除',
+                replace_existing=True
+            )
+        elif self.scheduler.get_job('scheduled_cleanup'):
+            self.scheduler.remove_job('scheduled_cleanup')
+
     def start(self):
         """スケジューラーを開始"""
         if self.is_running:
@@ -75,6 +131,7 @@ class SchedulerService:
             name='定期クローリング',
             replace_existing=True
         )
+        self._schedule_cleanup()
 
         self.scheduler.start()
         self.is_running = True
@@ -129,6 +186,25 @@ class SchedulerService:
                 logger.error(f"Scheduled crawl error: {e}", exc_info=True)
                 self._notify("エラー", f"クローリングエラー: {str(e)}")
 
+    def _scheduled_cleanup(self):
+        """スケジュールされた古いデータの削除"""
+        if not self.cleanup_callback:
+            return
+
+        logger.info("Starting scheduled cleanup")
+        try:
+            deleted_count = self.cleanup_callback(
+                days=self.cleanup_settings['days'],
+                archive_dir=self.cleanup_settings['archive_dir'],
+                archive_format=self.cleanup_settings['archive_format'],
+            )
+            self.stats['last_cleanup_at'] = datetime.now()
+            self.stats['total_deleted_jobs'] += deleted_count or 0
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Scheduled cleanup error: {e}", exc_info=True)
+            self._notify("エラー", f"古いデータの削除エラー: {str(e)}")
+
     def _is_within_hours(self, dt: datetime) -> bool:
         """実行時間帯内かチェック"""
         start = self.settings['start_hour']
@@ -155,6 +231,7 @@ class SchedulerService:
             **self.stats,
             'is_running': self.is_running,
             'settings': self.settings.copy(),
+            'cleanup_settings': self.cleanup_settings.copy(),
             'next_run': self._get_next_run_time(),
         }
 
@@ -0,0 +1,294 @@
+"""
+マルチプロセスのシャード分割クロール
+キーワード×地域の組み合わせを複数のワーカープロセスに分け、各プロセスが自分のChromiumで取得したページを
+親プロセスに送り返す。保存（DBへの書き込み）は親プロセスのパイプラインが1本で行う
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+
+# パス追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scrapers.base_scraper import BaseScraper, PageBatch, PageListener
+from src.database.db_manager import DatabaseManager
+from src.database.frontier_repository import FrontierRepository
+from src.database.job_repository import JobRepository
+from src.services.crawl_frontier import FrontierPageListener
+from src.services.crawl_pipeline import CrawlPipeline, PipelineStats
+from src.services.crawl_service import CrawlService, create_scraper, known_job_checker
+
+logger = logging.getLogger(__name__)
+
+# ワーカーから親プロセスへのメッセージの種類
+_MSG_STARTED = "started"      # (種類, キーワード, 地域, ページ番号)
+_MSG_PAGE = "page"            # (種類, PageBatch)
+_MSG_FAILED = "failed"        # (種類, キーワード, 地域, ページ番号, エラー)
+_MSG_EXHAUSTED = "exhausted"  # (種類, キーワード, 地域, ページ番号)
+
+
+@dataclass
+class ShardSpec:
+    """ワーカープロセス1つが担当する組み合わせと実行条件（プロセス間で受け渡すためpickle可能な値のみ）"""
+    index: int
+    shard_count: int
+    scraper_class: Type[BaseScraper]
+    source_name: str
+    db_path: str
+    run_id: int
+    combinations: List[Tuple[str, str]]
+    max_pages: int
+    options: Dict[str, Any]
+
+
+class _QueuePageListener(PageListener):
+    """
+    ワーカープロセス側の進捗の通知先
+
+    未取得のページはフロンティアから読み、開始・失敗・打ち切りは親プロセスに送って記録させる
+    （DBへの書き込みは親プロセスだけが行う）。キューが埋まっている間は送信で待つ。
+    """
+
+    def __init__(self, queue: Any, frontier: FrontierRepository, run_id: int):
+        self.queue = queue
+        self.frontier = frontier
+        self.run_id = run_id
+
+    def pending_pages(self, keyword: str, area: str, max_pages: int) -> Optional[List[int]]:
+        return [
+            page_num
+            for page_num in self.frontier.pending_pages(self.run_id, keyword, area)
+            if page_num <= max_pages
+        ]
+
+    def page_started(self, keyword: str, area: str, page_num: int):
+        self.queue.put((_MSG_STARTED, keyword, area, page_num))
+
+    def page_failed(self, keyword: str, area: str, page_num: int, error: str):
+        self.queue.put((_MSG_FAILED, keyword, area, page_num, error))
+
+    def pages_exhausted(self, keyword: str, area: str, page_num: int):
+        self.queue.put((_MSG_EXHAUSTED, keyword, area, page_num))
+
+
+def _run_shard(spec: ShardSpec, queue: Any) -> Dict[str, Any]:
+    """ワーカープロセスのエントリポイント（シャードをスクレイピングしてページを queue に送る）"""
+    return asyncio.run(_crawl_shard(spec, queue))
+
+
+async def _crawl_shard(spec: ShardSpec, queue: Any) -> Dict[str, Any]:
+    db_manager = DatabaseManager(spec.db_path)
+    try:
+        scraper = create_scraper(
+            spec.scraper_class, spec.options, known_job_checker(JobRepository(db_manager), spec.source_name)
+        )
+        # サイトへの合計のレート・同時数が1プロセスのときと同じになるよう、プロセス数で分け合う
+        limiter = scraper.host_limiter
+        host = limiter.host_of(scraper.site_config.get("base_url", ""))
+        if host:
+            limiter.configure(host, limiter.config_for(host).split(spec.shard_count))
+        scraper.page_listener = _QueuePageListener(queue, FrontierRepository(db_manager), spec.run_id)
+
+        pages = 0
+        async for batch in scraper.iter_pages(
+            keywords=[],
+            areas=[],
+            max_pages=spec.max_pages,
+            parallel=spec.options.get('parallel', 2),
+            filters=spec.options.get('filters'),
+            combinations=spec.combinations
+        ):
+            # 親プロセスの保存が遅れてキューが埋まっていれば、ここで取得を待たせる
+            await asyncio.to_thread(queue.put, (_MSG_PAGE, batch))
+            pages += 1
+
+        return {
+            "shard": spec.index,
+            "combinations": len(spec.combinations),
+            "pages": pages,
+            "rate_limit": limiter.get_stats().get(host),
+        }
+    finally:
+        db_manager.close()
+
+
+class ShardedCrawlRunner:
+    """
+    キーワード×地域の組み合わせをワーカープロセスに分けてクロールする
+
+    各ワーカーは自分のChromium・HostLimiter（サイトのレート制御の設定をプロセス数で割ったもの）を持ち、
+    取得したページを上限付きのキューで親プロセスに送る。親プロセスは CrawlService と同じパイプライン
+    （正規化 → 重複除去 → 保存）で1本の書き込みにまとめ、クロールフロンティアも親が更新するため、
+    中断した実行は resume()（または CrawlService.resume）で続きから再開できる。
+    進捗は CrawlService の progress_callback に全ワーカーの合計で通知する。
+
+    使用例:
+        service = CrawlService()
+        runner = ShardedCrawlRunner(service, workers=4)
+        result = asyncio.run(runner.crawl(keywords, areas, max_pages=10))
+    """
+
+    def __init__(self, service: CrawlService, workers: Optional[int] = None):
+        """
+        Args:
+            service: 保存先のDB・進捗コールバックを持つクローリングサービス
+            workers: ワーカープロセス数（省略時はCPUコア数）
+        """
+        self.service = service
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+    async def crawl(
+        self,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int = 5,
+        parallel: int = 2,
+        filters: Optional[Dict[str, Any]] = None,
+        use_cache: bool = False,
+        incremental: bool = False,
+        known_pages_to_stop: int = 1,
+        collect_jobs: bool = False,
+        queue_size: int = CrawlPipeline.DEFAULT_QUEUE_SIZE,
+        source_name: str = "townwork"
+    ) -> Dict[str, Any]:
+        """
+        クロールを実行（引数は CrawlService.crawl_townwork と同じ。parallel はワーカー1つあたりの並列数）
+
+        Returns:
+            クロール結果（CrawlService.crawl_townwork と同じ形式）
+        """
+        options = {
+            'parallel': parallel,
+            'filters': filters,
+            'use_cache': use_cache,
+            'incremental': incremental,
+            'known_pages_to_stop': known_pages_to_stop,
+            'collect_jobs': collect_jobs,
+            'queue_size': queue_size,
+            'workers': self.workers,
+        }
+        return await self.service._run_crawl(
+            source_name, keywords, areas, max_pages, options, crawl=self._crawl
+        )
+
+    async def resume(self, run_id: int) -> Dict[str, Any]:
+        """中断したクロールを、ワーカープロセスに分けて続きから再開"""
+        frontier = self.service.frontier_repository
+        run = frontier.get_run(run_id)
+        if run is None:
+            raise ValueError(f"Unknown crawl run: {run_id}")
+
+        reset = frontier.reopen_run(run_id)
+        logger.info(f"Resuming crawl run {run_id} with {self.workers} workers ({reset} interrupted pages re-queued)")
+        return await self.service._run_crawl(
+            run.source_name, run.keywords, run.areas, run.max_pages, run.options, run_id=run_id, crawl=self._crawl
+        )
+
+    def split(self, combinations: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """組み合わせをワーカー数以下のシャードに分ける（順に配って件数を均等にする）"""
+        shard_count = min(self.workers, len(combinations))
+        return [combinations[index::shard_count] for index in range(shard_count)]
+
+    async def _crawl(
+        self,
+        source_name: str,
+        keywords: List[str],
+        areas: List[str],
+        max_pages: int,
+        options: Dict[str, Any],
+        listener: FrontierPageListener,
+        pipeline: CrawlPipeline
+    ) -> PipelineStats:
+        """シャードをワーカープロセスで取得し、届いたページをこのプロセスのパイプラインに流す"""
+        frontier = listener.frontier
+        pending = {
+            (combination["keyword"], combination["area"])
+            for combination in frontier.pending_combinations(listener.run_id)
+        }
+        combinations = [(keyword, area) for keyword in keywords for area in areas if (keyword, area) in pending]
+        if not combinations:
+            return PipelineStats()
+
+        shards = self.split(combinations)
+        total_pages = frontier.get_progress(listener.run_id)["pending"]
+        logger.info(
+            f"Crawling {len(combinations)} combinations ({total_pages} pages) with {len(shards)} worker processes"
+        )
+
+        # Chromium・SQLite・共有ブラウザのスレッドを引き継がないよう spawn で起動する
+        context = multiprocessing.get_context("spawn")
+        manager = context.Manager()
+        executor = ProcessPoolExecutor(max_workers=len(shards), mp_context=context)
+        loop = asyncio.get_running_loop()
+        try:
+            queue = manager.Queue(maxsize=pipeline.queue_size * len(shards))
+            futures = [
+                loop.run_in_executor(executor, _run_shard, ShardSpec(
+                    index=index,
+                    shard_count=len(shards),
+                    scraper_class=self.service.scrapers[source_name],
+                    source_name=source_name,
+                    db_path=str(self.service.db_manager.db_path),
+                    run_id=listener.run_id,
+                    combinations=shard,
+                    max_pages=max_pages,
+                    options=options,
+                ), queue)
+                for index, shard in enumerate(shards)
+            ]
+            stats = await pipeline.run(self._receive(queue, futures, listener, total_pages))
+        except BaseException:
+            # 保存側が止まった場合、キューへの送信で待っているワーカーはキューを閉じて終わらせる
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            manager.shutdown()
+            executor.shutdown(wait=True)
+
+        for index, outcome in enumerate(await asyncio.gather(*futures, return_exceptions=True)):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Shard {index} failed: {outcome}")
+            else:
+                logger.info(f"Shard {index} finished: {outcome}")
+        return stats
+
+    async def _receive(
+        self,
+        queue: Any,
+        futures: List[asyncio.Future],
+        listener: FrontierPageListener,
+        total_pages: int
+    ) -> AsyncIterator[PageBatch]:
+        """ワーカーからのメッセージを全ワーカーの終了まで受け取り、ページを返す（進捗は合計で通知）"""
+        pages_done = 0
+        while True:
+            try:
+                message = await asyncio.to_thread(queue.get, True, 0.5)
+            except queue_module.Empty:
+                # 全ワーカーが終了し（異常終了を含む）、キューも空なら完了
+                if all(future.done() for future in futures) and queue.empty():
+                    return
+                continue
+
+            # フロンティアへの書き込みはイベントループを止めないよう別スレッドで行う
+            kind = message[0]
+            if kind == _MSG_STARTED:
+                await asyncio.to_thread(listener.page_started, *message[1:])
+            elif kind == _MSG_FAILED:
+                await asyncio.to_thread(listener.page_failed, *message[1:])
+            elif kind == _MSG_EXHAUSTED:
+                await asyncio.to_thread(listener.pages_exhausted, *message[1:])
+            elif kind == _MSG_PAGE:
+                batch: PageBatch = message[1]
+                pages_done += 1
+                total = max(pages_done, total_pages - listener.pages_skipped - listener.pages_failed)
+                self.service._report_progress(
+                    f"[{batch.area}] {batch.keyword} {batch.page_num}ページ目: {len(batch.jobs)}件", pages_done, total
+                )
+                yield batch
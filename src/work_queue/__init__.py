@@ -0,0 +1,10 @@
+# Work queue module（分散クロールのタスクキュー）
+from .base import (
+    WorkQueue, WorkTask, TaskResult, plan_tasks,
+    TASK_QUEUED, TASK_LEASED, TASK_DONE, TASK_COLLECTED, TASK_SKIPPED, TASK_FAILED,
+)
+from .memory_queue import MemoryWorkQueue
+from .sqlite_queue import SQLiteWorkQueue
+
+__all__ = ['WorkQueue', 'WorkTask', 'TaskResult', 'plan_tasks', 'MemoryWorkQueue', 'SQLiteWorkQueue',
+           'TASK_QUEUED', 'TASK_LEASED', 'TASK_DONE', 'TASK_COLLECTED', 'TASK_SKIPPED', 'TASK_FAILED']
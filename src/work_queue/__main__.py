@@ -0,0 +1,88 @@
+"""
+分散クロール用CLI（同じキューのDBファイルを開く複数のワーカープロセスで1つのプランを分担する）
+
+使い方:
+    python -m src.work_queue plan --keywords 介護,看護 --areas 東京,大阪 [--max-pages 5] [--plan NAME]
+    python -m src.work_queue work [--plan NAME] [--concurrency 2] [--visibility-timeout 120] [--forever]
+    python -m src.work_queue collect [--plan NAME]
+    python -m src.work_queue requeue
+    python -m src.work_queue stats [--plan NAME]
+
+全コマンド共通で --db（キューと求人のDBファイル、既定は data/db/jobs.db）を指定できる。
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from .base import WorkQueue
+from .sqlite_queue import SQLiteWorkQueue
+
+
+def _split(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main():
+    """分散クロール用CLI"""
+    parser = argparse.ArgumentParser(description="Distributed crawl work queue")
+    parser.add_argument("command", choices=["plan", "work", "collect", "requeue", "stats"])
+    parser.add_argument("--db", default="data/db/jobs.db", help="キュー（と求人）のDBファイルのパス")
+    parser.add_argument("--plan", help="対象のプラン名（plan: 省略時は日時から作成、その他: 省略時は全プラン）")
+    parser.add_argument("--site", default="townwork", help="plan: 対象サイト")
+    parser.add_argument("--keywords", default="", help="plan: カンマ区切りのキーワード")
+    parser.add_argument("--areas", default="", help="plan: カンマ区切りの地域")
+    parser.add_argument("--max-pages", type=int, default=5, help="plan: 各条件での最大ページ数")
+    parser.add_argument("--max-attempts", type=int, default=WorkQueue.DEFAULT_MAX_ATTEMPTS,
+                        help="plan: タスクの試行回数の上限")
+    parser.add_argument("--worker-id", help="work: リースの所有者として記録するID（省略時はホスト名:PID）")
+    parser.add_argument("--concurrency", type=int, default=2, help="work: 同時に処理するタスク数")
+    parser.add_argument("--visibility-timeout", type=float, default=WorkQueue.DEFAULT_VISIBILITY_TIMEOUT,
+                        help="work: リースの期限（秒）")
+    parser.add_argument("--forever", action="store_true", help="work: タスクがなくなっても新しいタスクを待ち続ける")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    queue = SQLiteWorkQueue(args.db)
+    try:
+        if args.command in ("plan", "collect"):
+            # 求人の保存はコーディネーター（plan / collect を実行するホスト）だけが行う
+            from src.services.crawl_service import CrawlService
+
+            service = CrawlService(db_path=args.db)
+            try:
+                if args.command == "plan":
+                    keywords, areas = _split(args.keywords), _split(args.areas)
+                    if not keywords or not areas:
+                        parser.error("plan requires --keywords and --areas")
+                    plan = service.plan_distributed_crawl(
+                        queue, keywords, areas, args.max_pages,
+                        source_name=args.site, plan=args.plan, max_attempts=args.max_attempts
+                    )
+                    stats = {"plan": plan, "queue": queue.stats(plan)}
+                else:
+                    stats = service.collect_distributed_results(queue, args.plan)
+            finally:
+                service.close()
+        elif args.command == "work":
+            from .worker import QueueWorker
+
+            worker = QueueWorker(
+                queue,
+                worker_id=args.worker_id,
+                concurrency=args.concurrency,
+                visibility_timeout=args.visibility_timeout,
+                plan=args.plan,
+            )
+            stats = asyncio.run(worker.run(stop_when_empty=not args.forever))
+        elif args.command == "requeue":
+            stats = {"requeued": queue.requeue_expired(), "queue": queue.stats(args.plan)}
+        else:
+            stats = queue.stats(args.plan)
+        print(json.dumps(stats, ensure_ascii=False, indent=2, default=str))
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+分散クロールのタスクキュー（共通の型とインターフェース）
+1タスク = (サイト, キーワード, 地域, ページ) の一覧1ページ。ワーカーはリースで取り出し、
+結果を ack で返す。期限内に ack / nack されなかったリースは自動でキューに戻る
+"""
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# タスクの状態
+TASK_QUEUED = "queued"        # 取り出し待ち（期限切れ・nack で戻ったものを含む）
+TASK_LEASED = "leased"        # ワーカーがリース中
+TASK_DONE = "done"            # 完了（結果の回収待ち）
+TASK_COLLECTED = "collected"  # 結果を回収・保存済み
+TASK_SKIPPED = "skipped"      # 最終ページより後のため取得不要
+TASK_FAILED = "failed"        # 試行回数の上限に達した
+
+TASK_STATUSES = (TASK_QUEUED, TASK_LEASED, TASK_DONE, TASK_COLLECTED, TASK_SKIPPED, TASK_FAILED)
+
+
+@dataclass
+class WorkTask:
+    """キューの1タスク（一覧1ページ）"""
+    plan: str
+    site: str
+    keyword: str
+    area: str
+    page: int
+    id: Optional[int] = None
+    attempts: int = 0
+    lease_owner: Optional[str] = None
+    lease_token: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+
+    @property
+    def key(self) -> Tuple[str, str, str, str, int]:
+        """プラン内で一意なキー"""
+        return (self.plan, self.site, self.keyword, self.area, self.page)
+
+
+@dataclass
+class TaskResult:
+    """完了したタスクと取得した求人"""
+    task: WorkTask
+    jobs: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def plan_tasks(plan: str, site: str, keywords: List[str], areas: List[str], max_pages: int) -> List[WorkTask]:
+    """キーワード×地域×ページの全タスクを作成"""
+    return [
+        WorkTask(plan=plan, site=site, keyword=keyword, area=area, page=page)
+        for keyword in keywords
+        for area in areas
+        for page in range(1, max_pages + 1)
+    ]
+
+
+class WorkQueue(ABC):
+    """
+    リース方式のタスクキュー
+
+    - lease: 取り出し待ちのタスクを1つ、visibility_timeout 秒の間だけ他のワーカーから見えなくして渡す
+    - extend: 処理が長引く場合にリースの期限を延ばす
+    - ack / nack: リースしたワーカーが完了（結果付き）・失敗を返す。期限切れ後に別のワーカーへ
+      渡ったタスクの古いリースでは何もしない（戻り値 False）
+    - 期限切れのリースは lease のたびに回収してキューに戻す（試行回数の上限に達したものは failed）
+
+    バックエンドは SQLiteWorkQueue（同一ホストの複数プロセス）と MemoryWorkQueue（単一プロセス・テスト用）。
+    他の共有ストレージを使う場合はこのクラスを実装する。
+    """
+
+    DEFAULT_VISIBILITY_TIMEOUT = 120.0
+    DEFAULT_MAX_ATTEMPTS = 3
+
+    @abstractmethod
+    def enqueue(self, tasks: Iterable[WorkTask], max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """タスクを追加（同じキーのタスクが既にあれば追加しない）。追加した件数を返す"""
+
+    @abstractmethod
+    def lease(
+        self,
+        worker_id: str,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        plan: Optional[str] = None
+    ) -> Optional[WorkTask]:
+        """取り出し待ちのタスクを古い順に1つリース（なければNone）"""
+
+    @abstractmethod
+    def extend(self, task: WorkTask, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """リースの期限を今から visibility_timeout 秒後に延ばす"""
+
+    @abstractmethod
+    def ack(self, task: WorkTask, jobs: List[Dict[str, Any]]) -> bool:
+        """タスクの完了と取得した求人を記録"""
+
+    @abstractmethod
+    def nack(self, task: WorkTask, error: str) -> bool:
+        """タスクの失敗を記録（試行回数が上限未満ならキューに戻す）"""
+
+    @abstractmethod
+    def skip_pages_from(self, task: WorkTask, page: int) -> int:
+        """同じ (プラン, サイト, キーワード, 地域) の page 以降の取り出し待ちのタスクを取得不要にする"""
+
+    @abstractmethod
+    def requeue_expired(self, now: Optional[float] = None) -> int:
+        """期限切れのリースをキューに戻す（上限に達したものは failed）。戻した件数を返す"""
+
+    @abstractmethod
+    def results(self, plan: Optional[str] = None, limit: int = 100) -> List[TaskResult]:
+        """回収待ちの完了タスクと結果を取得"""
+
+    @abstractmethod
+    def mark_collected(self, task_ids: List[int]) -> int:
+        """結果を保存し終えたタスクを回収済みにする"""
+
+    @abstractmethod
+    def stats(self, plan: Optional[str] = None) -> Dict[str, int]:
+        """状態ごとのタスク数"""
+
+    def is_drained(self, plan: Optional[str] = None) -> bool:
+        """取り出し待ち・リース中のタスクが残っていないか"""
+        stats = self.stats(plan)
+        return not stats[TASK_QUEUED] and not stats[TASK_LEASED]
+
+    def close(self):
+        """バックエンドの接続を閉じる"""
+
+    @staticmethod
+    def _now() -> float:
+        # リースの期限はホスト間で比較するため壁時計の時刻を使う
+        return time.time()
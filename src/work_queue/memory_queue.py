@@ -0,0 +1,163 @@
+"""
+メモリ上のタスクキュー
+単一プロセスでの実行やテストで SQLiteWorkQueue の代わりに使う（プロセスを終了すると消える）
+"""
+import copy
+import threading
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional
+
+from .base import (
+    TASK_COLLECTED, TASK_DONE, TASK_FAILED, TASK_LEASED, TASK_QUEUED, TASK_SKIPPED, TASK_STATUSES,
+    TaskResult, WorkQueue, WorkTask,
+)
+
+
+@dataclass
+class _Entry:
+    task: WorkTask
+    status: str = TASK_QUEUED
+    max_attempts: int = WorkQueue.DEFAULT_MAX_ATTEMPTS
+    result: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+
+class MemoryWorkQueue(WorkQueue):
+    """スレッドセーフなメモリ上の WorkQueue 実装"""
+
+    def __init__(self):
+        self._entries: Dict[int, _Entry] = {}
+        self._keys: Dict[tuple, int] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def enqueue(self, tasks: Iterable[WorkTask], max_attempts: int = WorkQueue.DEFAULT_MAX_ATTEMPTS) -> int:
+        added = 0
+        with self._lock:
+            for task in tasks:
+                if task.key in self._keys:
+                    continue
+                task_id = self._next_id
+                self._next_id += 1
+                self._entries[task_id] = _Entry(task=replace(task, id=task_id), max_attempts=max_attempts)
+                self._keys[task.key] = task_id
+                added += 1
+        return added
+
+    def lease(
+        self,
+        worker_id: str,
+        visibility_timeout: float = WorkQueue.DEFAULT_VISIBILITY_TIMEOUT,
+        plan: Optional[str] = None
+    ) -> Optional[WorkTask]:
+        now = self._now()
+        with self._lock:
+            self._requeue_expired(now)
+            for entry in self._entries.values():
+                if entry.status != TASK_QUEUED or (plan is not None and entry.task.plan != plan):
+                    continue
+                entry.status = TASK_LEASED
+                entry.task.attempts += 1
+                entry.task.lease_owner = worker_id
+                entry.task.lease_token = uuid.uuid4().hex
+                entry.task.lease_expires_at = now + visibility_timeout
+                return copy.copy(entry.task)
+        return None
+
+    def _leased_entry(self, task: WorkTask) -> Optional[_Entry]:
+        """task のリースが現在も有効なエントリ（ロック内で呼ぶ）"""
+        entry = self._entries.get(task.id)
+        if entry is None or entry.status != TASK_LEASED or entry.task.lease_token != task.lease_token:
+            return None
+        return entry
+
+    def extend(self, task: WorkTask, visibility_timeout: float = WorkQueue.DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        with self._lock:
+            entry = self._leased_entry(task)
+            if entry is None:
+                return False
+            entry.task.lease_expires_at = task.lease_expires_at = self._now() + visibility_timeout
+            return True
+
+    def ack(self, task: WorkTask, jobs: List[Dict[str, Any]]) -> bool:
+        with self._lock:
+            entry = self._leased_entry(task)
+            if entry is None:
+                return False
+            entry.status = TASK_DONE
+            entry.result = copy.deepcopy(jobs)
+            entry.error = None
+            self._release(entry)
+            return True
+
+    def nack(self, task: WorkTask, error: str) -> bool:
+        with self._lock:
+            entry = self._leased_entry(task)
+            if entry is None:
+                return False
+            entry.status = TASK_FAILED if entry.task.attempts >= entry.max_attempts else TASK_QUEUED
+            entry.error = error
+            self._release(entry)
+            return True
+
+    @staticmethod
+    def _release(entry: _Entry):
+        entry.task.lease_owner = None
+        entry.task.lease_token = None
+        entry.task.lease_expires_at = None
+
+    def skip_pages_from(self, task: WorkTask, page: int) -> int:
+        skipped = 0
+        with self._lock:
+            for entry in self._entries.values():
+                other = entry.task
+                if (
+                    entry.status == TASK_QUEUED
+                    and (other.plan, other.site, other.keyword, other.area) == (task.plan, task.site, task.keyword, task.area)
+                    and other.page >= page
+                ):
+                    entry.status = TASK_SKIPPED
+                    skipped += 1
+        return skipped
+
+    def requeue_expired(self, now: Optional[float] = None) -> int:
+        with self._lock:
+            return self._requeue_expired(now if now is not None else self._now())
+
+    def _requeue_expired(self, now: float) -> int:
+        requeued = 0
+        for entry in self._entries.values():
+            if entry.status == TASK_LEASED and entry.task.lease_expires_at is not None and entry.task.lease_expires_at <= now:
+                entry.status = TASK_FAILED if entry.task.attempts >= entry.max_attempts else TASK_QUEUED
+                entry.error = "Lease expired"
+                self._release(entry)
+                requeued += entry.status == TASK_QUEUED
+        return requeued
+
+    def results(self, plan: Optional[str] = None, limit: int = 100) -> List[TaskResult]:
+        with self._lock:
+            return [
+                TaskResult(task=copy.copy(entry.task), jobs=copy.deepcopy(entry.result or []))
+                for entry in self._entries.values()
+                if entry.status == TASK_DONE and (plan is None or entry.task.plan == plan)
+            ][:limit]
+
+    def mark_collected(self, task_ids: List[int]) -> int:
+        collected = 0
+        with self._lock:
+            for task_id in task_ids:
+                entry = self._entries.get(task_id)
+                if entry is not None and entry.status == TASK_DONE:
+                    entry.status = TASK_COLLECTED
+                    entry.result = None
+                    collected += 1
+        return collected
+
+    def stats(self, plan: Optional[str] = None) -> Dict[str, int]:
+        counts = {status: 0 for status in TASK_STATUSES}
+        with self._lock:
+            for entry in self._entries.values():
+                if plan is None or entry.task.plan == plan:
+                    counts[entry.status] += 1
+        return counts
@@ -0,0 +1,211 @@
+"""
+SQLiteのタスクキュー
+求人DBの work_tasks テーブルをキューとして使う。取り出しは BEGIN IMMEDIATE のトランザクション内で
+行うため、同じDBファイルを開く複数のワーカープロセスが同じタスクを取り合うことはない
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import sys
+import os
+
+# パス追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.database.db_manager import DatabaseManager
+from .base import (
+    TASK_COLLECTED, TASK_DONE, TASK_FAILED, TASK_LEASED, TASK_QUEUED, TASK_SKIPPED, TASK_STATUSES,
+    TaskResult, WorkQueue, WorkTask,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    work_tasks テーブルによる WorkQueue 実装
+
+    WALモードのSQLiteは共有メモリを使うため、ワーカーは同じホスト上のプロセスで動かす
+    （ネットワークファイルシステム越しの共有はロックが保証されないため非対応）。
+    """
+
+    def __init__(self, db_path: str = "data/db/jobs.db", db_manager: Optional[DatabaseManager] = None):
+        """
+        Args:
+            db_path: キューを置くDBファイル（db_manager を渡した場合は無視）
+            db_manager: 既存のデータベースマネージャー（CrawlService と同じDBを使う場合）
+        """
+        self._owns_db = db_manager is None
+        self.db = db_manager or DatabaseManager(db_path)
+
+    def enqueue(self, tasks: Iterable[WorkTask], max_attempts: int = WorkQueue.DEFAULT_MAX_ATTEMPTS) -> int:
+        rows = [
+            (task.plan, task.site, task.keyword, task.area, task.page, TASK_QUEUED, max(1, max_attempts))
+            for task in tasks
+        ]
+        with self.db.write_transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT OR IGNORE INTO work_tasks (plan, site, keyword, area, page, status, max_attempts)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            return conn.total_changes - before
+
+    def lease(
+        self,
+        worker_id: str,
+        visibility_timeout: float = WorkQueue.DEFAULT_VISIBILITY_TIMEOUT,
+        plan: Optional[str] = None
+    ) -> Optional[WorkTask]:
+        now = self._now()
+        token = uuid.uuid4().hex
+        with self.db.write_transaction() as conn:
+            self._requeue_expired(conn, now)
+
+            query = "SELECT * FROM work_tasks WHERE status = ?"
+            params: List[Any] = [TASK_QUEUED]
+            if plan is not None:
+                query += " AND plan = ?"
+                params.append(plan)
+            row = conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+
+            conn.execute("""
+                UPDATE work_tasks
+                SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_token = ?,
+                    lease_expires_at = ?, updated_at = ?
+                WHERE id = ?
+            """, (TASK_LEASED, worker_id, token, now + visibility_timeout, datetime.now(), row['id']))
+
+        task = self._row_to_task(row)
+        task.attempts += 1
+        task.lease_owner = worker_id
+        task.lease_token = token
+        task.lease_expires_at = now + visibility_timeout
+        return task
+
+    def extend(self, task: WorkTask, visibility_timeout: float = WorkQueue.DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        expires_at = self._now() + visibility_timeout
+        with self.db.write_transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE work_tasks SET lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND status = ? AND lease_token = ?
+            """, (expires_at, datetime.now(), task.id, TASK_LEASED, task.lease_token))
+            if not cursor.rowcount:
+                return False
+        task.lease_expires_at = expires_at
+        return True
+
+    def ack(self, task: WorkTask, jobs: List[Dict[str, Any]]) -> bool:
+        result = json.dumps(jobs, ensure_ascii=False, default=str)
+        with self.db.write_transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE work_tasks
+                SET status = ?, result = ?, error_message = NULL,
+                    lease_owner = NULL, lease_token = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND status = ? AND lease_token = ?
+            """, (TASK_DONE, result, datetime.now(), task.id, TASK_LEASED, task.lease_token))
+            return cursor.rowcount > 0
+
+    def nack(self, task: WorkTask, error: str) -> bool:
+        with self.db.write_transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE work_tasks
+                SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,
+                    error_message = ?,
+                    lease_owner = NULL, lease_token = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND status = ? AND lease_token = ?
+            """, (TASK_FAILED, TASK_QUEUED, error, datetime.now(), task.id, TASK_LEASED, task.lease_token))
+            return cursor.rowcount > 0
+
+    def skip_pages_from(self, task: WorkTask, page: int) -> int:
+        with self.db.write_transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE work_tasks SET status = ?, updated_at = ?
+                WHERE plan = ? AND site = ? AND keyword = ? AND area = ? AND page >= ? AND status = ?
+            """, (TASK_SKIPPED, datetime.now(), task.plan, task.site, task.keyword, task.area, page, TASK_QUEUED))
+            return cursor.rowcount
+
+    def requeue_expired(self, now: Optional[float] = None) -> int:
+        with self.db.write_transaction() as conn:
+            return self._requeue_expired(conn, now if now is not None else self._now())
+
+    def _requeue_expired(self, conn, now: float) -> int:
+        """期限切れのリースを戻す（write_transaction 内で呼ぶ）。上限に達したものは数えない"""
+        counts = {}
+        for status, condition in ((TASK_FAILED, "attempts >= max_attempts"), (TASK_QUEUED, "attempts < max_attempts")):
+            cursor = conn.execute(f"""
+                UPDATE work_tasks
+                SET status = ?, error_message = 'Lease expired',
+                    lease_owner = NULL, lease_token = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE status = ? AND lease_expires_at <= ? AND {condition}
+            """, (status, datetime.now(), TASK_LEASED, now))
+            counts[status] = cursor.rowcount
+        if counts[TASK_QUEUED] or counts[TASK_FAILED]:
+            logger.info(f"Requeued {counts[TASK_QUEUED]} expired leases ({counts[TASK_FAILED]} failed)")
+        return counts[TASK_QUEUED]
+
+    def results(self, plan: Optional[str] = None, limit: int = 100) -> List[TaskResult]:
+        query = "SELECT * FROM work_tasks WHERE status = ?"
+        params: List[Any] = [TASK_DONE]
+        if plan is not None:
+            query += " AND plan = ?"
+            params.append(plan)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            TaskResult(task=self._row_to_task(row), jobs=json.loads(row['result']) if row['result'] else [])
+            for row in rows
+        ]
+
+    def mark_collected(self, task_ids: List[int]) -> int:
+        if not task_ids:
+            return 0
+        with self.db.write_transaction() as conn:
+            before = conn.total_changes
+            # 回収済みの結果は保存先のDBにあるため、キュー側のJSONは消して容量を空ける
+            conn.executemany(
+                "UPDATE work_tasks SET status = ?, result = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                [(TASK_COLLECTED, datetime.now(), task_id, TASK_DONE) for task_id in task_ids]
+            )
+            return conn.total_changes - before
+
+    def stats(self, plan: Optional[str] = None) -> Dict[str, int]:
+        query = "SELECT status, COUNT(*) AS tasks FROM work_tasks"
+        params: List[Any] = []
+        if plan is not None:
+            query += " WHERE plan = ?"
+            params.append(plan)
+
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute(query + " GROUP BY status", params).fetchall()
+
+        counts = {status: 0 for status in TASK_STATUSES}
+        for row in rows:
+            counts[row['status']] = row['tasks']
+        return counts
+
+    def close(self):
+        if self._owns_db:
+            self.db.close()
+
+    @staticmethod
+    def _row_to_task(row) -> WorkTask:
+        return WorkTask(
+            plan=row['plan'],
+            site=row['site'],
+            keyword=row['keyword'],
+            area=row['area'],
+            page=row['page'],
+            id=row['id'],
+            attempts=row['attempts'],
+            lease_owner=row['lease_owner'],
+            lease_token=row['lease_token'],
+            lease_expires_at=row['lease_expires_at'],
+        )
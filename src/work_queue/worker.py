@@ -0,0 +1,210 @@
+"""
+タスクキューのワーカー
+キューから一覧ページのタスクをリースし、既存のスクレイパーで取得して結果を ack で返す
+"""
+import asyncio
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Optional, Type
+import logging
+
+# パス追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from playwright.async_api import Browser, async_playwright
+
+from scrapers.base_scraper import BaseScraper
+from scrapers.townwork import TownworkScraper
+from utils.context_pool import ContextPool
+from utils.stealth import StealthConfig
+from .base import WorkQueue, WorkTask
+
+logger = logging.getLogger(__name__)
+
+# サイト名 → スクレイパー（CrawlService.scrapers と同じ）
+DEFAULT_SCRAPERS: Dict[str, Type[BaseScraper]] = {
+    "townwork": TownworkScraper,
+}
+
+
+def default_worker_id() -> str:
+    """ホスト名とプロセスIDによるワーカーID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueueWorker:
+    """
+    キューのタスクを取得して処理するワーカー
+
+    concurrency 個のタスクを同時に処理する（サイトへのリクエスト間隔はスクレイパーの HostLimiter が調整する）。
+    処理中は visibility_timeout の1/3ごとにリースを延長するため、取得に時間がかかってもタスクが
+    他のワーカーに渡ることはなく、ワーカーが落ちた場合は期限切れの後に他のワーカーが取り直す。
+    1ページ目で最終ページが分かった場合・空のページが出た場合は、それより後のページのタスクを
+    取得不要にする。
+
+    使用例:
+        queue = SQLiteWorkQueue("data/db/jobs.db")
+        stats = asyncio.run(QueueWorker(queue, concurrency=2).run())
+    """
+
+    DEFAULT_POLL_INTERVAL = 2.0
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        worker_id: Optional[str] = None,
+        scrapers: Optional[Dict[str, Type[BaseScraper]]] = None,
+        concurrency: int = 2,
+        visibility_timeout: float = WorkQueue.DEFAULT_VISIBILITY_TIMEOUT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        plan: Optional[str] = None
+    ):
+        """
+        Args:
+            queue: タスクキュー
+            worker_id: リースの所有者として記録するID（省略時はホスト名:PID）
+            scrapers: サイト名 → スクレイパーのクラス
+            concurrency: 同時に処理するタスク数
+            visibility_timeout: リースの期限（秒）
+            poll_interval: タスクがないときに次に確認するまでの秒数
+            plan: 処理するプラン（省略時は全プラン）
+        """
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.scrapers = scrapers or DEFAULT_SCRAPERS
+        self.concurrency = max(1, concurrency)
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.plan = plan
+
+        # サイトごとのスクレイパーとコンテキストプール（run の間だけ保持）
+        self._scraper_instances: Dict[str, BaseScraper] = {}
+        self._pools: Dict[str, ContextPool] = {}
+
+        # 統計
+        self.stats = {"done": 0, "failed": 0, "lost": 0, "jobs": 0}
+
+    async def run(self, browser: Optional[Browser] = None, stop_when_empty: bool = True) -> Dict[str, int]:
+        """
+        タスクを処理する
+
+        Args:
+            browser: 起動済みのブラウザ（省略時はこの呼び出しの間だけChromiumを起動する）
+            stop_when_empty: 取り出し待ち・リース中のタスクがなくなったら終了するか
+                             （False なら新しいタスクを待ち続ける）
+
+        Returns:
+            処理したタスクの統計
+        """
+        if browser is None:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(**StealthConfig.get_launch_args())
+                try:
+                    return await self.run(browser, stop_when_empty)
+                finally:
+                    await browser.close()
+
+        try:
+            await asyncio.gather(*[
+                self._work(browser, stop_when_empty) for _ in range(self.concurrency)
+            ])
+        finally:
+            for pool in self._pools.values():
+                await pool.close()
+            self._pools.clear()
+            self._scraper_instances.clear()
+
+        logger.info(f"Worker {self.worker_id} finished: {self.stats}")
+        return self.stats
+
+    async def _work(self, browser: Browser, stop_when_empty: bool):
+        """タスクを1つずつリースして処理するループ"""
+        while True:
+            task = await asyncio.to_thread(self.queue.lease, self.worker_id, self.visibility_timeout, self.plan)
+            if task is None:
+                # 他のワーカーのリースが期限切れで戻る可能性があるため、リース中のタスクがなくなるまで待つ
+                if stop_when_empty and await asyncio.to_thread(self.queue.is_drained, self.plan):
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            heartbeat = asyncio.create_task(self._heartbeat(task))
+            try:
+                await self._process(browser, task)
+            except Exception as e:
+                logger.error(f"Task {task.id} failed: {e}", exc_info=True)
+                await self._finish(task, None, str(e))
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, task: WorkTask):
+        """処理中のタスクのリースを定期的に延長する"""
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            if not await asyncio.to_thread(self.queue.extend, task, self.visibility_timeout):
+                logger.warning(f"Lost lease on task {task.id} ({task.keyword} / {task.area} page {task.page})")
+                return
+
+    async def _process(self, browser: Browser, task: WorkTask):
+        """一覧ページを1ページ取得して結果を返す"""
+        scraper_class = self.scrapers.get(task.site)
+        if scraper_class is None:
+            await self._finish(task, None, f"Unknown site: {task.site}")
+            return
+
+        scraper = self._scraper(task.site, scraper_class)
+        pool = await self._pool(task.site, browser, scraper)
+        async with pool.lease() as pooled:
+            # 1ページ目は最終ページ番号を読むためブラウザで開く
+            page_jobs = await scraper.scrape_page(
+                pooled.page, scraper.generate_search_url(task.keyword, task.area, task.page), allow_cached=task.page != 1
+            )
+            if page_jobs is None:
+                pooled.mark_discard()
+                await self._finish(task, None, "Failed to scrape page")
+                return
+
+            if not page_jobs:
+                # 求人のないページより後は取得不要
+                await asyncio.to_thread(self.queue.skip_pages_from, task, task.page + 1)
+            elif task.page == 1:
+                last_page = await scraper.detect_last_page(pooled.page, len(page_jobs))
+                if last_page is not None:
+                    await asyncio.to_thread(self.queue.skip_pages_from, task, last_page + 1)
+
+        await self._finish(task, scraper.drop_known_stubs(page_jobs), None)
+
+    async def _finish(self, task: WorkTask, jobs: Optional[List[Dict[str, Any]]], error: Optional[str]):
+        """結果（jobs が None なら失敗）をキューに返す"""
+        if jobs is None:
+            accepted = await asyncio.to_thread(self.queue.nack, task, error or "")
+        else:
+            accepted = await asyncio.to_thread(self.queue.ack, task, jobs)
+
+        if not accepted:
+            # リースが期限切れで他のワーカーに渡った（結果はそちらのものを使う）
+            self.stats["lost"] += 1
+        elif jobs is None:
+            self.stats["failed"] += 1
+        else:
+            self.stats["done"] += 1
+            self.stats["jobs"] += len(jobs)
+            logger.info(f"[{task.area}] {task.keyword} page {task.page}: {len(jobs)} jobs")
+
+    def _scraper(self, site: str, scraper_class: Type[BaseScraper]) -> BaseScraper:
+        if site not in self._scraper_instances:
+            self._scraper_instances[site] = scraper_class()
+        return self._scraper_instances[site]
+
+    async def _pool(self, site: str, browser: Browser, scraper: BaseScraper) -> ContextPool:
+        if site not in self._pools:
+            pool = ContextPool(
+                browser,
+                size=self.concurrency,
+                monitor=scraper.performance_monitor,
+                blocking_policy=scraper.blocking_policy
+            )
+            self._pools[site] = pool
+            await pool.start()
+        return self._pools[site]
@@ -0,0 +1,104 @@
+"""
+データベース並行アクセスのストレステスト
+1本の書き込みスレッドが求人を保存し続ける間、N本の読み取りスレッドが
+get_jobs / get_db_stats を呼び続け、"database is locked" 等のエラーが出ないことを確認する
+
+使い方:
+    python stress_test_db.py [--jobs 50000] [--readers 4] [--batch-size 100]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.database.db_manager import DatabaseManager
+from src.database.job_repository import JobRepository
+from benchmark_db import make_jobs
+
+
+class ReaderStats:
+    """読み取りスレッドごとの集計"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: List[str] = []
+        self.max_latency = 0.0
+
+    def record(self, latency: float):
+        self.calls += 1
+        self.max_latency = max(self.max_latency, latency)
+
+
+def run_writer(repo: JobRepository, total: int, batch_size: int, errors: List[str]):
+    """求人を batch_size 件ずつ保存（クロールの保存処理を模擬）"""
+    jobs = make_jobs(total)
+    for i in range(0, total, batch_size):
+        try:
+            repo.upsert_jobs(jobs[i:i + batch_size], "townwork")
+        except Exception as e:
+            errors.append(f"writer: {e}")
+
+
+def run_reader(db: DatabaseManager, repo: JobRepository, stop: threading.Event, stats: ReaderStats):
+    """停止まで検索と統計取得を繰り返す（GUI・APIの参照処理を模擬）"""
+    while not stop.is_set():
+        for call in (lambda: repo.get_jobs(limit=100), db.get_db_stats):
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception as e:
+                stats.errors.append(str(e))
+            stats.record(time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SQLite concurrent read/write stress test")
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "stress.db"))
+        repo = JobRepository(db)
+
+        writer_errors: List[str] = []
+        stop = threading.Event()
+        reader_stats: Dict[int, ReaderStats] = {i: ReaderStats() for i in range(args.readers)}
+        readers = [
+            threading.Thread(target=run_reader, args=(db, repo, stop, reader_stats[i]), daemon=True)
+            for i in range(args.readers)
+        ]
+
+        start = time.perf_counter()
+        for reader in readers:
+            reader.start()
+        run_writer(repo, args.jobs, args.batch_size, writer_errors)
+        write_elapsed = time.perf_counter() - start
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+        total_jobs = db.get_db_stats()["total_jobs"]
+        db.close()
+
+    print(f"\n=== Stress test: {args.jobs} jobs, {args.readers} readers ===")
+    print(f"writer: {write_elapsed:.2f}s ({args.jobs / write_elapsed:.0f} jobs/s), errors: {len(writer_errors)}")
+    for i, stats in reader_stats.items():
+        print(f"reader {i}: calls {stats.calls}, max latency {stats.max_latency * 1000:.1f}ms, errors: {len(stats.errors)}")
+    print(f"rows in DB: {total_jobs}")
+
+    errors = writer_errors + [e for stats in reader_stats.values() for e in stats.errors]
+    for error in errors[:10]:
+        print(f"ERROR: {error}")
+
+    ok = not errors and total_jobs == args.jobs
+    print("RESULT: " + ("OK" if ok else "FAILED"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
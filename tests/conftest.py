@@ -0,0 +1,8 @@
+"""
+pytest の共通設定
+リポジトリのルートを import パスに追加する（python -m pytest tests で実行）
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
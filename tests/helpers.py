@@ -0,0 +1,21 @@
+"""
+テスト用の共通ヘルパー
+"""
+from typing import Any, Dict, List
+
+
+def make_jobs(count: int, prefix: str = "job") -> List[Dict[str, Any]]:
+    """スクレイピング結果と同じ形のダミー求人データを生成"""
+    return [
+        {
+            "job_id": f"{prefix}{i:06d}",
+            "title": f"ホールスタッフ {i}",
+            "company": f"株式会社テスト{i % 500}",
+            "location": f"東京都新宿区西新宿{i % 10}-{i % 7}",
+            "salary": "時給1,200円〜1,500円",
+            "employment_type": "アルバイト・パート",
+            "phone_number": f"03-{1000 + i % 9000:04d}-{i % 10000:04d}",
+            "page_url": f"https://townwork.net/jobid_{prefix}{i:08x}/",
+        }
+        for i in range(count)
+    ]
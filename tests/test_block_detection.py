@@ -0,0 +1,65 @@
+"""
+PageUtils.check_for_block のテスト（HostLimiter への通知はブロックページの確かな兆候だけ）
+"""
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+pytest.importorskip("playwright")
+
+import utils.page_utils as page_utils
+from utils.page_utils import PageUtils
+
+
+class FakePage:
+    """check_for_block が使う分だけを持つページ"""
+
+    def __init__(self, title: str = "", body: str = "", selectors: Optional[List[str]] = None):
+        self._title = title
+        self._body = body
+        self._selectors = set(selectors or [])
+
+    async def title(self) -> str:
+        return self._title
+
+    async def inner_text(self, selector: str) -> str:
+        return self._body
+
+    async def query_selector(self, selector: str):
+        return object() if selector in self._selectors else None
+
+
+@pytest.fixture
+def reports(monkeypatch) -> List[dict]:
+    recorded: List[dict] = []
+    monkeypatch.setattr(page_utils, "report_result", lambda **kwargs: recorded.append(kwargs))
+    return recorded
+
+
+def test_listing_digits_are_not_a_block(reports):
+    page = FakePage(
+        title="新宿区のアルバイト | タウンワーク",
+        body="時給1,403円 TEL 03-4040-1234 〒160-0404 blocked shifts OK",
+    )
+
+    result = asyncio.run(PageUtils.check_for_block(page))
+
+    assert result["is_blocked"] is False
+    assert set(result["suspects"]) == {"403", "404", "blocked"}
+    assert reports == []
+
+
+def test_block_page_title_is_reported(reports):
+    result = asyncio.run(PageUtils.check_for_block(FakePage(title="Access Denied")))
+
+    assert result["is_blocked"] is True
+    assert reports == [{"blocked": True}]
+
+
+@pytest.mark.parametrize("selector", ["iframe[src*='recaptcha']", "#challenge-form"])
+def test_captcha_and_challenge_elements_are_reported(reports, selector):
+    result = asyncio.run(PageUtils.check_for_block(FakePage(title="タウンワーク", selectors=[selector])))
+
+    assert result["is_blocked"] is True
+    assert reports == [{"blocked": True}]
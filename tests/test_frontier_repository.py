@@ -0,0 +1,53 @@
+"""
+FrontierRepository のテスト（作業項目の状態遷移と再試行の回数）
+"""
+import pytest
+
+from src.database.db_manager import DatabaseManager
+from src.database.frontier_repository import (
+    FrontierRepository,
+    ITEM_STATUS_DONE, ITEM_STATUS_FAILED, ITEM_STATUS_PENDING, ITEM_STATUS_RUNNING, ITEM_STATUS_SKIPPED,
+    RUN_STATUS_COMPLETED, RUN_STATUS_FAILED, RUN_STATUS_INCOMPLETE,
+)
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    db = DatabaseManager(str(tmp_path / "jobs.db"))
+    yield FrontierRepository(db, max_attempts=2)
+    db.close()
+
+
+def test_mark_failed_requeues_until_max_attempts(frontier):
+    run_id = frontier.create_run("townwork", ["介護"], ["東京"], 2)
+
+    frontier.mark_running(run_id, "介護", "東京", 1)
+    frontier.mark_failed(run_id, "介護", "東京", 1, "timeout")
+    assert frontier.pending_pages(run_id, "介護", "東京") == [1, 2]
+
+    frontier.mark_running(run_id, "介護", "東京", 1)
+    frontier.mark_failed(run_id, "介護", "東京", 1, "timeout")
+    assert frontier.pending_pages(run_id, "介護", "東京") == [2]
+
+    frontier.mark_running(run_id, "介護", "東京", 2)
+    frontier.mark_done(run_id, "介護", "東京", 2, 5)
+    progress = frontier.get_progress(run_id)
+    assert (progress[ITEM_STATUS_FAILED], progress[ITEM_STATUS_DONE], progress["jobs"]) == (1, 1, 5)
+    assert frontier.finish_run(run_id) == RUN_STATUS_FAILED
+
+
+def test_reopen_and_skip_complete_run(frontier):
+    run_id = frontier.create_run("townwork", ["介護"], ["東京"], 3)
+    frontier.mark_running(run_id, "介護", "東京", 1)
+    assert frontier.finish_run(run_id) == RUN_STATUS_INCOMPLETE
+    assert frontier.get_progress(run_id)[ITEM_STATUS_RUNNING] == 1
+
+    assert frontier.reopen_run(run_id) == 1
+    assert [run.id for run in frontier.get_unfinished_runs("townwork")] == [run_id]
+    frontier.mark_running(run_id, "介護", "東京", 1)
+    frontier.mark_done(run_id, "介護", "東京", 1, 3)
+    assert frontier.skip_pages_from(run_id, "介護", "東京", 2) == 2
+
+    progress = frontier.get_progress(run_id)
+    assert (progress[ITEM_STATUS_PENDING], progress[ITEM_STATUS_SKIPPED]) == (0, 2)
+    assert frontier.finish_run(run_id) == RUN_STATUS_COMPLETED
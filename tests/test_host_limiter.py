@@ -0,0 +1,69 @@
+"""
+HostLimiter のテスト（応答に応じたレートの加算増加・乗算減少）
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from utils.host_limiter import HostLimiter, RateLimitConfig, report_result
+
+URL = "https://townwork.net/tokyo/"
+HOST = "townwork.net"
+
+
+def _limiter(**overrides) -> HostLimiter:
+    limiter = HostLimiter()
+    config = RateLimitConfig(initial_rate=4.0, max_rate=5.0, burst=100.0, additive_increase=0.5, cooldown=30.0)
+    limiter.configure(HOST, RateLimitConfig.from_config(overrides, config))
+    return limiter
+
+
+async def _request(limiter: HostLimiter, **result):
+    async with limiter.slot(URL):
+        report_result(**result)
+
+
+def test_healthy_responses_increase_rate_up_to_max():
+    limiter = _limiter()
+
+    async def run():
+        for _ in range(3):
+            await _request(limiter, status=200, latency=0.1)
+
+    asyncio.run(run())
+    assert limiter.rate_for(HOST) == 5.0
+    assert limiter.get_stats()[HOST]["increases"] == 2
+
+
+def test_failure_halves_rate_once_per_window():
+    limiter = _limiter()
+
+    async def run():
+        await _request(limiter, status=503, latency=0.1)
+        await _request(limiter, status=503, latency=0.1)
+
+    asyncio.run(run())
+    stats = limiter.get_stats()[HOST]
+    assert limiter.rate_for(HOST) == 2.0
+    assert (stats["failures"], stats["decreases"]) == (2, 1)
+
+
+def test_block_pauses_host_and_slow_responses_do_not_increase():
+    limiter = _limiter()
+
+    asyncio.run(_request(limiter, status=200, latency=30.0))
+    assert limiter.rate_for(HOST) == 4.0
+
+    asyncio.run(_request(limiter, blocked=True))
+    assert limiter.rate_for(HOST) == 2.0
+    # 次のリクエストはクールダウンの終了まで待たされる
+    assert limiter._states[HOST].paused_until > 0
+    assert limiter._states[HOST].reserve(limiter._states[HOST].last_decrease) >= 29.0
+
+
+def test_split_divides_rate_between_processes():
+    config = RateLimitConfig(initial_rate=2.0, max_rate=6.0, burst=4.0, max_concurrency=4).split(2)
+
+    assert (config.initial_rate, config.max_rate, config.burst, config.max_concurrency) == (1.0, 3.0, 2.0, 2)
@@ -0,0 +1,34 @@
+"""
+JobFilter のテスト（ストリーミング版 iter_filtered が filter_jobs と同じ求人を残すこと）
+"""
+from datetime import datetime
+
+from src.filters.job_filter import JobFilter
+
+
+def _job(job_id: str, phone: str = "", **fields):
+    job = {
+        "job_id": job_id,
+        "company_name": "テスト商店",
+        "job_title": "ホールスタッフ",
+        "work_location": "東京都新宿区",
+        "phone_number_normalized": phone,
+    }
+    job.update(fields)
+    return job
+
+
+def test_iter_filtered_keeps_same_job_per_phone_as_filter_jobs():
+    # iter_jobs と同じ取得日時の新しい順。電話番号が同じなら掲載開始日が新しい方が優先される
+    jobs = [
+        _job("a-new-crawl", "0312345678", crawled_at=datetime(2026, 10, 2), posted_date="2026-09-01"),
+        _job("a-newer-post", "0312345678", crawled_at=datetime(2026, 10, 1), posted_date="2026-09-20"),
+        _job("b", "0398765432", crawled_at=datetime(2026, 9, 30)),
+        _job("no-phone", crawled_at=datetime(2026, 9, 29)),
+    ]
+    job_filter = JobFilter()
+
+    expected = {job["job_id"] for job in job_filter.filter_jobs([dict(job) for job in jobs]).filtered_jobs}
+    streamed = {job["job_id"] for job in job_filter.iter_filtered(dict(job) for job in jobs)}
+
+    assert streamed == expected == {"a-newer-post", "b", "no-phone"}
@@ -0,0 +1,115 @@
+"""
+JobRepository のテスト（一括保存の新規／変更／変更なしの判定と、変更なし時の更新内容）
+"""
+import pytest
+
+from helpers import make_jobs
+from src.database.db_manager import DatabaseManager
+from src.database.job_repository import (
+    JobRepository, SAVE_STATUS_CHANGED, SAVE_STATUS_NEW, SAVE_STATUS_UNCHANGED,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "jobs.db"))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def repo(db):
+    return JobRepository(db)
+
+
+def _row(db, job_id):
+    with db.get_read_connection() as conn:
+        return conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+
+def _source_stats(db, source_name="townwork"):
+    with db.get_read_connection() as conn:
+        return conn.execute(
+            "SELECT js.* FROM job_stats js JOIN sources s ON s.id = js.source_id WHERE s.name = ?",
+            (source_name,)
+        ).fetchone()
+
+
+def test_upsert_reports_new_unchanged_and_changed(repo):
+    jobs = make_jobs(3)
+
+    first = repo.upsert_jobs(jobs, "townwork")
+    assert first.statuses == [SAVE_STATUS_NEW] * 3
+    assert (first.saved_count, first.new_count, first.updated_count) == (3, 3, 0)
+
+    second = repo.upsert_jobs(jobs, "townwork")
+    assert second.statuses == [SAVE_STATUS_UNCHANGED] * 3
+    assert (second.saved_count, second.new_count, second.unchanged_count, second.changed_count) == (3, 0, 3, 0)
+
+    jobs[1] = dict(jobs[1], salary="時給1,300円〜1,600円")
+    third = repo.upsert_jobs(jobs, "townwork")
+    assert third.statuses == [SAVE_STATUS_UNCHANGED, SAVE_STATUS_CHANGED, SAVE_STATUS_UNCHANGED]
+    assert (third.unchanged_count, third.changed_count, third.updated_count) == (2, 1, 3)
+
+
+def test_unchanged_resave_only_touches_updated_at_and_clears_is_new(db, repo):
+    job = make_jobs(1)[0]
+    repo.upsert_jobs([job], "townwork")
+    inserted = _row(db, job["job_id"])
+    assert inserted["is_new"] == 1
+
+    repo.upsert_jobs([job], "townwork")
+    touched = _row(db, job["job_id"])
+    assert touched["updated_at"] > inserted["updated_at"]
+    assert touched["is_new"] == 0
+    assert touched["crawled_at"] == inserted["crawled_at"]
+    assert touched["content_hash"] == inserted["content_hash"]
+    assert _source_stats(db)["new_count"] == 0
+
+    repo.upsert_jobs([job], "townwork")
+    assert _row(db, job["job_id"])["updated_at"] > touched["updated_at"]
+
+
+def test_noop_resave_does_not_fire_triggers_or_reindex(db, repo):
+    jobs = make_jobs(2)
+    repo.upsert_jobs(jobs, "townwork")
+    repo.upsert_jobs(jobs, "townwork")  # is_new を落とす
+
+    # トリガーが発火すると job_stats の行が作り直され、検索インデックスも書き換わる
+    with db.write_transaction() as conn:
+        conn.execute("DELETE FROM job_stats")
+        conn.execute("UPDATE jobs_fts SET job_title = 'sentinel'")
+
+    # 変更なし（updated_at のみ）と、is_new / source_id が変わらない変更あり
+    changed = [jobs[0], dict(jobs[1], salary="時給1,300円〜1,600円")]
+    result = repo.upsert_jobs(changed, "townwork")
+    assert result.statuses == [SAVE_STATUS_UNCHANGED, SAVE_STATUS_CHANGED]
+
+    assert _source_stats(db) is None
+    with db.get_read_connection() as conn:
+        titles = dict(conn.execute(
+            "SELECT j.job_id, f.job_title FROM jobs_fts f JOIN jobs j ON j.id = f.rowid"
+        ).fetchall())
+    assert titles == {jobs[0]["job_id"]: "sentinel", jobs[1]["job_id"]: jobs[1]["title"]}
+
+
+def test_bad_row_in_batch_is_skipped_and_others_saved(db, repo):
+    jobs = make_jobs(4)
+    bad_id = jobs[2]["job_id"]
+    # 一括実行を失敗させ、1行ずつの再実行で bad_id の行だけが弾かれるようにする
+    db.get_connection().execute(f"""
+        CREATE TEMP TRIGGER reject_bad_job BEFORE INSERT ON main.jobs
+        WHEN new.job_id = '{bad_id}'
+        BEGIN
+            SELECT RAISE(ABORT, 'rejected');
+        END
+    """)
+
+    result = repo.upsert_jobs(jobs, "townwork")
+
+    assert result.failed_count == 1
+    assert (result.saved_count, result.new_count) == (3, 3)
+    assert result.statuses == [SAVE_STATUS_NEW, SAVE_STATUS_NEW, None, SAVE_STATUS_NEW]
+    assert _row(db, bad_id) is None
+    assert all(_row(db, job["job_id"]) is not None for job in jobs if job["job_id"] != bad_id)
+    assert _source_stats(db)["total_count"] == 3
@@ -0,0 +1,67 @@
+"""
+集計表 job_stats のテスト（トリガーによる差分更新が再集計の結果と一致すること）
+"""
+from datetime import datetime, timedelta
+
+from helpers import make_jobs
+from src.database.db_manager import DatabaseManager
+from src.database.job_repository import JobRepository
+from src.database.retention import RetentionManager
+
+
+def _snapshot(db: DatabaseManager):
+    stats = db.get_db_stats()
+    stats.pop('db_size_mb')
+    with db.get_read_connection() as conn:
+        rows = conn.execute(
+            "SELECT source_id, total_count, new_count, filtered_count FROM job_stats "
+            "WHERE total_count != 0 ORDER BY source_id"
+        ).fetchall()
+    return stats, [tuple(row) for row in rows]
+
+
+def test_trigger_counters_match_rebuild_after_mixed_writes(tmp_path):
+    db = DatabaseManager(str(tmp_path / "jobs.db"))
+    repo = JobRepository(db)
+    townwork_jobs = make_jobs(60, prefix="tw")
+    indeed_jobs = make_jobs(40, prefix="in")
+
+    # 新規挿入（新着）、変更なし・変更ありの再保存（新着を落とす）
+    repo.upsert_jobs(townwork_jobs, "townwork")
+    repo.upsert_jobs(indeed_jobs, "indeed")
+    repo.upsert_jobs(townwork_jobs[:20] + [dict(job, salary="日給10,000円") for job in townwork_jobs[20:30]], "townwork")
+    repo.save_job(dict(indeed_jobs[0], title="ホールリーダー"), "indeed")
+
+    now = datetime.now()
+    with db.write_transaction() as conn:
+        # フィルタ済み・媒体の付け替え・一部を保持期間切れにする
+        conn.execute("UPDATE jobs SET is_filtered = 1 WHERE id % 3 = 0")
+        conn.execute("UPDATE jobs SET is_filtered = 0 WHERE id % 9 = 0")
+        conn.execute("UPDATE jobs SET source_id = (SELECT id FROM sources WHERE name = 'indeed') "
+                     "WHERE job_id IN ('tw000050', 'tw000051', 'tw000052')")
+        conn.execute("UPDATE jobs SET crawled_at = ? WHERE id % 4 = 1", (now - timedelta(days=200),))
+    repo.mark_jobs_as_old(now + timedelta(minutes=1))
+    repo.upsert_jobs(make_jobs(10, prefix="late"), "townwork")
+
+    result = RetentionManager(db).purge(days=90, chunk_size=7, vacuum=False)
+    assert result.chunk_count > 1
+
+    before = _snapshot(db)
+    db.rebuild_job_stats()
+    after = _snapshot(db)
+    db.close()
+
+    assert before == after
+    assert before[0]['total_jobs'] == 110 - result.deleted_count
+    assert before[0]['new_jobs'] == 10
+
+
+def test_db_size_includes_wal(tmp_path):
+    db = DatabaseManager(str(tmp_path / "jobs.db"))
+    JobRepository(db).upsert_jobs(make_jobs(200), "townwork")
+
+    wal_path = tmp_path / "jobs.db-wal"
+    assert wal_path.exists() and wal_path.stat().st_size > 0
+    expected = (tmp_path / "jobs.db").stat().st_size + wal_path.stat().st_size
+    assert db.get_db_stats()['db_size_mb'] == expected / (1024 * 1024)
+    db.close()
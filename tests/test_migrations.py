@@ -0,0 +1,47 @@
+"""
+スキーマのマイグレーションのテスト
+"""
+import multiprocessing
+import sqlite3
+
+from src.database.db_manager import DatabaseManager
+from src.database.migrations import MIGRATIONS, apply_migrations, get_schema_version
+
+
+def _open_database(db_path: str, barrier) -> str:
+    """別プロセスで新しいDBを開く（エラーがあればその内容を返す）"""
+    barrier.wait()
+    try:
+        DatabaseManager(db_path).get_connection()
+    except Exception as e:
+        return repr(e)
+    return ""
+
+
+def test_apply_migrations_is_idempotent(tmp_path):
+    db = DatabaseManager(str(tmp_path / "jobs.db"))
+    try:
+        conn = db.get_connection()
+        latest = MIGRATIONS[-1][0]
+        assert get_schema_version(conn) == latest
+        assert apply_migrations(conn) == latest
+    finally:
+        db.close()
+
+
+def test_concurrent_processes_migrate_new_database_once(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    workers = 6
+    with context.Manager() as manager:
+        for trial in range(3):
+            db_path = str(tmp_path / f"jobs_{trial}.db")
+            barrier = manager.Barrier(workers)
+            with context.Pool(workers) as pool:
+                errors = [error for error in pool.starmap(_open_database, [(db_path, barrier)] * workers) if error]
+            assert errors == []
+
+            conn = sqlite3.connect(db_path)
+            try:
+                assert get_schema_version(conn) == MIGRATIONS[-1][0]
+            finally:
+                conn.close()
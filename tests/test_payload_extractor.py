@@ -0,0 +1,58 @@
+"""
+NextPayloadExtractor のテスト（タウンワークの next_payload 設定で __NEXT_DATA__ から求人を抽出）
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from scrapers.payload_extractor import NextPayloadExtractor, parse_payload, read_payload_html
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "townwork_next_data.html"
+
+
+@pytest.fixture
+def extractor() -> NextPayloadExtractor:
+    config = json.loads((ROOT / "config" / "selectors.json").read_text(encoding="utf-8"))
+    return NextPayloadExtractor.from_config(config["townwork"]["next_payload"])
+
+
+def test_extracts_only_job_objects(extractor):
+    records = extractor.extract_from_html(FIXTURE.read_text(encoding="utf-8"))
+
+    assert [record["job_id"] for record in records] == [
+        "9b1e5f0c2a7d4e3f", "4c2d8e1a0b3f5a6c", "7f3a2b1c0d9e8f7a"
+    ]
+    first = records[0]
+    assert first["title"] == "カフェスタッフ/未経験歓迎"
+    assert first["company"] == "カフェ・ド・テスト 新宿店"
+    assert first["salary"] == "時給1,200円～"
+    assert first["employment_type"] == "アルバイト、パート"
+    assert first["details"] == {"phone_number": "03-1234-5678", "postal_code": "160-0022"}
+
+
+def test_builds_url_from_id_and_reads_id_from_url(extractor):
+    records = {record["job_id"]: record for record in extractor.extract_from_html(FIXTURE.read_text(encoding="utf-8"))}
+
+    assert records["4c2d8e1a0b3f5a6c"]["url"] == "https://townwork.net/jobid_4c2d8e1a0b3f5a6c/"
+    assert records["7f3a2b1c0d9e8f7a"]["url"] == "/jobid_7f3a2b1c0d9e8f7a/"
+    assert records["7f3a2b1c0d9e8f7a"]["company"] == "テストマート 西新宿店"
+
+
+def test_ignores_navigation_and_breadcrumbs(extractor):
+    roots = [{
+        "navigation": [{"id": 1, "title": "ホーム", "url": "/"}],
+        "breadcrumbs": [{"id": "13", "title": "東京都", "href": "/tokyo/"}],
+        "campaign": {"id": "0123456789abcdef", "title": "キャンペーン", "url": "/campaign/"},
+    }]
+
+    assert extractor.find_records(roots) == []
+
+
+def test_total_count_skips_generic_totals(extractor):
+    roots = parse_payload(read_payload_html(FIXTURE.read_text(encoding="utf-8")))
+
+    assert extractor.find_total(roots) == 1234
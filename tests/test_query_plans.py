@@ -0,0 +1,129 @@
+"""
+クエリプランの回帰テスト
+シード済みのDBでリポジトリの各検索メソッドを実行し、発行されたSQLの EXPLAIN QUERY PLAN を確認する。
+jobs の全件走査（インデックス無しのSCAN）や、ORDER BY のための一時B-tree（ソート）が出たら失敗とする。
+"""
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+from helpers import make_jobs
+from src.database.db_manager import DatabaseManager
+from src.database.job_repository import JobRepository
+from src.database.retention import RetentionManager
+
+# プランナーがインデックスを選ぶのに十分な件数
+SEED_JOBS = 3000
+
+# jobs（別名 j）をインデックス無しで全件走査している
+TABLE_SCAN = re.compile(r"^SCAN (j|jobs)$")
+TEMP_SORT = re.compile(r"^USE TEMP B-TREE FOR .*ORDER BY")
+
+PREFECTURES = ["東京都", "神奈川県", "大阪府", "愛知県", "福岡県"]
+
+Case = Tuple[str, Callable[[DatabaseManager, JobRepository], Any], bool]
+
+
+def seed(db: DatabaseManager, repo: JobRepository, count: int):
+    """媒体・都道府県・新着・フィルタ済み・取得日時が散らばったデータを投入"""
+    rng = random.Random(0)
+    now = datetime.now()
+    jobs = make_jobs(count)
+    for job in jobs:
+        job["location"] = rng.choice(PREFECTURES) + "新宿区西新宿1-1"
+    repo.upsert_jobs(jobs[: count // 2], "townwork")
+    repo.upsert_jobs(jobs[count // 2:], "indeed")
+
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "UPDATE jobs SET crawled_at = ?, is_new = ?, is_filtered = ? WHERE id = ?",
+            [
+                (now - timedelta(minutes=rng.randrange(60 * 24 * 120)),
+                 int(rng.random() < 0.1), int(rng.random() < 0.3), job_id)
+                for job_id in range(1, count + 1)
+            ]
+        )
+
+
+def build_cases() -> List[Case]:
+    """(名前, 実行する処理, ORDER BY のソートを許容するか) のリスト（データを変更するものは末尾に置く）"""
+    since = datetime.now() - timedelta(days=1)
+    return [
+        ("get_jobs()", lambda db, repo: repo.get_jobs(), False),
+        ("get_jobs(source)", lambda db, repo: repo.get_jobs(source_name="townwork"), False),
+        ("get_jobs(is_filtered)", lambda db, repo: repo.get_jobs(is_filtered=False), False),
+        ("get_jobs(source, is_filtered)",
+         lambda db, repo: repo.get_jobs(source_name="townwork", is_filtered=False), False),
+        ("get_jobs(source, pref, is_filtered)",
+         lambda db, repo: repo.get_jobs(source_name="townwork", prefecture="東京都", is_filtered=False), False),
+        ("get_jobs(pref)", lambda db, repo: repo.get_jobs(prefecture="大阪府"), False),
+        ("get_jobs(is_new)", lambda db, repo: repo.get_jobs(is_new=True), False),
+        ("get_jobs(source, is_new)", lambda db, repo: repo.get_jobs(source_name="townwork", is_new=True), False),
+        # キーワード検索はBM25の関連度順に並べるためソートは避けられない
+        ("get_jobs(keyword)", lambda db, repo: repo.get_jobs(keyword="ホールスタッフ"), True),
+        ("iter_jobs(source, is_filtered)",
+         lambda db, repo: [c for _, c in zip(range(3), repo.iter_jobs(source_name="townwork", is_filtered=False, chunk_size=100))],
+         False),
+        ("iter_jobs(is_filtered)",
+         lambda db, repo: [c for _, c in zip(range(3), repo.iter_jobs(is_filtered=False, chunk_size=100))], False),
+        ("get_new_jobs_since", lambda db, repo: repo.get_new_jobs_since(since), False),
+        ("get_new_jobs_since(source)", lambda db, repo: repo.get_new_jobs_since(since, source_name="townwork"), False),
+        ("get_job_count(is_new, is_filtered)",
+         lambda db, repo: repo.get_job_count(source_name="townwork", is_new=True, is_filtered=False), False),
+        # 並べ替えるのは指定したIDの件数だけ
+        ("get_jobs_by_ids", lambda db, repo: repo.get_jobs_by_ids([1, 2, 3]), True),
+        ("find_existing_jobs",
+         lambda db, repo: repo.find_existing_jobs("townwork", [repo.get_job_key(job) for job in make_jobs(50)]), False),
+        ("mark_jobs_as_old", lambda db, repo: repo.mark_jobs_as_old(since - timedelta(days=60)), False),
+        ("retention purge", lambda db, repo: RetentionManager(db).purge(days=110, vacuum=False), False),
+    ]
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    db = DatabaseManager(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    repo = JobRepository(db)
+    seed(db, repo, SEED_JOBS)
+    yield db, repo
+    db.close()
+
+
+def explain(db: DatabaseManager, sql: str) -> List[str]:
+    """EXPLAIN QUERY PLAN の detail 列を返す"""
+    conn = db.get_connection()
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def capture_queries(db: DatabaseManager, run: Callable[[], Any]) -> List[str]:
+    """処理中に実行された SELECT / UPDATE / DELETE（バインド値展開済み）を記録する"""
+    statements: List[str] = []
+    connections = (db.get_connection(), db.get_read_connection())
+    for conn in connections:
+        conn.set_trace_callback(statements.append)
+    try:
+        run()
+    finally:
+        for conn in connections:
+            conn.set_trace_callback(None)
+    return [s for s in statements if re.match(r"\s*(SELECT|UPDATE|DELETE)", s, re.IGNORECASE)]
+
+
+@pytest.mark.parametrize("name, run, allow_sort", build_cases(), ids=[case[0] for case in build_cases()])
+def test_query_plan_uses_indexes(seeded, name, run, allow_sort):
+    db, repo = seeded
+    queries = capture_queries(db, lambda: run(db, repo))
+    assert queries, f"{name}: no query captured"
+
+    # リテラル違いだけの同じ形のクエリは1回だけ確認する
+    shapes = {re.sub(r"'[^']*'|\b\d+\b", "?", sql): sql for sql in queries}
+    problems = []
+    for sql in shapes.values():
+        plan = explain(db, sql)
+        problems += [f"{detail}: {' '.join(sql.split())[:200]}" for detail in plan if TABLE_SCAN.match(detail)]
+        if not allow_sort:
+            problems += [f"{detail}: {' '.join(sql.split())[:200]}" for detail in plan if TEMP_SORT.match(detail)]
+
+    assert not problems, "\n".join(dict.fromkeys(problems))
@@ -0,0 +1,118 @@
+"""
+タスクキューのテスト（MemoryWorkQueue と SQLiteWorkQueue が同じ契約を満たすこと）
+"""
+import time
+
+import pytest
+
+from src.work_queue import (
+    MemoryWorkQueue, SQLiteWorkQueue, WorkTask, plan_tasks,
+    TASK_COLLECTED, TASK_DONE, TASK_FAILED, TASK_LEASED, TASK_QUEUED, TASK_SKIPPED,
+)
+
+# lease() が期限切れとみなすよう、現在時刻より十分先の時刻で回収する
+LATER = 3600.0
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        work_queue = MemoryWorkQueue()
+    else:
+        work_queue = SQLiteWorkQueue(str(tmp_path / "jobs.db"))
+    yield work_queue
+    work_queue.close()
+
+
+def _plan(queue, pages: int = 3, max_attempts: int = 3) -> None:
+    queue.enqueue(plan_tasks("plan", "townwork", ["介護"], ["東京"], pages), max_attempts)
+
+
+def test_enqueue_ignores_duplicate_tasks(queue):
+    assert queue.enqueue(plan_tasks("plan", "townwork", ["介護"], ["東京", "大阪"], 2)) == 4
+    assert queue.enqueue(plan_tasks("plan", "townwork", ["介護"], ["東京"], 3)) == 1
+    assert queue.stats("plan")[TASK_QUEUED] == 5
+
+
+def test_lease_hands_out_each_task_once_in_order(queue):
+    _plan(queue)
+
+    leased = [queue.lease("worker-1") for _ in range(3)]
+
+    assert [task.page for task in leased] == [1, 2, 3]
+    assert all(task.attempts == 1 and task.lease_owner == "worker-1" for task in leased)
+    assert len({task.lease_token for task in leased}) == 3
+    assert queue.lease("worker-2") is None
+    assert queue.stats()[TASK_LEASED] == 3
+
+
+def test_expired_lease_is_requeued_and_stale_token_rejected(queue):
+    _plan(queue, pages=1)
+    stale = queue.lease("worker-1", visibility_timeout=60)
+
+    assert queue.requeue_expired(now=time.time() + LATER) == 1
+    fresh = queue.lease("worker-2", visibility_timeout=60)
+
+    assert fresh.id == stale.id and fresh.attempts == 2
+    assert not queue.ack(stale, [{"job_id": "stale"}])
+    assert not queue.extend(stale)
+    assert not queue.nack(stale, "stale")
+    assert queue.ack(fresh, [{"job_id": "fresh"}])
+    assert [result.jobs for result in queue.results("plan")] == [[{"job_id": "fresh"}]]
+
+
+def test_extend_keeps_lease_alive(queue):
+    _plan(queue, pages=1)
+    task = queue.lease("worker-1", visibility_timeout=60)
+
+    assert queue.extend(task, visibility_timeout=2 * LATER)
+    assert queue.requeue_expired(now=time.time() + LATER) == 0
+    assert queue.stats()[TASK_LEASED] == 1
+
+
+def test_nack_retries_until_max_attempts(queue):
+    _plan(queue, pages=1, max_attempts=2)
+
+    assert queue.nack(queue.lease("worker-1"), "timeout")
+    assert queue.stats()[TASK_QUEUED] == 1
+    assert queue.nack(queue.lease("worker-1"), "timeout")
+    assert queue.stats()[TASK_FAILED] == 1
+    assert queue.lease("worker-1") is None
+    assert queue.is_drained()
+
+
+def test_expired_lease_at_max_attempts_fails(queue):
+    _plan(queue, pages=1, max_attempts=1)
+    queue.lease("worker-1", visibility_timeout=60)
+
+    assert queue.requeue_expired(now=time.time() + LATER) == 0
+    assert queue.stats()[TASK_FAILED] == 1
+
+
+def test_skip_pages_from_only_skips_queued_tasks_of_same_combination(queue):
+    _plan(queue, pages=4)
+    queue.enqueue([WorkTask(plan="plan", site="townwork", keyword="介護", area="大阪", page=3)])
+    first = queue.lease("worker-1")
+    second = queue.lease("worker-1")
+
+    assert queue.skip_pages_from(first, 2) == 2
+    stats = queue.stats("plan")
+    assert (stats[TASK_SKIPPED], stats[TASK_LEASED], stats[TASK_QUEUED]) == (2, 2, 1)
+    assert queue.ack(second, [])
+
+
+def test_results_are_collected_once(queue):
+    _plan(queue, pages=2)
+    queue.enqueue(plan_tasks("other", "townwork", ["介護"], ["東京"], 1))
+    for _ in range(2):
+        task = queue.lease("worker-1", plan="plan")
+        queue.ack(task, [{"job_id": f"job-{task.page}", "title": "介護スタッフ"}])
+
+    results = queue.results("plan")
+    assert sorted(job["job_id"] for result in results for job in result.jobs) == ["job-1", "job-2"]
+    assert queue.mark_collected([result.task.id for result in results]) == 2
+    assert queue.mark_collected([result.task.id for result in results]) == 0
+    assert queue.results("plan") == []
+    assert queue.stats("plan")[TASK_COLLECTED] == 2
+    assert queue.stats("plan")[TASK_DONE] == 0
+    assert queue.is_drained("plan") and not queue.is_drained()
@@ -4,7 +4,12 @@ from .user_agents import UserAgentRotator, ua_rotator
 from .proxy import ProxyRotator, ProxyConfig, proxy_rotator, load_proxies_from_file
 from .performance import PerformanceMonitor, PerformanceMetrics, Benchmark
 from .stealth import StealthConfig, create_stealth_context
-from .page_utils import PageUtils
+from .page_utils import PageUtils, ReadyCondition
+from .context_pool import ContextPool, PooledContext
+from .browser_manager import BrowserManager
+from .request_blocking import BlockingPolicy, RequestBlocker
+from .host_limiter import HostLimiter, RateLimitConfig
+from .http_cache import ResponseCache
 
 __all__ = [
     'async_retry',
@@ -23,4 +28,13 @@ __all__ = [
     'StealthConfig',
     'create_stealth_context',
     'PageUtils',
+    'ReadyCondition',
+    'ContextPool',
+    'PooledContext',
+    'BrowserManager',
+    'BlockingPolicy',
+    'RequestBlocker',
+    'HostLimiter',
+    'RateLimitConfig',
+    'ResponseCache',
 ]
@@ -0,0 +1,190 @@
+"""
+セッション単位のブラウザ管理
+アプリ起動中は1つのChromiumを起動したまま、全てのクロール（GUIの各組み合わせ・スケジューラー実行）で共有する
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+from playwright.async_api import async_playwright, Browser, Playwright
+import logging
+
+from .stealth import StealthConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class BrowserManager:
+    """
+    セッション単位のブラウザマネージャー
+
+    Playwrightのオブジェクトは作成したイベントループでしか使えないため、専用スレッドで
+    イベントループを動かし、ブラウザはそのループ上で起動・共有する。
+    呼び出し側は run()（非同期）/ run_sync()（同期）でコルーチンをこのループに渡して実行する。
+    ブラウザが落ちた場合は次に get_browser() が呼ばれた時点で起動し直す。
+
+    使用例:
+        manager = BrowserManager()
+        manager.start(prewarm=True)
+
+        async def job():
+            browser = await manager.get_browser()
+            ...
+
+        result = manager.run_sync(job())
+        manager.shutdown()
+    """
+
+    def __init__(self, launch_args: Optional[Dict[str, Any]] = None):
+        self.launch_args = launch_args or StealthConfig.get_launch_args()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        # 以下はマネージャーのループ上でのみ触る
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+
+        # 統計
+        self.launch_count = 0
+        self.restart_count = 0
+        self.last_launch_seconds = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """イベントループのスレッドが動いているか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, prewarm: bool = False):
+        """
+        専用スレッドとイベントループを開始（起動済みなら何もしない）
+
+        Args:
+            prewarm: Trueならバックグラウンドでブラウザも起動しておく（呼び出し元はブロックしない）
+        """
+        with self._thread_lock:
+            if not self.is_running:
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(ready,), name="BrowserManager", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+                logger.info("Browser manager started")
+
+        if prewarm:
+            future = self.submit(self.get_browser())
+            future.add_done_callback(self._log_prewarm_result)
+
+    def _run_loop(self, ready: threading.Event):
+        """専用スレッドのエントリポイント"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._launch_lock = asyncio.Lock()
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    @staticmethod
+    def _log_prewarm_result(future: Future):
+        if future.exception():
+            logger.warning(f"Browser prewarm failed: {future.exception()}")
+
+    async def get_browser(self) -> Browser:
+        """
+        共有ブラウザを取得（未起動・切断済みなら起動する）
+
+        マネージャーのループ上で呼ぶこと（run() / run_sync() に渡したコルーチン内など）。
+        """
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._browser is not None:
+                # 前回のブラウザがクラッシュ・切断された
+                logger.warning("Shared browser disconnected; relaunching")
+                self.restart_count += 1
+                self._browser = None
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            start = time.perf_counter()
+            self._browser = await self._playwright.chromium.launch(**self.launch_args)
+            self._browser.on("disconnected", lambda _: logger.warning("Shared browser disconnected"))
+            self.last_launch_seconds = time.perf_counter() - start
+            self.launch_count += 1
+            logger.info(f"Shared browser launched in {self.last_launch_seconds:.2f}s")
+            return self._browser
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """コルーチンをマネージャーのループで実行するようスケジュール（任意のスレッドから呼べる）"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """呼び出し元のイベントループから、コルーチンをマネージャーのループで実行して結果を待つ"""
+        self.start()
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def run_sync(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """同期コードから、コルーチンをマネージャーのループで実行して結果を待つ"""
+        return self.submit(coro).result(timeout)
+
+    async def _close_browser(self):
+        """ブラウザとPlaywrightを終了（マネージャーのループ上で実行）"""
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"Error closing shared browser: {e}")
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Error stopping playwright: {e}")
+            self._playwright = None
+
+    def shutdown(self, timeout: float = 10.0):
+        """ブラウザを閉じて専用スレッドを停止（アプリ終了時に呼ぶ）"""
+        with self._thread_lock:
+            if not self.is_running:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_browser(), self._loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Browser shutdown did not complete cleanly: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+            self._loop = None
+
+        logger.info(f"Browser manager stopped (launches: {self.launch_count}, restarts: {self.restart_count})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得"""
+        return {
+            "running": self.is_running,
+            "browser_connected": self._browser is not None and self._browser.is_connected(),
+            "launches": self.launch_count,
+            "restarts": self.restart_count,
+            "last_launch_seconds": round(self.last_launch_seconds, 2),
+        }
@@ -0,0 +1,291 @@
+"""
+ブラウザコンテキストプール
+Stealth設定・初期化スクリプト・ルーティング済みのコンテキストとページを使い回す
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from playwright.async_api import Browser, BrowserContext, Page
+import logging
+
+from .user_agents import ua_rotator
+from .proxy import proxy_rotator
+from .performance import PerformanceMonitor
+from .stealth import StealthConfig, create_stealth_context
+from .request_blocking import BlockingPolicy, RequestBlocker
+
+logger = logging.getLogger(__name__)
+
+
+class PooledContext:
+    """プールが管理するコンテキストと、その中の作業用ページ"""
+
+    def __init__(self, context: BrowserContext, page: Page, user_agent: str):
+        self.context = context
+        self.page = page
+        # 並列ページ取得用に追加で開いたタブ（コンテキストと一緒に使い回す）
+        self.extra_pages: List[Page] = []
+        self.user_agent = user_agent
+        self.lease_count = 0
+        # Trueなら返却時に破棄して作り直す（ブロック検知・ページクラッシュ時など）
+        self.discard = False
+
+    def mark_discard(self):
+        """このコンテキストを再利用しない（返却時に作り直す）"""
+        self.discard = True
+
+
+class ContextPool:
+    """
+    スクレイパー実行単位のコンテキストプール
+
+    キーワード×地域のタスクごとにコンテキストを作り直す代わりに、size 個の
+    コンテキストを用意してタスクに貸し出し、返却されたものを次のタスクで再利用する。
+    User-Agent・プロキシはコンテキスト作成時に選ぶため、ローテーションはコンテキスト単位になる。
+
+    使用例:
+        pool = ContextPool(browser, size=5, monitor=monitor)
+        await pool.start()
+        async with pool.lease() as pooled:
+            await pooled.page.goto(url)
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        size: int = 5,
+        monitor: Optional[PerformanceMonitor] = None,
+        block_resources: bool = True,
+        reset_on_release: bool = True,
+        blocking_policy: Optional[BlockingPolicy] = None
+    ):
+        """
+        Args:
+            browser: Playwrightブラウザインスタンス
+            size: 同時に保持するコンテキスト数
+            monitor: コンテキスト作成時間・再利用回数を記録するモニター
+            block_resources: 画像・動画・フォント等をブロックするか
+            reset_on_release: 返却時にCookie・ストレージを消去するか
+            blocking_policy: サイトのブロックポリシー（省略時は既定のポリシー）
+        """
+        self.browser = browser
+        self.size = max(1, size)
+        self.monitor = monitor
+        self.block_resources = block_resources
+        self.reset_on_release = reset_on_release
+        # プール内の全コンテキストで共有（ブロック件数はプール単位で集計される）
+        self.blocker = RequestBlocker(blocking_policy, monitor)
+
+        self._idle: deque = deque()
+        self._all: List[PooledContext] = []
+        self._creating = 0
+        # 空きコンテキストの発生（返却・破棄）を待つための条件変数
+        self._available = asyncio.Condition()
+        self._closed = False
+
+        # 統計
+        self.setup_count = 0
+        self.setup_seconds = 0.0
+        self.reuse_count = 0
+
+    async def start(self, warm: Optional[int] = None):
+        """
+        コンテキストを事前に作成（ウォームアップ）
+
+        Args:
+            warm: 作成する数（省略時は size 個）
+        """
+        count = min(self.size, warm if warm is not None else self.size)
+        results = await asyncio.gather(
+            *[self._create() for _ in range(count)],
+            return_exceptions=True
+        )
+        async with self._available:
+            for result in results:
+                if isinstance(result, PooledContext):
+                    self._idle.append(result)
+                else:
+                    logger.warning(f"Failed to warm up context: {result}")
+            self._available.notify_all()
+        logger.info(f"Context pool started: {len(self._idle)}/{self.size} contexts")
+
+    async def acquire(self) -> PooledContext:
+        """コンテキストを借りる（空きがなく上限に達していれば返却を待つ）"""
+        if self._closed:
+            raise RuntimeError("Context pool is closed")
+
+        async with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Context pool is closed")
+                if self._idle:
+                    pooled = self._idle.popleft()
+                    break
+                if len(self._all) + self._creating < self.size:
+                    pooled = None
+                    self._creating += 1
+                    break
+                await self._available.wait()
+
+        if pooled is None:
+            try:
+                pooled = await self._create()
+            finally:
+                async with self._available:
+                    self._creating -= 1
+                    # 作成に失敗した場合は枠が空くので待機中のタスクを起こす
+                    self._available.notify()
+        elif pooled.lease_count:
+            self.reuse_count += 1
+            if self.monitor:
+                self.monitor.record_context_reuse()
+
+        pooled.lease_count += 1
+        return pooled
+
+    async def release(self, pooled: PooledContext):
+        """コンテキストを返却（必要ならリセット、壊れていれば作り直す）"""
+        if not pooled.discard and not self._closed:
+            try:
+                if pooled.page.is_closed():
+                    pooled.page = await self._new_page(pooled.context)
+                elif self.reset_on_release:
+                    await self._reset(pooled)
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled context, discarding: {e}")
+                pooled.discard = True
+
+        if pooled.discard or self._closed:
+            # 破棄すると枠が空き、待機中のタスクが新しいコンテキストを作成できる
+            await self._destroy(pooled)
+        else:
+            async with self._available:
+                self._idle.append(pooled)
+
+        async with self._available:
+            self._available.notify()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[PooledContext]:
+        """acquire/release を対にするコンテキストマネージャ（例外時は破棄して作り直す）"""
+        pooled = await self.acquire()
+        try:
+            yield pooled
+        except BaseException:
+            pooled.mark_discard()
+            raise
+        finally:
+            await self.release(pooled)
+
+    async def get_tabs(self, pooled: PooledContext, count: int) -> List[Page]:
+        """
+        借りているコンテキストのタブを count 個取得（作業用ページ＋必要な分だけ追加で開く）
+
+        追加のタブもコンテキストのStealth設定・リソースブロックが効いた状態で開かれ、
+        返却後も同じコンテキストの次の貸し出しで再利用される。
+        """
+        pooled.extra_pages = [tab for tab in pooled.extra_pages if not tab.is_closed()]
+        while len(pooled.extra_pages) < count - 1:
+            pooled.extra_pages.append(await self._new_page(pooled.context))
+        return [pooled.page] + pooled.extra_pages[:max(0, count - 1)]
+
+    async def close(self):
+        """全コンテキストを閉じる"""
+        self._closed = True
+        for pooled in list(self._all):
+            await self._destroy(pooled)
+        self._idle.clear()
+        async with self._available:
+            self._available.notify_all()
+        logger.info(
+            f"Context pool closed: {self.setup_count} setups ({self.setup_seconds:.2f}s), "
+            f"{self.reuse_count} reuses, ~{self.saved_seconds:.2f}s setup saved, "
+            f"{self.blocker.blocked_requests} requests blocked"
+        )
+
+    @property
+    def saved_seconds(self) -> float:
+        """再利用により省略できたコンテキスト作成時間（平均作成時間 × 再利用回数）"""
+        if not self.setup_count:
+            return 0.0
+        return self.setup_seconds / self.setup_count * self.reuse_count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プールの統計を取得"""
+        return {
+            "size": self.size,
+            "contexts": len(self._all),
+            "setups": self.setup_count,
+            "setup_seconds": round(self.setup_seconds, 3),
+            "reuses": self.reuse_count,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "blocked_requests": self.blocker.blocked_requests,
+            "blocked_bytes_estimate": self.blocker.blocked_bytes_estimate,
+        }
+
+    async def _create(self) -> PooledContext:
+        """Stealth設定・ルーティング済みのコンテキストとページを作成"""
+        start = time.perf_counter()
+
+        user_agent = ua_rotator.get_random()
+        proxy_config = None
+        if proxy_rotator.is_enabled():
+            proxy = proxy_rotator.get_random()
+            if proxy:
+                proxy_config = proxy.to_playwright_format()
+                logger.info(f"Using proxy: {proxy}")
+
+        context = await create_stealth_context(
+            self.browser,
+            user_agent=user_agent,
+            proxy=proxy_config,
+            block_resources=self.block_resources,
+            blocker=self.blocker
+        )
+        try:
+            page = await self._new_page(context)
+        except Exception:
+            await context.close()
+            raise
+
+        pooled = PooledContext(context, page, user_agent)
+        self._all.append(pooled)
+
+        elapsed = time.perf_counter() - start
+        self.setup_count += 1
+        self.setup_seconds += elapsed
+        if self.monitor:
+            self.monitor.record_context_setup(elapsed)
+        logger.debug(f"Pooled context created in {elapsed:.2f}s (UA: {user_agent[:50]}...)")
+        return pooled
+
+    async def _new_page(self, context: BrowserContext) -> Page:
+        """Stealthスクリプトを適用したページを作成（リソースブロックはコンテキストに登録済み）"""
+        page = await context.new_page()
+        await StealthConfig.apply_stealth_scripts(page)
+        return page
+
+    async def _reset(self, pooled: PooledContext):
+        """前のタスクの状態を消去（Cookie・localStorage・sessionStorage）"""
+        await pooled.context.clear_cookies()
+        try:
+            await pooled.page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+        except Exception:
+            # about:blank 等ストレージにアクセスできないページでは不要
+            pass
+        await pooled.page.goto("about:blank")
+        for tab in pooled.extra_pages:
+            if not tab.is_closed():
+                await tab.goto("about:blank")
+
+    async def _destroy(self, pooled: PooledContext):
+        """コンテキストを閉じてプールから外す"""
+        if pooled in self._all:
+            self._all.remove(pooled)
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
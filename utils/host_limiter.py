@@ -0,0 +1,341 @@
+"""
+ホスト単位のレート制御
+複数タブ・複数コンテキストから同じサイトへ出すリクエストの同時数と間隔を、サイトの応答に合わせて調整する
+"""
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitConfig:
+    """
+    ホストごとのレート制御の設定
+
+    - initial_rate / min_rate / max_rate: 1秒あたりのリクエスト数（開始値・下限・上限）
+    - burst: 間隔を空けずに続けて出せるリクエスト数（トークンバケットの容量）
+    - max_concurrency: 同時に処理するリクエスト数の上限
+    - additive_increase: 健全な応答1件ごとに増やすレート（加算増加）
+    - decrease_factor: 失敗時にレートに掛ける係数（乗算減少）
+    - latency_target: これ以下の応答時間（秒、指数移動平均）なら健全とみなす
+    - error_rate_threshold: これ以下の失敗率（指数移動平均）なら健全とみなす
+    - cooldown: HTTP 429・アクセスブロック検出後に新しいリクエストを止める秒数
+    """
+    initial_rate: float = 1.0
+    min_rate: float = 0.1
+    max_rate: float = 10.0
+    burst: float = 2.0
+    max_concurrency: int = 4
+    additive_increase: float = 0.1
+    decrease_factor: float = 0.5
+    latency_target: float = 8.0
+    error_rate_threshold: float = 0.2
+    cooldown: float = 10.0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], base: Optional["RateLimitConfig"] = None) -> "RateLimitConfig":
+        """selectors.json の rate_limit 定義から作成（未定義の項目は base または既定値）"""
+        base = base or cls()
+        known = set(cls.__dataclass_fields__)
+        return replace(base, **{key: value for key, value in (config or {}).items() if key in known})
+
+    def split(self, parts: int) -> "RateLimitConfig":
+        """parts 個のプロセスで分け合う場合の1つ分（合計がこの設定と同じになるようレート・同時数を割る）"""
+        parts = max(1, parts)
+        return replace(
+            self,
+            initial_rate=self.initial_rate / parts,
+            min_rate=self.min_rate / parts,
+            max_rate=self.max_rate / parts,
+            burst=max(1.0, self.burst / parts),
+            max_concurrency=max(1, self.max_concurrency // parts),
+            additive_increase=self.additive_increase / parts,
+        )
+
+
+class RequestTicket:
+    """
+    slot() で確保した1リクエストの結果
+
+    ページ遷移の応答（ステータス・所要時間）やブロック検出を report() で記録すると、
+    枠を返すときにレート制御へ反映される。何も記録しなければ枠を確保していた時間を応答時間とし、
+    例外で抜けた場合は失敗として扱う。
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.status: Optional[int] = None
+        self.latency: Optional[float] = None
+        self.error = False
+        self.blocked = False
+
+    def report(
+        self,
+        status: Optional[int] = None,
+        latency: Optional[float] = None,
+        error: bool = False,
+        blocked: bool = False
+    ):
+        """応答を記録（同じ枠で複数回呼んだ場合、失敗・ブロックは残る）"""
+        if status is not None:
+            self.status = status
+        if latency is not None:
+            self.latency = latency
+        self.error = self.error or error
+        self.blocked = self.blocked or blocked
+
+    @property
+    def failed(self) -> bool:
+        """減速すべき結果か（タイムアウト等の失敗・HTTP 429/5xx・ブロック）"""
+        return (
+            self.error
+            or self.blocked
+            or (self.status is not None and (self.status == 429 or self.status >= 500))
+        )
+
+
+# 現在のタスクが確保している枠（report_result の送り先）
+_current_ticket: ContextVar[Optional[RequestTicket]] = ContextVar("host_limiter_ticket", default=None)
+
+
+def report_result(
+    status: Optional[int] = None,
+    latency: Optional[float] = None,
+    error: bool = False,
+    blocked: bool = False
+):
+    """現在のタスクが確保している枠に応答を記録（枠の外で呼んだ場合は何もしない）"""
+    ticket = _current_ticket.get()
+    if ticket is not None:
+        ticket.report(status=status, latency=latency, error=error, blocked=blocked)
+
+
+class _HostState:
+    """ホストごとのトークンバケットと応答の統計（ループ・スレッド間で共有）"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.rate = config.initial_rate
+        self.tokens = config.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+
+        # 統計
+        self.requests = 0
+        self.failures = 0
+        self.increases = 0
+        self.decreases = 0
+        self.waited_seconds = 0.0
+
+    def reserve(self, now: float) -> float:
+        """トークンを1つ予約し、使えるまでの待ち時間を返す（不足分は前借りして順番に待つ）"""
+        self.tokens = min(self.config.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+
+class HostLimiter:
+    """
+    ホストごとのトークンバケットで同時ページ取得数とリクエスト間隔を制御する
+
+    レートは AIMD で調整する。応答時間・失敗率が健全な間は1件ごとに少しずつ加速し、
+    タイムアウト・HTTP 429/5xx・アクセスブロックを検出したら半分に減速する
+    （429・ブロックの場合はしばらく新しいリクエストを止める）。
+    固定の待機時間の代わりに、サイトが許容する速度に自動で合わせる。
+
+    スクレイパー間で共有するため、通常は shared() のインスタンスを使う。
+    レートの状態は全てのループで共有し、セマフォはイベントループに紐づくためループごとに別に持つ。
+
+    使用例:
+        limiter = HostLimiter.shared()
+        async with limiter.slot(url) as ticket:
+            response = await page.goto(url)
+            ticket.report(status=response.status)
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 4
+
+    # 失敗率・応答時間の指数移動平均の重み
+    EWMA_ALPHA = 0.2
+
+    _shared: Optional["HostLimiter"] = None
+
+    def __init__(
+        self,
+        default_max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        default_config: Optional[RateLimitConfig] = None
+    ):
+        self.default_config = replace(
+            default_config or RateLimitConfig(),
+            max_concurrency=max(1, default_max_concurrency)
+        )
+        self._configs: Dict[str, RateLimitConfig] = {}
+        self._states: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        # イベントループ → ホスト → セマフォ（終了したループの分は自動で消える）
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @classmethod
+    def shared(cls) -> "HostLimiter":
+        """プロセス共通のインスタンスを取得"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """URLのホスト名（小文字）"""
+        return (urlparse(url).hostname or "").lower()
+
+    def configure(self, host: str, config: RateLimitConfig):
+        """ホストのレート制御の設定を変更（同時取得数の上限は次に作成されるセマフォから有効）"""
+        host = host.lower()
+        with self._lock:
+            self._configs[host] = config
+            state = self._states.get(host)
+            if state is not None:
+                state.config = config
+                state.rate = min(max(state.rate, config.min_rate), config.max_rate)
+
+    def configure_site(self, site_config: Dict[str, Any]):
+        """サイト設定の rate_limit 定義を base_url のホストに適用（定義がなければ何もしない）"""
+        host = self.host_of(site_config.get("base_url", ""))
+        if host and site_config.get("rate_limit"):
+            self.configure(host, RateLimitConfig.from_config(site_config["rate_limit"], self.config_for(host)))
+
+    def set_limit(self, host: str, max_concurrency: int):
+        """ホストの同時取得数の上限を設定（次に作成されるセマフォから有効）"""
+        self.configure(host, replace(self.config_for(host.lower()), max_concurrency=max(1, max_concurrency)))
+
+    def config_for(self, host: str) -> RateLimitConfig:
+        """ホストのレート制御の設定"""
+        return self._configs.get(host, self.default_config)
+
+    def limit_for(self, host: str) -> int:
+        """ホストの同時取得数の上限"""
+        return self.config_for(host).max_concurrency
+
+    def rate_for(self, host: str) -> float:
+        """ホストの現在のレート（1秒あたりのリクエスト数）"""
+        with self._lock:
+            state = self._states.get(host)
+            return state.rate if state else self.config_for(host).initial_rate
+
+    def _state(self, host: str) -> _HostState:
+        state = self._states.get(host)
+        if state is None:
+            state = self._states[host] = _HostState(self.config_for(host))
+        return state
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        per_host = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        semaphore = per_host.get(host)
+        if semaphore is None:
+            semaphore = per_host[host] = asyncio.Semaphore(self.limit_for(host))
+        return semaphore
+
+    async def _acquire(self, host: str):
+        """トークンが使えるまで待つ"""
+        with self._lock:
+            state = self._state(host)
+            wait = state.reserve(time.monotonic())
+            state.waited_seconds += wait
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[RequestTicket]:
+        """URLのホストの枠とトークンを1つ確保して処理し、結果をレートに反映する"""
+        host = self.host_of(url)
+        async with self._semaphore(host):
+            await self._acquire(host)
+            ticket = RequestTicket(host)
+            token = _current_ticket.set(ticket)
+            start = time.monotonic()
+            completed = True
+            try:
+                yield ticket
+            except Exception:
+                ticket.report(error=True)
+                raise
+            except BaseException:
+                # キャンセルはサイトの応答ではないのでレートに反映しない
+                completed = False
+                raise
+            finally:
+                _current_ticket.reset(token)
+                if completed:
+                    self._feedback(host, ticket, time.monotonic() - start)
+
+    def _feedback(self, host: str, ticket: RequestTicket, elapsed: float):
+        """応答に応じてレートを加算増加・乗算減少する"""
+        latency = ticket.latency if ticket.latency is not None else elapsed
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._state(host)
+            config = state.config
+            state.requests += 1
+            state.error_ewma += self.EWMA_ALPHA * ((1.0 if ticket.failed else 0.0) - state.error_ewma)
+
+            if ticket.failed:
+                state.failures += 1
+                # 同時に出ていたリクエストの失敗で何度も減速しないよう、減速は1周期に1回まで
+                window = max(1.0 / state.rate, state.latency_ewma or 0.0)
+                if now - state.last_decrease < window:
+                    return
+                previous = state.rate
+                state.rate = max(config.min_rate, state.rate * config.decrease_factor)
+                state.last_decrease = now
+                state.decreases += 1
+                if ticket.blocked or ticket.status == 429:
+                    state.paused_until = now + config.cooldown
+                reason = "blocked" if ticket.blocked else (f"HTTP {ticket.status}" if ticket.status else "error")
+                logger.warning(f"Slowing down {host} ({reason}): {previous:.2f} -> {state.rate:.2f} req/s")
+                return
+
+            if state.latency_ewma is None:
+                state.latency_ewma = latency
+            else:
+                state.latency_ewma += self.EWMA_ALPHA * (latency - state.latency_ewma)
+
+            if (
+                state.latency_ewma <= config.latency_target
+                and state.error_ewma <= config.error_rate_threshold
+                and state.rate < config.max_rate
+            ):
+                state.rate = min(config.max_rate, state.rate + config.additive_increase)
+                state.increases += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """ホストごとのレート制御の統計を取得"""
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(state.rate, 2),
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                    "waited_seconds": round(state.waited_seconds, 2),
+                    "latency_ewma": round(state.latency_ewma, 2) if state.latency_ewma is not None else None,
+                    "error_rate": round(state.error_ewma, 3),
+                }
+                for host, state in self._states.items()
+            }
@@ -0,0 +1,308 @@
+"""
+HTTPレスポンスキャッシュ
+一覧・詳細ページのHTMLを正規化したURL単位で圧縮してディスクに保存し、
+有効期限内はネットワークに出ず、期限切れ後は ETag / Last-Modified で再検証する
+"""
+import gzip
+import hashlib
+import json
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlparse, urlunparse
+from playwright.async_api import Page, Route
+import logging
+
+from .performance import PerformanceMonitor
+
+logger = logging.getLogger(__name__)
+
+
+# リソース種別ごとの既定の有効期限（秒）。一覧は新着で変わるため短く、詳細は長めに持つ
+DEFAULT_TTLS: Dict[str, float] = {
+    "listing": 600,
+    "detail": 86400,
+}
+DEFAULT_TTL = 3600
+
+# キャッシュのキーから除くクエリ（計測用で内容に影響しないもの）
+_IGNORED_QUERY = re.compile(r"^(utm_.*|fbclid|gclid|yclid)$", re.IGNORECASE)
+
+# URLのエスケープで変換しない文字（ブラウザが送るリクエストURLの形にそろえる）
+_URL_SAFE = ":/?#[]@!$&'()*+,;=%-._~"
+
+# 保存するレスポンスヘッダ（本文は展開済みで保存するため content-encoding 等は持たない）
+_STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+
+def normalize_url(url: str) -> str:
+    """キャッシュのキーに使うURL（スキーム・ホストを小文字に、クエリを整列、計測用クエリとフラグメントを除去）"""
+    parsed = urlparse(url)
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not _IGNORED_QUERY.match(key)
+    )
+    return urlunparse((
+        parsed.scheme.lower(),
+        parsed.netloc.lower(),
+        quote(unquote(parsed.path or "/"), safe=_URL_SAFE),
+        parsed.params,
+        urlencode(query),
+        "",
+    ))
+
+
+@dataclass
+class CachedResponse:
+    """キャッシュしたレスポンス"""
+    url: str
+    resource_type: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def text(self) -> str:
+        """本文を文字列として取得"""
+        return self.body.decode("utf-8", errors="replace")
+
+
+class ResponseCache:
+    """
+    ディスク上のレスポンスキャッシュ
+
+    1エントリ1ファイル（gzip圧縮、先頭行がJSONのメタデータ、以降が本文）で保存する。
+    有効期限はリソース種別（"listing" / "detail"）ごとに設定する。
+
+    ページ遷移に使う場合は serve() の中で page.goto する。ドキュメントのリクエストだけを横取りし、
+    有効期限内ならキャッシュから返し（ネットワークに出ない）、期限切れなら条件付きリクエストで再検証する。
+    本文から直接データを読める場合は lookup() で有効なエントリを取り出せば描画も省略できる。
+
+    使用例:
+        cache = ResponseCache("data/http_cache", monitor=monitor)
+        async with cache.serve(page, url, "detail"):
+            await page.goto(url)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/http_cache",
+        ttls: Optional[Dict[str, float]] = None,
+        monitor: Optional[PerformanceMonitor] = None,
+        max_entry_bytes: int = 5 * 1024 * 1024
+    ):
+        """
+        Args:
+            cache_dir: 保存先ディレクトリ
+            ttls: リソース種別 → 有効期限（秒）。未指定の種別は DEFAULT_TTLS
+            monitor: ヒット・ミス・節約した転送量を記録するモニター
+            max_entry_bytes: これより大きい本文は保存しない
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.monitor = monitor
+        self.max_entry_bytes = max_entry_bytes
+
+        # 統計
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def ttl_for(self, resource_type: str) -> float:
+        """リソース種別の有効期限（秒）"""
+        return self.ttls.get(resource_type, DEFAULT_TTL)
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.gz"
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """保存済みのエントリを取得（期限切れも含む。なければNone）"""
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        return CachedResponse(body=body, **meta)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """有効期限内か"""
+        return time.time() - entry.stored_at < self.ttl_for(entry.resource_type)
+
+    def lookup(self, url: str, resource_type: str) -> Optional[CachedResponse]:
+        """有効期限内のエントリを取得（ヒットの記録は利用側で record_hit を呼ぶ）"""
+        entry = self.get(url)
+        if entry is None or entry.resource_type != resource_type or not self.is_fresh(entry):
+            return None
+        return entry
+
+    def store(
+        self,
+        url: str,
+        resource_type: str,
+        status: int,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> Optional[CachedResponse]:
+        """レスポンスを保存（保存対象外ならNone）"""
+        headers = {key.lower(): value for key, value in headers.items()}
+        if status != 200 or len(body) > self.max_entry_bytes or "no-store" in headers.get("cache-control", ""):
+            return None
+
+        entry = CachedResponse(
+            url=normalize_url(url),
+            resource_type=resource_type,
+            status=status,
+            headers={key: headers[key] for key in _STORED_HEADERS if key in headers},
+            body=body,
+        )
+        self._write(entry)
+        return entry
+
+    def touch(self, entry: CachedResponse):
+        """再検証で変更がなかったエントリの保存時刻を更新"""
+        entry.stored_at = time.time()
+        self._write(entry)
+
+    def _write(self, entry: CachedResponse):
+        path = self._path(entry.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": entry.url,
+            "resource_type": entry.resource_type,
+            "status": entry.status,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+        }
+        # 書きかけのファイルを読まないよう一時ファイルに書いてから置き換える
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+            f.write(entry.body)
+        tmp_path.replace(path)
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> Dict[str, str]:
+        """再検証用のリクエストヘッダ"""
+        headers = {}
+        if entry.etag:
+            headers["if-none-match"] = entry.etag
+        if entry.last_modified:
+            headers["if-modified-since"] = entry.last_modified
+        return headers
+
+    def record_hit(self, entry: CachedResponse, revalidated: bool = False):
+        """キャッシュから返したことを記録（本文の転送を省略できたバイト数も加算）"""
+        if revalidated:
+            self.revalidations += 1
+        else:
+            self.hits += 1
+        self.bytes_saved += len(entry.body)
+        if self.monitor:
+            self.monitor.record_cache_hit(len(entry.body), revalidated=revalidated)
+
+    def record_miss(self):
+        """ネットワークから取得したことを記録"""
+        self.misses += 1
+        if self.monitor:
+            self.monitor.record_cache_miss()
+
+    @asynccontextmanager
+    async def serve(self, page: Page, url: str, resource_type: str) -> AsyncIterator[None]:
+        """この中で page.goto(url) すると、ドキュメントのリクエストをキャッシュ経由で処理する"""
+        # 日本語のキーワード等はブラウザがエスケープして送るため、どちらの形にも一致させる
+        candidates = {url, quote(url, safe=_URL_SAFE)}
+        pattern = re.compile("^(?:" + "|".join(re.escape(candidate) for candidate in candidates) + ")$")
+
+        async def handle(route: Route):
+            await self._handle(route, url, resource_type)
+
+        await page.route(pattern, handle)
+        try:
+            yield
+        finally:
+            try:
+                await page.unroute(pattern, handle)
+            except Exception as e:
+                logger.debug(f"Error removing cache route: {e}")
+
+    async def _handle(self, route: Route, url: str, resource_type: str):
+        """ドキュメントのリクエストをキャッシュから返す、または再検証・取得して保存する"""
+        if route.request.resource_type != "document":
+            await route.continue_()
+            return
+
+        entry = self.get(url)
+        if entry is not None and entry.resource_type == resource_type and self.is_fresh(entry):
+            self.record_hit(entry)
+            await route.fulfill(status=entry.status, headers=entry.headers, body=entry.body)
+            return
+
+        headers = dict(route.request.headers)
+        if entry is not None:
+            headers.update(self.conditional_headers(entry))
+        response = await route.fetch(headers=headers)
+
+        if response.status == 304 and entry is not None:
+            self.touch(entry)
+            self.record_hit(entry, revalidated=True)
+            await route.fulfill(status=entry.status, headers=entry.headers, body=entry.body)
+            return
+
+        body = await response.body()
+        self.record_miss()
+        self.store(url, resource_type, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    def purge_expired(self, max_age: Optional[float] = None) -> int:
+        """
+        古いエントリを削除
+
+        Args:
+            max_age: この秒数より古いエントリを削除（省略時は最も長い有効期限）
+
+        Returns:
+            削除したファイル数
+        """
+        max_age = max_age if max_age is not None else max(self.ttls.values(), default=DEFAULT_TTL)
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.cache_dir.glob("*/*.gz"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError as e:
+                logger.debug(f"Failed to remove cache entry {path}: {e}")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュの統計を取得"""
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -4,11 +4,111 @@
 """
 import asyncio
 import logging
+import time
+from dataclasses import dataclass, replace
 from typing import Optional, List, Dict, Any
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
+from .performance import PerformanceMonitor
+from .host_limiter import report_result
+
 logger = logging.getLogger(__name__)
 
+# ブロックページと判定するタイトル（小文字の部分一致）
+_BLOCK_TITLES = ("access denied", "attention required", "just a moment", "robot check", "403 forbidden")
+
+# ブロック・ボット判定のチャレンジページに現れる要素
+_BLOCK_SELECTORS = ("#challenge-form", "#challenge-running", "#cf-challenge-running", "#px-captcha")
+
+# 本文にあればログに残す語（一覧ページの電話番号・給与等にも現れるためブロックとはみなさない）
+_SUSPECT_TEXTS = ("Access Denied", "403", "404", "blocked", "Robot Check", "Checking your browser")
+
+
+# ページ内で繰り返し評価する準備完了判定（状態はページの window に保持し、遷移すると初期化される）
+# 準備完了なら理由（"payload" / "cards"）、未完了なら false を返す
+_READY_JS = """
+(spec) => {
+    const now = performance.now();
+    let state = window.__scraperReady;
+    if (!state) {
+        state = window.__scraperReady = { count: -1, countSince: now, lastMutation: now };
+        if (spec.quietMs > 0 && document.documentElement) {
+            new MutationObserver(() => { state.lastMutation = performance.now(); })
+                .observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+        }
+    }
+
+    // 構造化データが揃っていれば描画を待つ必要はない（フライトデータはHTMLの解析完了で出揃う）
+    if (spec.payload) {
+        if (document.getElementById('__NEXT_DATA__')) return 'payload';
+        if (Array.isArray(self.__next_f) && self.__next_f.length && document.readyState !== 'loading') return 'payload';
+    }
+
+    if (!spec.selector) return false;
+    const count = document.querySelectorAll(spec.selector).length;
+    if (count !== state.count) {
+        state.count = count;
+        state.countSince = now;
+    }
+    if (count < spec.minCount || now - state.countSince < spec.stableMs) return false;
+    if (spec.quietMs > 0 && now - state.lastMutation < spec.quietMs) return false;
+    return 'cards';
+}
+"""
+
+
+@dataclass
+class ReadyCondition:
+    """
+    サイトごとの「一覧ページの準備完了」条件
+
+    いずれかを満たした時点で待機を終える:
+    - payload: Next.js のペイロード（__NEXT_DATA__ / フライトデータ）がある
+    - cards: selector の要素数が min_count 以上で stable_ms の間変化せず、
+      かつ DOM の変更が quiet_ms の間ない
+    """
+    selector: Optional[str] = None
+    min_count: int = 1
+    stable_ms: int = 300
+    quiet_ms: int = 200
+    payload: bool = False
+    timeout_ms: int = 20000
+    poll_ms: int = 100
+
+    @classmethod
+    def from_site_config(
+        cls,
+        site_config: Dict[str, Any],
+        key: str = "ready",
+        default_selector: Optional[str] = None
+    ) -> "ReadyCondition":
+        """
+        selectors.json のサイト設定から作成
+
+        Args:
+            site_config: サイト設定
+            key: 条件を定義したキー（一覧ページは ready、詳細ページは detail_ready）
+            default_selector: 定義にselectorがない場合のセレクタ（省略時は job_cards）
+        """
+        config = dict(site_config.get(key) or {})
+        config.setdefault("selector", default_selector or site_config.get("selectors", {}).get("job_cards"))
+        fields = cls.__dataclass_fields__
+        return cls(**{key: value for key, value in config.items() if key in fields})
+
+    def without_payload(self) -> "ReadyCondition":
+        """ペイロードに求人がなかった場合に、カードの描画を待つための条件"""
+        return replace(self, payload=False)
+
+    def to_spec(self) -> Dict[str, Any]:
+        """_READY_JS に渡す引数"""
+        return {
+            "selector": self.selector,
+            "minCount": self.min_count,
+            "stableMs": self.stable_ms,
+            "quietMs": self.quiet_ms,
+            "payload": self.payload,
+        }
+
 
 class PageUtils:
     """ページ操作ユーティリティクラス"""
@@ -51,41 +151,89 @@ class PageUtils:
             logger.error(f"Page load timeout after {timeout}ms")
             return False
 
+    @staticmethod
+    async def wait_until_ready(
+        page: Page,
+        condition: ReadyCondition,
+        monitor: Optional[PerformanceMonitor] = None
+    ) -> Optional[str]:
+        """
+        サイトの準備完了条件を満たすまで待機（固定のsleepやnetworkidleは使わない）
+
+        Args:
+            page: Playwrightページ
+            condition: 準備完了条件
+            monitor: 待機時間を記録するモニター
+
+        Returns:
+            満たした条件（"payload" / "cards"）、タイムアウト時はNone
+        """
+        start = time.perf_counter()
+        reason = None
+        try:
+            handle = await page.wait_for_function(
+                _READY_JS,
+                arg=condition.to_spec(),
+                polling=condition.poll_ms,
+                timeout=condition.timeout_ms
+            )
+            reason = await handle.json_value()
+        except PlaywrightTimeoutError:
+            logger.warning(f"Page not ready after {condition.timeout_ms}ms: {condition.selector}")
+
+        waited = time.perf_counter() - start
+        if monitor:
+            monitor.record_page_wait(waited, ready=reason is not None)
+        logger.debug(f"Page ready ({reason}) in {waited:.2f}s")
+        return reason
+
     @staticmethod
     async def safe_goto(
         page: Page,
         url: str,
         timeout: int = 30000,
-        wait_until: str = "domcontentloaded"
+        wait_until: str = "domcontentloaded",
+        wait_for_load: bool = True
     ) -> bool:
         """
         安全なページ遷移（エラーハンドリング付き）
 
+        HostLimiter の枠内で呼ばれた場合は、応答のステータス・所要時間やタイムアウトを枠に記録する。
+
         Args:
             page: Playwrightページ
             url: 遷移先URL
             timeout: タイムアウト（ミリ秒）
             wait_until: 待機条件
+            wait_for_load: 遷移後に wait_for_page_load で待つか（wait_until_ready で待つ場合は False）
 
         Returns:
             成功したかどうか
         """
+        start = time.perf_counter()
         try:
             logger.info(f"Navigating to: {url}")
             response = await page.goto(url, wait_until=wait_until, timeout=timeout)
+            report_result(
+                status=response.status if response else None,
+                latency=time.perf_counter() - start
+            )
 
             if response and response.status >= 400:
                 logger.warning(f"HTTP error: {response.status} for {url}")
                 return False
 
-            await PageUtils.wait_for_page_load(page, timeout)
+            if wait_for_load:
+                await PageUtils.wait_for_page_load(page, timeout)
             return True
 
         except PlaywrightTimeoutError:
             logger.error(f"Navigation timeout for {url}")
+            report_result(error=True, latency=time.perf_counter() - start)
             return False
         except Exception as e:
             logger.error(f"Navigation error for {url}: {e}")
+            report_result(error=True)
             return False
 
     @staticmethod
@@ -237,33 +385,36 @@ class PageUtils:
         """
         ブロックされているかチェック
 
+        ブロックと判定するのは CAPTCHA・ブロックページのタイトル・チャレンジページの要素のみ。
+        本文の語（"403" 等）は電話番号・給与・郵便番号にも現れるため、ログに残すだけで判定には使わない。
+        HostLimiter の枠内で呼ばれた場合、ブロックを検出したら枠に記録する（そのホストへのリクエストを減速する）。
+        HTTPステータスはページ遷移時に記録済み。
+
         Returns:
-            ブロック情報の辞書
+            ブロック情報の辞書（suspects は本文に含まれていた参考情報の語）
         """
         result = {
             "is_blocked": False,
             "reason": None,
-            "indicators": []
+            "indicators": [],
+            "suspects": []
         }
 
         try:
-            # ブロック指標をチェック
-            block_indicators = [
-                ("Access Denied", "text"),
-                ("403", "text"),
-                ("404", "text"),
-                ("blocked", "text"),
-                ("Robot Check", "text"),
-                ("Checking your browser", "text"),
-            ]
-
-            page_text = await page.inner_text("body")
-
-            for indicator, check_type in block_indicators:
-                if indicator.lower() in page_text.lower():
+            title = (await page.title()).lower()
+            for indicator in _BLOCK_TITLES:
+                if indicator in title:
                     result["is_blocked"] = True
+                    result["reason"] = "title"
                     result["indicators"].append(indicator)
-                    logger.warning(f"Block indicator detected: {indicator}")
+                    logger.warning(f"Block page title detected: {indicator}")
+
+            for selector in _BLOCK_SELECTORS:
+                if await page.query_selector(selector):
+                    result["is_blocked"] = True
+                    result["reason"] = result["reason"] or "challenge"
+                    result["indicators"].append(selector)
+                    logger.warning(f"Block page element detected: {selector}")
 
             # CAPTCHAチェック
             if await PageUtils.check_for_captcha(page):
@@ -271,8 +422,15 @@ class PageUtils:
                 result["reason"] = "CAPTCHA"
                 result["indicators"].append("CAPTCHA")
 
+            page_text = (await page.inner_text("body")).lower()
+            result["suspects"] = [text for text in _SUSPECT_TEXTS if text.lower() in page_text]
+            if result["suspects"]:
+                logger.debug(f"Block-like text on page (not treated as a block): {result['suspects']}")
+
         except Exception as e:
             # ページがナビゲーション中などでエラーが出た場合は無視
             logger.debug(f"Error checking for block (likely page navigating): {e}")
 
+        if result["is_blocked"]:
+            report_result(blocked=True)
         return result
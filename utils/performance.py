@@ -22,6 +22,36 @@ class PerformanceMetrics:
     errors: int = 0
     retries: int = 0
     total_bytes: int = 0
+    # ブラウザコンテキストの作成回数・所要時間と、プールからの再利用回数
+    context_setups: int = 0
+    context_setup_seconds: float = 0.0
+    context_reuses: int = 0
+    # ページの準備完了待ちの回数・合計時間と、条件を満たさずタイムアウトした回数
+    page_waits: int = 0
+    page_wait_seconds: float = 0.0
+    page_wait_timeouts: int = 0
+    # ブロックしたリクエスト数と、その転送量の見積もり（ブロックしたリクエストは取得しないため実測できない）
+    blocked_requests: int = 0
+    blocked_bytes_estimate: int = 0
+    # レスポンスキャッシュのヒット（有効期限内）・再検証（304）・ミスの回数と、転送を省略できたバイト数
+    cache_hits: int = 0
+    cache_revalidations: int = 0
+    cache_misses: int = 0
+    cache_bytes_saved: int = 0
+
+    @property
+    def avg_page_wait_seconds(self) -> float:
+        """1ページあたりの平均待機時間"""
+        if not self.page_waits:
+            return 0.0
+        return self.page_wait_seconds / self.page_waits
+
+    @property
+    def context_setup_saved_seconds(self) -> float:
+        """コンテキスト再利用で省略できた作成時間の見積もり（平均作成時間 × 再利用回数）"""
+        if not self.context_setups:
+            return 0.0
+        return self.context_setup_seconds / self.context_setups * self.context_reuses
 
     def finish(self):
         """測定を終了"""
@@ -41,6 +71,20 @@ class PerformanceMetrics:
             "errors": self.errors,
             "retries": self.retries,
             "total_bytes": self.total_bytes,
+            "context_setups": self.context_setups,
+            "context_setup_seconds": round(self.context_setup_seconds, 2),
+            "context_reuses": self.context_reuses,
+            "context_setup_saved_seconds": round(self.context_setup_saved_seconds, 2),
+            "page_waits": self.page_waits,
+            "page_wait_seconds": round(self.page_wait_seconds, 2),
+            "avg_page_wait_seconds": round(self.avg_page_wait_seconds, 3),
+            "page_wait_timeouts": self.page_wait_timeouts,
+            "blocked_requests": self.blocked_requests,
+            "blocked_bytes_estimate": self.blocked_bytes_estimate,
+            "cache_hits": self.cache_hits,
+            "cache_revalidations": self.cache_revalidations,
+            "cache_misses": self.cache_misses,
+            "cache_bytes_saved": self.cache_bytes_saved,
         }
 
     def __str__(self):
@@ -96,6 +140,39 @@ class PerformanceMonitor:
         """バイト数を記録"""
         self.metrics.total_bytes += bytes_count
 
+    def record_context_setup(self, duration: float):
+        """ブラウザコンテキストの作成時間を記録"""
+        self.metrics.context_setups += 1
+        self.metrics.context_setup_seconds += duration
+
+    def record_context_reuse(self):
+        """プールからのコンテキスト再利用を記録"""
+        self.metrics.context_reuses += 1
+
+    def record_page_wait(self, duration: float, ready: bool = True):
+        """ページの準備完了待ちの時間を記録"""
+        self.metrics.page_waits += 1
+        self.metrics.page_wait_seconds += duration
+        if not ready:
+            self.metrics.page_wait_timeouts += 1
+
+    def record_blocked_request(self, estimated_bytes: int = 0):
+        """ブロックしたリクエストを記録"""
+        self.metrics.blocked_requests += 1
+        self.metrics.blocked_bytes_estimate += estimated_bytes
+
+    def record_cache_hit(self, bytes_saved: int = 0, revalidated: bool = False):
+        """レスポンスキャッシュから返したことを記録（revalidated: 304で再検証して返した）"""
+        if revalidated:
+            self.metrics.cache_revalidations += 1
+        else:
+            self.metrics.cache_hits += 1
+        self.metrics.cache_bytes_saved += bytes_saved
+
+    def record_cache_miss(self):
+        """レスポンスキャッシュになくネットワークから取得したことを記録"""
+        self.metrics.cache_misses += 1
+
     def finish(self) -> PerformanceMetrics:
         """測定終了"""
         self.metrics.finish()
@@ -125,6 +202,26 @@ class PerformanceMonitor:
         print(f"Errors: {self.metrics.errors}")
         print(f"Retries: {self.metrics.retries}")
 
+        if self.metrics.context_setups > 0:
+            print(f"Context Setups: {self.metrics.context_setups} ({self.metrics.context_setup_seconds:.2f}s)")
+            print(f"Context Reuses: {self.metrics.context_reuses} "
+                  f"(~{self.metrics.context_setup_saved_seconds:.2f}s saved)")
+
+        if self.metrics.page_waits > 0:
+            print(f"Page Waits: {self.metrics.page_waits} "
+                  f"(avg {self.metrics.avg_page_wait_seconds:.2f}s, total {self.metrics.page_wait_seconds:.2f}s, "
+                  f"timeouts: {self.metrics.page_wait_timeouts})")
+
+        if self.metrics.blocked_requests > 0:
+            blocked_mb = self.metrics.blocked_bytes_estimate / (1024 * 1024)
+            print(f"Blocked Requests: {self.metrics.blocked_requests} (~{blocked_mb:.2f} MB estimated)")
+
+        cache_lookups = self.metrics.cache_hits + self.metrics.cache_revalidations + self.metrics.cache_misses
+        if cache_lookups > 0:
+            saved_mb = self.metrics.cache_bytes_saved / (1024 * 1024)
+            print(f"Response Cache: {self.metrics.cache_hits} hits, {self.metrics.cache_revalidations} revalidated, "
+                  f"{self.metrics.cache_misses} misses ({saved_mb:.2f} MB saved)")
+
         if self.metrics.total_bytes > 0:
             mb = self.metrics.total_bytes / (1024 * 1024)
             print(f"Total Data: {mb:.2f} MB")
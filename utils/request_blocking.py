@@ -0,0 +1,153 @@
+"""
+リクエストブロックポリシー
+サイトごとにブロックするリソース種別・拡張子・ドメインを宣言し、コンテキスト単位で1回だけ適用する
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from playwright.async_api import BrowserContext, Route
+import logging
+
+from .performance import PerformanceMonitor
+
+logger = logging.getLogger(__name__)
+
+
+# リソース種別ごとの拡張子（URLだけで判定できるよう種別を拡張子に展開する）
+# stylesheet はCSSクラス名のセレクタに必要なため既定ではブロックしない
+RESOURCE_TYPE_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    "image": (".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico"),
+    "media": (".mp4", ".webm", ".avi", ".mov", ".mp3", ".wav"),
+    "font": (".woff", ".woff2", ".ttf", ".otf", ".eot"),
+    "stylesheet": (".css",),
+}
+
+# ブロックした1リクエストあたりの転送量の目安（バイト）。
+# ブロックしたリクエストは取得しないため実際のサイズは分からず、統計上の見積もりにのみ使う
+ESTIMATED_BYTES: Dict[str, int] = {
+    "image": 30_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 20_000,
+    "script": 50_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+@dataclass
+class BlockingPolicy:
+    """
+    サイトごとのリクエストブロック方針
+
+    - resource_types: ブロックするリソース種別（RESOURCE_TYPE_EXTENSIONS の拡張子で判定）
+    - extensions: 追加でブロックする拡張子
+    - blocked_domains: ブロックするドメイン（サブドメインも対象）または "ドメイン/パス" の前方一致
+    - first_party: 指定した場合、これ以外のホストへのリクエストはドキュメント以外すべてブロック
+
+    全ルールは1つの正規表現にまとめてコンテキストのルートに登録する。
+    パターンの照合はブラウザ側で行われるため、ブロック対象外のリクエストはPythonを経由しない。
+    """
+    resource_types: Tuple[str, ...] = ("image", "media", "font")
+    extensions: Tuple[str, ...] = ()
+    blocked_domains: Tuple[str, ...] = (
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "facebook.net", "twitter.com/i/",
+    )
+    first_party: Tuple[str, ...] = ()
+    _pattern: Optional[Pattern] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "BlockingPolicy":
+        """selectors.json の blocking 定義から作成（未定義の項目は既定値）"""
+        config = config or {}
+        fields = ("resource_types", "extensions", "blocked_domains", "first_party")
+        return cls(**{key: tuple(config[key]) for key in fields if key in config})
+
+    @property
+    def pattern(self) -> Pattern:
+        """ブロック対象URLに一致する正規表現（初回に1回だけコンパイル）"""
+        if self._pattern is None:
+            self._pattern = re.compile(self._build_pattern(), re.IGNORECASE)
+        return self._pattern
+
+    def _build_pattern(self) -> str:
+        """ルールを1つの正規表現に変換（ブラウザ側でも評価されるためJSと共通の構文のみ使う）"""
+        alternatives: List[str] = []
+
+        extensions = [ext for rt in self.resource_types for ext in RESOURCE_TYPE_EXTENSIONS.get(rt, ())]
+        extensions += list(self.extensions)
+        if extensions:
+            names = "|".join(sorted({re.escape(ext.lstrip(".")) for ext in extensions}))
+            # パスの末尾の拡張子（クエリ・フラグメントは除く）
+            alternatives.append(rf"^[^?#]*\.(?:{names})(?:[?#]|$)")
+
+        hosts = [d for d in self.blocked_domains if "/" not in d]
+        prefixes = [d for d in self.blocked_domains if "/" in d]
+        if hosts:
+            names = "|".join(re.escape(d) for d in hosts)
+            alternatives.append(rf"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?(?:{names})(?::\d+)?(?:[/?#]|$)")
+        if prefixes:
+            names = "|".join(re.escape(d) for d in prefixes)
+            alternatives.append(rf"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?(?:{names})")
+
+        if self.first_party:
+            names = "|".join(re.escape(d) for d in self.first_party)
+            # data: 等のスキームは対象外、http(s)で自サイト以外のホスト
+            alternatives.append(rf"^https?://(?!(?:[^/?#]*\.)?(?:{names})(?::\d+)?(?:[/?#]|$))")
+
+        # 何もブロックしない場合は一致しないパターン
+        return "|".join(f"(?:{alt})" for alt in alternatives) or r"(?!)"
+
+    def matches(self, url: str) -> bool:
+        """URLがブロック対象か"""
+        return bool(self.pattern.search(url))
+
+
+class RequestBlocker:
+    """
+    ブロックポリシーをコンテキストに適用し、ブロックした件数を数える
+
+    コンテキストのルートに1回登録するだけで、そのコンテキストの全ページ（後から開いたページも含む）に効く。
+
+    使用例:
+        blocker = RequestBlocker(BlockingPolicy.from_config(site_config.get("blocking")), monitor)
+        context = await browser.new_context()
+        await blocker.apply(context)
+    """
+
+    def __init__(self, policy: Optional[BlockingPolicy] = None, monitor: Optional[PerformanceMonitor] = None):
+        self.policy = policy or BlockingPolicy()
+        self.monitor = monitor
+
+        # 統計
+        self.blocked_requests = 0
+        self.blocked_bytes_estimate = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    async def apply(self, context: BrowserContext):
+        """コンテキストにブロックルールを登録"""
+        await context.route(self.policy.pattern, self._abort)
+
+    async def _abort(self, route: Route):
+        """一致したリクエストを中断して記録（ドキュメント自体は止めない）"""
+        resource_type = route.request.resource_type
+        if resource_type == "document":
+            await route.continue_()
+            return
+
+        await route.abort("blockedbyclient")
+
+        estimated = ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.blocked_requests += 1
+        self.blocked_bytes_estimate += estimated
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        if self.monitor:
+            self.monitor.record_blocked_request(estimated)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ブロックの統計を取得"""
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_bytes_estimate": self.blocked_bytes_estimate,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
@@ -1,10 +1,12 @@
 """
 ヘッドレスブラウザ検出回避（Stealth設定）
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from playwright.async_api import BrowserContext, Page
 import logging
 
+from .request_blocking import RequestBlocker
+
 logger = logging.getLogger(__name__)
 
 
@@ -99,7 +101,13 @@ class StealthConfig:
         }
 
 
-async def create_stealth_context(browser, user_agent: str = None, proxy: Dict = None, block_resources: bool = True) -> BrowserContext:
+async def create_stealth_context(
+    browser,
+    user_agent: str = None,
+    proxy: Dict = None,
+    block_resources: bool = True,
+    blocker: Optional[RequestBlocker] = None
+) -> BrowserContext:
     """
     Stealth設定を適用したブラウザコンテキストを作成
 
@@ -108,6 +116,7 @@ async def create_stealth_context(browser, user_agent: str = None, proxy: Dict =
         user_agent: カスタムUser-Agent（オプション）
         proxy: プロキシ設定（オプション）
         block_resources: 画像・動画等のリソースをブロックするか（デフォルト: True）
+        blocker: 適用するブロックポリシー（省略時は既定のポリシー）
 
     Returns:
         設定済みのBrowserContext
@@ -125,55 +134,10 @@ async def create_stealth_context(browser, user_agent: str = None, proxy: Dict =
     # 全ページにステルススクリプトを適用
     context.on("page", lambda page: StealthConfig.apply_stealth_scripts(page))
 
-    # 画像・動画・フォント等のリソースをブロック（軽量化）
+    # 画像・動画・フォント・トラッカー等をブロック（コンテキスト単位で1回登録すれば全ページに効く）
     if block_resources:
-        async def setup_route_blocking(page: Page):
-            """不要なリソースをブロックするルートを設定"""
-            # stylesheetはブロックしない（CSSクラス名のセレクタに必要）
-            blocked_types = {'image', 'media', 'font'}
-            blocked_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.ico',
-                                  '.mp4', '.webm', '.avi', '.mov', '.mp3', '.wav',
-                                  '.woff', '.woff2', '.ttf', '.otf', '.eot'}
-
-            async def block_resources_handler(route):
-                request = route.request
-                resource_type = request.resource_type
-                url = request.url.lower()
-
-                # リソースタイプでブロック
-                if resource_type in blocked_types:
-                    await route.abort()
-                    return
-
-                # 拡張子でブロック
-                for ext in blocked_extensions:
-                    if url.endswith(ext) or f'{ext}?' in url:
-                        await route.abort()
-                        return
-
-                # 広告・トラッキングURLをブロック
-                blocked_domains = ['google-analytics.com', 'googletagmanager.com',
-                                   'doubleclick.net', 'facebook.net', 'twitter.com/i/']
-                for domain in blocked_domains:
-                    if domain in url:
-                        await route.abort()
-                        return
-
-                await route.continue_()
-
-            await page.route('**/*', block_resources_handler)
-
-        # 新しいページが作成されたときにルートを設定
-        async def on_page_created(page: Page):
-            await setup_route_blocking(page)
-
-        context.on("page", lambda page: page.context.browser.contexts)  # ダミー（非同期対応のため）
-
-        # コンテキストにフラグを設定（後でページ作成時に使用）
-        context._block_resources = True
-        context._setup_route_blocking = setup_route_blocking
-
-        logger.info("Resource blocking enabled (images, media, fonts)")
+        await (blocker or RequestBlocker()).apply(context)
+        logger.info("Resource blocking enabled")
 
     logger.info("Stealth context created")
     return context